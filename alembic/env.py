@@ -2,6 +2,7 @@ import os
 import asyncio
 from logging.config import fileConfig
 
+from sqlalchemy import text
 from sqlalchemy.engine import Connection
 from sqlmodel import SQLModel
 from alembic import context
@@ -11,6 +12,7 @@ from app.db import engine
 from app.movie import models as movmodels  # noqa: F401
 from app.account.models import user  # noqa: F401
 from app.shared.links import movie_account_links  # noqa: F401
+from app.shared.media import models as media_models  # noqa: F401
 
 load_dotenv()
 
@@ -33,6 +35,21 @@ if config.config_file_name is not None:
 target_metadata = SQLModel.metadata
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
+# Postgres-специфичные объекты, которые создаются только миграциями и не описаны
+# в моделях: autogenerate не должен предлагать их удалить.
+MIGRATION_ONLY_OBJECTS = {
+    "ix_movie_search_vector",
+    "ix_movie_title_trgm",
+    "ix_movie_popularity_sort",
+    "ix_movie_released_on_sort",
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if reflected and compare_to is None and name in MIGRATION_ONLY_OBJECTS:
+        return False
+    return True
+
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -58,6 +75,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -65,7 +83,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -80,6 +102,10 @@ async def run_async_migrations() -> None:
     connectable = engine
 
     async with connectable.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Миграции (CREATE INDEX и т.п.) не ограничиваем statement_timeout
+            await connection.execute(text("SET statement_timeout = 0"))
+            await connection.commit()
         await connection.run_sync(do_run_migrations)
 
     await connectable.dispose()
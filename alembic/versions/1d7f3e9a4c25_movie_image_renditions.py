@@ -0,0 +1,32 @@
+"""movie image renditions
+
+Revision ID: 1d7f3e9a4c25
+Revises: f2c6a8d41b57
+Create Date: 2026-10-18 19:05:11.640127
+
+"""
+from typing import Sequence, Union
+import sqlmodel.sql.sqltypes
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d7f3e9a4c25'
+down_revision: Union[str, Sequence[str], None] = 'f2c6a8d41b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    renditions_type = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+    op.add_column('movie', sa.Column('poster_renditions', renditions_type, nullable=True))
+    op.add_column('movie', sa.Column('backdrop_renditions', renditions_type, nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('movie', 'backdrop_renditions')
+    op.drop_column('movie', 'poster_renditions')
@@ -0,0 +1,34 @@
+"""catalog sync state
+
+Revision ID: 4c9e2d7b1f38
+Revises: 8b3e5f2a7c61
+Create Date: 2026-10-18 23:05:12.418305
+
+"""
+from typing import Sequence, Union
+import sqlmodel.sql.sqltypes
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c9e2d7b1f38'
+down_revision: Union[str, Sequence[str], None] = '8b3e5f2a7c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'catalogsyncstate',
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalogsyncstate')
@@ -0,0 +1,57 @@
+"""movie keyset indexes
+
+Revision ID: 5f1c2a9d7e31
+Revises: 0c8e05ea1c6a
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+import sqlmodel.sql.sqltypes
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f1c2a9d7e31'
+down_revision: Union[str, Sequence[str], None] = '0c8e05ea1c6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_movie_popularity_id',
+            'movie',
+            ['popularity', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_movie_release_date_id',
+            'movie',
+            ['release_date', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_movie_release_date_id',
+            table_name='movie',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_movie_popularity_id',
+            table_name='movie',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,37 @@
+"""media blob refcounts
+
+Revision ID: 8b3e5f2a7c61
+Revises: 1d7f3e9a4c25
+Create Date: 2026-10-18 20:41:27.503118
+
+"""
+from typing import Sequence, Union
+import sqlmodel.sql.sqltypes
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3e5f2a7c61'
+down_revision: Union[str, Sequence[str], None] = '1d7f3e9a4c25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Уже загруженные файлы (uuid-имена) в таблицу не попадают: их
+    # ссылки не считаются, такие файлы убирает чистильщик осиротевших файлов
+    op.create_table(
+        'mediablob',
+        sa.Column('key', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('refcount', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('mediablob')
@@ -0,0 +1,71 @@
+"""movie full-text and trigram search
+
+Revision ID: 9b4e7d2c1a60
+Revises: 5f1c2a9d7e31
+Create Date: 2026-10-18 12:40:07.118254
+
+"""
+from typing import Sequence, Union
+import sqlmodel.sql.sqltypes
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e7d2c1a60'
+down_revision: Union[str, Sequence[str], None] = '5f1c2a9d7e31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Веса: title (A) > original_title (B) > description (C).
+# Конфигурация 'simple' без стемминга: названия бывают на любом языке.
+SEARCH_VECTOR = (
+    "(setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(original_title, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'C'))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        # Индекс по выражению, а не по STORED-колонке: ADD COLUMN ... GENERATED
+        # переписал бы всю таблицу под ACCESS EXCLUSIVE. Выражение должно
+        # совпадать с movie_search.SEARCH_VECTOR, иначе планировщик не возьмёт индекс.
+        op.create_index(
+            'ix_movie_search_vector',
+            'movie',
+            [sa.text(SEARCH_VECTOR)],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_movie_title_trgm',
+            'movie',
+            ['title'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_movie_title_trgm',
+            table_name='movie',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_movie_search_vector',
+            table_name='movie',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
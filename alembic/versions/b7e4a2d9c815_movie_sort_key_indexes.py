@@ -0,0 +1,59 @@
+"""movie sort key indexes with NULL floor
+
+Revision ID: b7e4a2d9c815
+Revises: a6d1f4c83e90
+Create Date: 2026-10-18 17:05:12.406331
+
+"""
+from typing import Sequence, Union
+import sqlmodel.sql.sqltypes
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4a2d9c815'
+down_revision: Union[str, Sequence[str], None] = 'a6d1f4c83e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Лента newest/popular идёт по (coalesce(key, floor), id), чтобы фильмы без
+    # ключа не выпадали. Выражения должны совпадать с movie_repo.MOVIE_SORT_FLOORS,
+    # иначе планировщик не возьмёт индекс для seek и ORDER BY.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_movie_popularity_sort',
+            'movie',
+            [sa.text("coalesce(popularity, -1.0)"), 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_movie_released_on_sort',
+            'movie',
+            [sa.text("coalesce(released_on, '0001-01-01')"), 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_movie_released_on_sort',
+            table_name='movie',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_movie_popularity_sort',
+            table_name='movie',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,108 @@
+"""movie released_on date
+
+Revision ID: c3d81f6a2b94
+Revises: 9b4e7d2c1a60
+Create Date: 2026-10-18 15:21:44.905316
+
+"""
+from datetime import date
+from typing import Sequence, Union
+import sqlmodel.sql.sqltypes
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d81f6a2b94'
+down_revision: Union[str, Sequence[str], None] = '9b4e7d2c1a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+movie_table = sa.table(
+    'movie',
+    sa.column('id', sa.Integer),
+    sa.column('release_date', sa.String),
+    sa.column('released_on', sa.Date),
+)
+
+
+def _parse_release_date(value: str | None) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+def _backfill_released_on(bind) -> None:
+    # Keyset-проход по id небольшими пачками: каждая пачка коммитится отдельно,
+    # поэтому строки блокируются ненадолго, а таблица movie целиком — никогда.
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(movie_table.c.id, movie_table.c.release_date)
+            .where(movie_table.c.id > last_id)
+            .order_by(movie_table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        values = [
+            {'b_id': row.id, 'b_released_on': released_on}
+            for row in rows
+            if (released_on := _parse_release_date(row.release_date)) is not None
+        ]
+        if values:
+            bind.execute(
+                movie_table.update()
+                .where(movie_table.c.id == sa.bindparam('b_id'))
+                .values(released_on=sa.bindparam('b_released_on')),
+                values,
+            )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable-колонка без default: в Postgres это изменение только метаданных
+    op.add_column('movie', sa.Column('released_on', sa.Date(), nullable=True))
+    with op.get_context().autocommit_block():
+        _backfill_released_on(op.get_bind())
+        op.create_index(
+            'ix_movie_released_on_id',
+            'movie',
+            ['released_on', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # keyset по newest теперь идёт по released_on
+        op.drop_index(
+            'ix_movie_release_date_id',
+            table_name='movie',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_movie_release_date_id',
+            'movie',
+            ['release_date', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_movie_released_on_id',
+            table_name='movie',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('movie', 'released_on')
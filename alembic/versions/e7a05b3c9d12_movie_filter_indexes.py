@@ -0,0 +1,56 @@
+"""movie filter indexes
+
+Revision ID: e7a05b3c9d12
+Revises: c3d81f6a2b94
+Create Date: 2026-10-18 17:03:52.661902
+
+"""
+from typing import Sequence, Union
+import sqlmodel.sql.sqltypes
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a05b3c9d12'
+down_revision: Union[str, Sequence[str], None] = 'c3d81f6a2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_movie_category_id_adult_id',
+            'movie',
+            ['category_id', 'adult', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_moviegenrelink_genre_id_movie_id',
+            'moviegenrelink',
+            ['genre_id', 'movie_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_moviegenrelink_genre_id_movie_id',
+            table_name='moviegenrelink',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_movie_category_id_adult_id',
+            table_name='movie',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
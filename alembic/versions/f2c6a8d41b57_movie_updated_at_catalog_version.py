@@ -0,0 +1,49 @@
+"""movie updated_at and catalog version
+
+Revision ID: f2c6a8d41b57
+Revises: e7a05b3c9d12
+Create Date: 2026-10-18 18:12:40.318274
+
+"""
+from typing import Sequence, Union
+import sqlmodel.sql.sqltypes
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c6a8d41b57'
+down_revision: Union[str, Sequence[str], None] = 'e7a05b3c9d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # now() стабилен в пределах транзакции: Postgres 11+ добавляет колонку
+    # без переписывания таблицы, существующие строки получают время миграции
+    op.add_column(
+        'movie',
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=True,
+        ),
+    )
+    catalogversion = op.create_table(
+        'catalogversion',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute(
+        catalogversion.insert().values(id=1, version=0, updated_at=sa.func.now())
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalogversion')
+    op.drop_column('movie', 'updated_at')
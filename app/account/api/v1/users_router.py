@@ -7,7 +7,9 @@ from app.account.repositories import user_repo
 
 from ...schemas import user as schms
 from ...services import auth_service, user_service, upload_service
+from app.core.config import settings
 from app.core.responses import BaseApiResponse
+from app.core.uploads import limited_upload_route
 from ...security.jwt_tokens import (
     create_access_token,
     create_refresh_token,
@@ -121,16 +123,27 @@ async def get_user_details(current_user: CurrentUserDep, session: SessionDep):
     return BaseApiResponse.ok(data=schemadetails, message="Succesfully")
 
 
-@users_router.post("/profile-image", response_model=dict)
 async def upload_avatar(
     session: SessionDep,
     current_user: CurrentUserDep,
     file: UploadFile = File(...),
 ):
-    avatar_url = await upload_service.upload_user_image(session, current_user, file)
+    avatar_url = await upload_service.upload_user_image(
+        session, current_user.id, file
+    )
     return BaseApiResponse.ok(data=avatar_url, message="Avatar uploaded")
 
 
+# Лимит размера и очередь загрузок проверяются до разбора multipart
+users_router.add_api_route(
+    "/profile-image",
+    upload_avatar,
+    methods=["POST"],
+    response_model=BaseApiResponse[str],
+    route_class_override=limited_upload_route(settings.AVATAR_MAX_UPLOAD_MB),
+)
+
+
 @users_router.get("/", response_model=BaseApiResponse[list[schms.UserRead]])
 async def list_user(session: SessionDep):
     get_list = await user_repo.get_all_users(session=session)
@@ -0,0 +1,47 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class AdvisoryLock:
+    """Одна задача на весь кластер воркеров (импорт каталога, чистка медиа).
+
+    В Postgres — сессионный pg_try_advisory_lock(key) на отдельном соединении
+    (работает между воркерами и хостами), иначе — блокировка процесса.
+    """
+
+    def __init__(self, engine: AsyncEngine, key: int):
+        self.engine = engine
+        self.key = key
+        self._local = asyncio.Lock()
+
+    @asynccontextmanager
+    async def hold(self) -> AsyncIterator[bool]:
+        if self.engine.dialect.name != "postgresql":
+            if self._local.locked():
+                yield False
+                return
+            async with self._local:
+                yield True
+            return
+
+        async with self.engine.connect() as connection:
+            acquired = await connection.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            )
+            await connection.commit()
+            try:
+                yield bool(acquired)
+            finally:
+                if acquired:
+                    await connection.execute(
+                        text("SELECT pg_advisory_unlock(:key)"), {"key": self.key}
+                    )
+                    await connection.commit()
+
+    async def is_held(self) -> bool:
+        async with self.hold() as acquired:
+            return not acquired
@@ -1,6 +1,7 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
@@ -11,7 +12,30 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int =  7
+    # Служебные эндпоинты /internal/* принимают только заголовок
+    # X-Internal-Token с этим значением; пусто — эндпоинты выключены
+    INTERNAL_API_TOKEN: str = ""
  
+    # Пул соединений на воркер: (DB_POOL_SIZE + DB_MAX_OVERFLOW) * воркеры
+    # gunicorn должно укладываться в max_connections Postgres
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Кэш подготовленных запросов asyncpg; 0 — за pgbouncer (transaction mode)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # statement_timeout на стороне сервера, мс; 0 — без ограничения
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000
+    # Лог всех SQL — только при DEBUG
+    DB_ECHO: bool = False
+    # Реплики только для чтения (JSON-список URL); пусто — всё идёт в primary
+    DATABASE_REPLICA_URLS: list[str] = []
+    DB_REPLICA_HEALTH_INTERVAL_SECONDS: float = 5.0
+    DB_REPLICA_HEALTH_TIMEOUT_SECONDS: float = 2.0
+    # После записи чтения клиента ещё столько секунд идут в primary
+    DB_READ_AFTER_WRITE_SECONDS: float = 5.0
+
     SMTP_USERNAME: str | None = None
     SMTP_PASSWORD: str | None = None
     SMTP_HOST: str = "smtp.example.com"
@@ -19,6 +43,120 @@ class Settings(BaseSettings):
     EMAIL_FROM: str = "noreply@example.com"
     BASE_URL: str = "http://localhost:8000"
 
+    # Кэш total_items для offset-пагинации фильмов
+    MOVIE_COUNT_CACHE_TTL: int = 60
+    MOVIE_COUNT_CACHE_SIZE: int = 1024
+    # Выше этого числа строк (по оценке планировщика) count_mode=auto отдаёт оценку
+    MOVIE_COUNT_ESTIMATE_THRESHOLD: int = 10_000
+    # Готовые SELECT листингов фильмов: по одному на форму фильтров
+    MOVIE_STATEMENT_CACHE_SIZE: int = 256
+
+    # Прогрев воркера при старте (app/warmup.py); до его конца /readyz отдаёт 503.
+    # WARMUP_DB_CONNECTIONS — сколько соединений пула открыть, 0 — DB_POOL_SIZE.
+    WARMUP_ENABLED: bool = True
+    WARMUP_DB_CONNECTIONS: int = 0
+    WARMUP_TIMEOUT_SECONDS: float = 60.0
+    WARMUP_RETRY_SECONDS: float = 5.0
+    # Справочники и первые страницы: заполняют кэш ответов до первого запроса
+    WARMUP_PATHS: list[str] = [
+        "/api/v1/genres/",
+        "/api/v1/categories/category/",
+        "/api/v1/movies/",
+        "/api/v1/movies/get_movies",
+    ]
+
+    # Bulk-запись фильмов (NDJSON): строк в одной транзакции и предел длины строки
+    MOVIE_BULK_BATCH_SIZE: int = 500
+    MOVIE_BULK_MAX_LINE_BYTES: int = 256 * 1024
+
+    # Постеры/бэкдропы: ресайз в пуле процессов, ширины рендишенов в пикселях
+    IMAGE_WORKERS: int = 2
+    IMAGE_MAX_PENDING_JOBS: int = 8
+    IMAGE_MAX_UPLOAD_MB: int = 20
+    POSTER_WIDTHS: list[int] = [185, 342, 780]
+    BACKDROP_WIDTHS: list[int] = [300, 780, 1280]
+
+    # Хранилище медиа: ключ файла = sha256 содержимого (app/shared/media).
+    # local — файлы в MEDIA_LOCAL_ROOT (раздаётся как /static),
+    # s3 — любой S3-совместимый бакет (AWS, MinIO), ссылки от MEDIA_S3_PUBLIC_URL.
+    MEDIA_STORAGE: Literal["local", "s3"] = "local"
+    MEDIA_LOCAL_ROOT: str = "app/static"
+    # Временные файлы загрузок и рендишенов до переноса в хранилище
+    MEDIA_TMP_DIR: str = "media_tmp"
+    MEDIA_S3_ENDPOINT: str = "http://localhost:9000"
+    MEDIA_S3_BUCKET: str = "moviestra-media"
+    MEDIA_S3_REGION: str = "us-east-1"
+    MEDIA_S3_ACCESS_KEY: str | None = None
+    MEDIA_S3_SECRET_KEY: str | None = None
+    MEDIA_S3_PUBLIC_URL: str = "http://localhost:9000/moviestra-media"
+
+    # Ресайз на лету GET /img/{width}/{key}: разрешённые ширины и дисковый LRU-кэш
+    IMAGE_RESIZE_WIDTHS: list[int] = [92, 154, 185, 342, 500, 780, 1280]
+    IMAGE_RESIZE_CACHE_DIR: str = "media_cache/img"
+    IMAGE_RESIZE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # TMDB API (get_movieslist): токен чтения v4 только из окружения
+    TMDB_API_URL: str = "https://api.themoviedb.org/3"
+    TMDB_API_TOKEN: str = ""
+    TMDB_REQUESTS_PER_SECOND: float = 40.0
+    TMDB_FETCH_CONCURRENCY: int = 10
+    TMDB_FETCH_RETRIES: int = 5
+    TMDB_FETCH_BACKOFF_SECONDS: float = 1.0
+    TMDB_FETCH_TIMEOUT_SECONDS: float = 30.0
+
+    # Импорт дампа TMDB (get_movieslist.save_movies_to_movies_category)
+    TMDB_IMPORT_BATCH_SIZE: int = 1000
+
+    # Зеркалирование картинок TMDB в своё хранилище (mirror_tmdb_images)
+    TMDB_IMAGE_BASE_URL: str = "https://image.tmdb.org/t/p/original"
+    TMDB_MIRROR_CONCURRENCY: int = 8
+    TMDB_MIRROR_RETRIES: int = 3
+    TMDB_MIRROR_BACKOFF_SECONDS: float = 0.5
+    TMDB_MIRROR_BATCH_SIZE: int = 100
+    TMDB_MIRROR_TIMEOUT_SECONDS: float = 30.0
+
+    # Раздача /static. MEDIA_SERVE_STATIC=False — файлы отдаёт CDN/nginx напрямую.
+    # x-accel-redirect (nginx) / x-sendfile (Apache): приложение отвечает только
+    # заголовком, байты отдаёт прокси; для nginx нужен internal location
+    # MEDIA_ACCEL_REDIRECT_PREFIX с alias на MEDIA_LOCAL_ROOT.
+    MEDIA_SERVE_STATIC: bool = True
+    MEDIA_SENDFILE_MODE: Literal["off", "x-accel-redirect", "x-sendfile"] = "off"
+    MEDIA_ACCEL_REDIRECT_PREFIX: str = "/_protected_media/"
+
+    # Чистильщик осиротевших файлов (app/shared/media/sweeper.py): удаляет
+    # файлы без ссылок из Movie/AccountUser, которые старше grace-периода.
+    # Проход делает один воркер на кластер (pg_advisory_lock), остальные ждут
+    # следующего интервала. Интервал 0 — не запускать в фоне
+    # (только python -m app.management.sweep_media).
+    MEDIA_SWEEP_INTERVAL_SECONDS: int = 6 * 60 * 60
+    MEDIA_SWEEP_GRACE_SECONDS: int = 24 * 60 * 60
+    MEDIA_SWEEP_BATCH_SIZE: int = 1000
+    MEDIA_SWEEP_DELETES_PER_SECOND: float = 50.0
+    MEDIA_SWEEP_DRY_RUN: bool = False
+    MEDIA_SWEEP_PREFIXES: list[str] = ["avatars", "posters", "backdrops"]
+
+    # Загрузки файлов: аватар и одновременные загрузки на один воркер.
+    # Сверх UPLOAD_MAX_ACTIVE загрузки ждут в очереди (не больше UPLOAD_MAX_WAITING
+    # и не дольше UPLOAD_WAIT_TIMEOUT секунд), остальные получают 503.
+    AVATAR_MAX_UPLOAD_MB: int = 2
+    UPLOAD_MAX_ACTIVE: int = 4
+    UPLOAD_MAX_WAITING: int = 16
+    UPLOAD_WAIT_TIMEOUT: float = 5.0
+
+    # Кэш готовых JSON-ответов каталога (app/core/response_cache.py)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024
+    # TTL в секундах по имени маршрута; 0 или отсутствие ключа — не кэшировать
+    RESPONSE_CACHE_TTLS: dict[str, int] = {
+        "movies_list": 30,
+        "movies_cursor": 30,
+        "movie_detail": 300,
+        "category_list": 300,
+        "category_movies": 60,
+        "genres_list": 3600,
+    }
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -78,6 +78,18 @@ class UserAccessForbiddenError(AppBaseException):
     message = "User does not have permission to access this resource"
 
 
+class InvalidInternalTokenError(AppBaseException):
+    status_code = status.HTTP_401_UNAUTHORIZED
+    code = "INVALID_INTERNAL_TOKEN"
+    message = "Missing or invalid X-Internal-Token header"
+
+
+class InternalApiDisabledError(AppBaseException):
+    status_code = status.HTTP_403_FORBIDDEN
+    code = "INTERNAL_API_DISABLED"
+    message = "Internal API is disabled, set INTERNAL_API_TOKEN to enable it"
+
+
 class UserAlreadyExistsError(AppBaseException):
     status_code = status.HTTP_409_CONFLICT
     code = "USER_ALREADY_EXISTS"
@@ -98,3 +110,21 @@ class FileTooLargeError(AppBaseException):
 
     def __init__(self, limit_mb: int):
         self.message = f"File must be smaller than {limit_mb} MB"
+
+
+class UploadsBusyError(AppBaseException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    code = "UPLOADS_BUSY"
+    message = "Too many uploads in progress, try again later"
+
+
+class StorageUnavailableError(AppBaseException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    code = "STORAGE_UNAVAILABLE"
+    message = "Media storage is unavailable, try again later"
+
+
+class ImportAlreadyRunningError(AppBaseException):
+    status_code = status.HTTP_409_CONFLICT
+    code = "IMPORT_ALREADY_RUNNING"
+    message = "Another catalog import is already running"
@@ -0,0 +1,64 @@
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from tempfile import SpooledTemporaryFile
+
+from fastapi.responses import StreamingResponse
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    """Режет поток байтов на строки NDJSON, не держа в памяти всё тело.
+
+    Отдаёт (номер строки с 1, байты строки); пустые строки пропускаются,
+    а вместо строки длиннее max_line_bytes отдаётся None.
+    """
+    buffer = bytearray()
+    overflow = False
+    line_no = 0
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            piece = chunk[start:] if end == -1 else chunk[start:end]
+            if not overflow:
+                buffer += piece
+                if len(buffer) > max_line_bytes:
+                    overflow = True
+                    buffer.clear()
+            if end == -1:
+                break
+            line_no += 1
+            line = bytes(buffer).strip()
+            if overflow:
+                yield line_no, None
+            elif line:
+                yield line_no, line
+            buffer.clear()
+            overflow = False
+            start = end + 1
+
+    line = bytes(buffer).strip()
+    if overflow or line:
+        yield line_no + 1, None if overflow else line
+
+
+def _iter_spooled(file, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    with file:
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+async def spooled_ndjson_response(
+    lines: AsyncIterable[bytes], max_memory_bytes: int = 1024 * 1024
+) -> StreamingResponse:
+    """Собирает строки ответа во временный файл (в памяти до max_memory_bytes,
+    дальше на диске) и отдаёт его потоком.
+
+    Тело запроса нельзя дочитывать внутри StreamingResponse: Starlette
+    параллельно слушает disconnect и забирает сообщения receive().
+    """
+    spool = SpooledTemporaryFile(max_size=max_memory_bytes)
+    async for line in lines:
+        spool.write(line)
+    spool.seek(0)
+    return StreamingResponse(_iter_spooled(spool), media_type="application/x-ndjson")
@@ -0,0 +1,43 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from typing import Any
+
+from app.core.config import settings
+from app.core.exceptions import InvalidInputError
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(body: str) -> str:
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(), body.encode(), hashlib.sha256
+    ).digest()
+    return _b64encode(digest[:16])
+
+
+def encode_cursor(payload: dict[str, Any]) -> str:
+    """Упаковывает позицию keyset-пагинации в непрозрачный подписанный токен."""
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    return f"{body}.{_sign(body)}"
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    body, _, signature = cursor.partition(".")
+    if not signature or not hmac.compare_digest(signature, _sign(body)):
+        raise InvalidInputError(field="cursor", message="Invalid pagination cursor")
+    try:
+        payload = json.loads(_b64decode(body))
+    except (binascii.Error, ValueError):
+        raise InvalidInputError(field="cursor", message="Invalid pagination cursor")
+    if not isinstance(payload, dict):
+        raise InvalidInputError(field="cursor", message="Invalid pagination cursor")
+    return payload
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов к внешнему API.
+
+    Подстраивается под ответы сервера: на 429 скорость падает вдвое и все
+    ждут Retry-After, после успешных ответов понемногу растёт обратно.
+    """
+
+    def __init__(
+        self, rate: float, capacity: float | None = None, min_rate: float = 1.0
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.throttled = 0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def throttle(self, retry_after: float | None = None) -> None:
+        now = time.monotonic()
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+        self._paused_until = max(
+            self._paused_until, now + (retry_after if retry_after else 1 / self.rate)
+        )
+        # Пауза не копит токены: после неё не должно быть всплеска запросов
+        self._updated = self._paused_until
+
+    def recover(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
@@ -0,0 +1,89 @@
+import hashlib
+import time
+from collections import OrderedDict
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PIN_COOKIE = "db_primary_until"
+
+
+def client_key(headers: Headers) -> str | None:
+    # Ключ — хэш токена: без разбора JWT и без обращения к БД
+    authorization = headers.get("authorization")
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()[:32]
+
+
+class PrimaryPins:
+    """Клиенты, которые только что писали в БД: их чтения идут в primary,
+    пока реплика может ещё не догнать запись."""
+
+    def __init__(self, window_seconds: float, max_entries: int = 100_000):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._until: OrderedDict[str, float] = OrderedDict()
+
+    def pin(self, key: str | None) -> None:
+        if key is None:
+            return
+        self._until.pop(key, None)
+        self._until[key] = time.monotonic() + self.window_seconds
+        while len(self._until) > self.max_entries:
+            self._until.popitem(last=False)
+
+    def is_pinned(self, key: str | None) -> bool:
+        if key is None:
+            return False
+        until = self._until.get(key)
+        if until is None:
+            return False
+        if until < time.monotonic():
+            del self._until[key]
+            return False
+        return True
+
+
+def pinned_by_cookie(headers: Headers) -> bool:
+    """Метка из куки работает и в других воркерах, где записи не было."""
+    cookie = SimpleCookie(headers.get("cookie", ""))
+    try:
+        return float(cookie[PIN_COOKIE].value) > time.time()
+    except (KeyError, ValueError):
+        return False
+
+
+class ReadAfterWriteMiddleware:
+    """Ставит куку-метку на ответ запроса, который закоммитил запись.
+
+    Флаг request.state.db_wrote выставляет сессия при commit; запись,
+    сделанная уже во время стриминга ответа, метится только в памяти воркера.
+    """
+
+    def __init__(self, app: ASGIApp, window_seconds: float):
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            wrote = scope.get("state", {}).get("db_wrote")
+            if message["type"] == "http.response.start" and wrote:
+                until = time.time() + self.window_seconds
+                max_age = int(self.window_seconds) + 1
+                cookie = (
+                    f"{PIN_COOKIE}={until:.3f}; Max-Age={max_age}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
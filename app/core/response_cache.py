@@ -0,0 +1,206 @@
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.core.conditional import Validators, is_not_modified, not_modified_response
+from app.core.config import settings
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    tags: frozenset[str]
+    expires_at: float
+    status_code: int = 200
+    etag: str | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class RouteStats:
+    hits: int = 0
+    misses: int = 0
+    not_modified: int = 0
+
+
+class ResponseCache:
+    """In-process кэш сериализованных ответов с тегами и LRU по размеру в байтах.
+
+    Живёт в памяти одного воркера: invalidate() чистит только его копию,
+    остальные воркеры отдадут устаревший ответ не дольше TTL маршрута.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.size_bytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._tag_index: dict[str, set[str]] = {}
+        self._stats: dict[str, RouteStats] = {}
+
+    def get(
+        self, route: str, key: str, etag: str | None = None
+    ) -> CachedResponse | None:
+        stats = self.route_stats(route)
+        entry = self._entries.get(key)
+        # Запись с другим ETag собрана до чужой записи в каталог (другой воркер)
+        if entry is not None and (
+            entry.expires_at < time.monotonic()
+            or (etag is not None and entry.etag != etag)
+        ):
+            self._remove(key)
+            entry = None
+        if entry is None:
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        tags: Iterable[str],
+        ttl: float,
+        status_code: int = 200,
+        etag: str | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        if ttl <= 0 or len(body) > self.max_entry_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        entry = CachedResponse(
+            body=body,
+            tags=frozenset(tags),
+            expires_at=time.monotonic() + ttl,
+            status_code=status_code,
+            etag=etag,
+            headers=headers or {},
+        )
+        self._entries[key] = entry
+        self.size_bytes += len(body)
+        for tag in entry.tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+        while self.size_bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, *tags: str) -> int:
+        keys = set().union(*(self._tag_index.get(tag, set()) for tag in tags))
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tag_index.clear()
+        self.size_bytes = 0
+
+    def route_stats(self, route: str) -> RouteStats:
+        return self._stats.setdefault(route, RouteStats())
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "routes": {
+                route: {
+                    "hits": stats.hits,
+                    "misses": stats.misses,
+                    "not_modified": stats.not_modified,
+                }
+                for route, stats in self._stats.items()
+            },
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size_bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.RESPONSE_CACHE_MAX_ENTRY_BYTES,
+)
+
+
+def make_cache_key(request: Request) -> str:
+    # Порядок и пустые значения query-параметров не влияют на ключ
+    params = sorted(
+        (name, value) for name, value in request.query_params.multi_items() if value
+    )
+    query = "&".join(f"{name}={value}" for name, value in params)
+    return f"{request.url.path}?{query}"
+
+
+def route_ttl(route: str) -> int:
+    return settings.RESPONSE_CACHE_TTLS.get(route, 0)
+
+
+def cached_response(
+    request: Request, route: str, validators: Validators | None = None
+) -> Response | None:
+    """304 по If-None-Match/If-Modified-Since или готовые байты из кэша.
+
+    None — ответа нет, обработчик должен выполнить запрос и вызвать
+    cache_response().
+    """
+    if validators is not None and is_not_modified(request, validators):
+        response_cache.route_stats(route).not_modified += 1
+        return not_modified_response(validators)
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    entry = response_cache.get(
+        route, make_cache_key(request), etag=validators.etag if validators else None
+    )
+    if entry is None:
+        return None
+    return Response(
+        content=entry.body,
+        status_code=entry.status_code,
+        media_type="application/json",
+        headers={**entry.headers, "X-Cache": "HIT"},
+    )
+
+
+def cache_response(
+    request: Request,
+    route: str,
+    payload: BaseModel,
+    tags: Iterable[str],
+    validators: Validators | None = None,
+) -> Response:
+    """Сериализует ответ один раз и кладёт байты в кэш под тегами."""
+    body = payload.model_dump_json(by_alias=True).encode()
+    headers = validators.headers() if validators is not None else {}
+    if settings.RESPONSE_CACHE_ENABLED:
+        response_cache.set(
+            make_cache_key(request),
+            body,
+            tags,
+            route_ttl(route),
+            etag=validators.etag if validators is not None else None,
+            headers=headers,
+        )
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**headers, "X-Cache": "MISS"},
+    )
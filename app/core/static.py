@@ -0,0 +1,117 @@
+import mimetypes
+import os
+import re
+from typing import Literal
+
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope
+
+from app.shared.media.storage import IMMUTABLE_CACHE_CONTROL
+
+SendfileMode = Literal["off", "x-accel-redirect", "x-sendfile"]
+
+# Имя = sha256 содержимого (app/shared/media): байты по такому URL не меняются
+CONTENT_HASH_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Сжатые заранее варианты ищем только для текстовых форматов: картинки уже сжаты
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_SUFFIXES = {".svg", ".json", ".txt", ".css", ".js", ".html", ".xml"}
+
+
+def _accepted_encodings(headers: Headers) -> set[str]:
+    accepted = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.lower())
+    return accepted
+
+
+class MediaStaticFiles(StaticFiles):
+    """StaticFiles для медиа: кэш-заголовки, сжатые варианты, отдача через прокси.
+
+    - файлы с хэшем в имени отдаются с Cache-Control immutable на год,
+      остальные — no-cache с ETag/Last-Modified;
+    - при Accept-Encoding br/gzip отдаётся соседний .br/.gz, если он есть;
+    - Range и HEAD обрабатывает FileResponse;
+    - sendfile_mode x-accel-redirect (nginx) / x-sendfile (Apache, lighttpd):
+      Python отвечает только заголовком, байты отдаёт фронт-прокси.
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str,
+        sendfile_mode: SendfileMode = "off",
+        accel_redirect_prefix: str = "/_protected_media/",
+        **kwargs,
+    ):
+        super().__init__(directory=directory, **kwargs)
+        self.sendfile_mode = sendfile_mode
+        self.accel_redirect_prefix = accel_redirect_prefix.rstrip("/") + "/"
+
+    @staticmethod
+    def cache_control(full_path: str) -> str:
+        if CONTENT_HASH_NAME.match(os.path.basename(full_path)):
+            return IMMUTABLE_CACHE_CONTROL
+        return REVALIDATE_CACHE_CONTROL
+
+    def offload_response(self, full_path: str) -> Response:
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        headers = {"Cache-Control": self.cache_control(full_path)}
+        if self.sendfile_mode == "x-accel-redirect":
+            relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+            headers["X-Accel-Redirect"] = self.accel_redirect_prefix + relative
+        else:
+            headers["X-Sendfile"] = os.path.abspath(full_path)
+        return Response(media_type=media_type, headers=headers)
+
+    def precompressed_variant(
+        self, full_path: str, request_headers: Headers
+    ) -> tuple[str, os.stat_result, str] | None:
+        if os.path.splitext(full_path)[1] not in COMPRESSIBLE_SUFFIXES:
+            return None
+        accepted = _accepted_encodings(request_headers)
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                stat_result = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            return full_path + suffix, stat_result, encoding
+        return None
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        full_path = os.fspath(full_path)
+        if self.sendfile_mode != "off":
+            return self.offload_response(full_path)
+
+        request_headers = Headers(scope=scope)
+        headers = {"Cache-Control": self.cache_control(full_path)}
+        media_type = mimetypes.guess_type(full_path)[0]
+        variant = self.precompressed_variant(full_path, request_headers)
+        if os.path.splitext(full_path)[1] in COMPRESSIBLE_SUFFIXES:
+            headers["Vary"] = "Accept-Encoding"
+        if variant is not None:
+            full_path, stat_result, encoding = variant
+            headers["Content-Encoding"] = encoding
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,116 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException
+from starlette.types import Message, Receive
+
+from app.core.config import settings
+from app.core.exceptions import FileTooLargeError, UploadsBusyError
+
+# Запас на заголовки multipart и прочие поля формы сверх самого файла
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadLimiter:
+    """Ограничивает число одновременных загрузок в одном воркере.
+
+    До max_active загрузок идут сразу, следующие max_waiting ждут слот
+    не дольше wait_timeout, остальные сразу получают UploadsBusyError.
+    """
+
+    def __init__(self, max_active: int, max_waiting: int, wait_timeout: float):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.active = 0
+        self.waiting = 0
+        self.shed = 0
+        self._semaphore = asyncio.Semaphore(max_active)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            self.shed += 1
+            raise UploadsBusyError()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.wait_timeout)
+        except TimeoutError:
+            self.shed += 1
+            raise UploadsBusyError()
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+
+upload_limiter = UploadLimiter(
+    max_active=settings.UPLOAD_MAX_ACTIVE,
+    max_waiting=settings.UPLOAD_MAX_WAITING,
+    wait_timeout=settings.UPLOAD_WAIT_TIMEOUT,
+)
+
+
+def check_content_length(request: Request, max_bytes: int, limit_mb: int) -> None:
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise FileTooLargeError(limit_mb=limit_mb)
+
+
+def limit_receive(receive: Receive, max_bytes: int, limit_mb: int) -> Receive:
+    """receive(), который обрывает чтение тела после max_bytes — на случай
+    chunked-запросов и неверного Content-Length."""
+    received = 0
+
+    async def limited() -> Message:
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                raise FileTooLargeError(limit_mb=limit_mb)
+        return message
+
+    return limited
+
+
+def limited_upload_route(
+    limit_mb: int, limiter: UploadLimiter = upload_limiter
+) -> type[APIRoute]:
+    """Класс маршрута для загрузок: проверки до разбора multipart.
+
+    FastAPI читает форму раньше зависимостей, поэтому Content-Length, лимит
+    тела и очередь загрузок проверяются вокруг обработчика маршрута.
+    """
+    max_bytes = limit_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+
+    class LimitedUploadRoute(APIRoute):
+        def get_route_handler(self):
+            handler = super().get_route_handler()
+
+            async def limited_handler(request: Request) -> Response:
+                check_content_length(request, max_bytes, limit_mb)
+                async with limiter.slot():
+                    limited_request = Request(
+                        request.scope,
+                        limit_receive(request.receive, max_bytes, limit_mb),
+                    )
+                    try:
+                        return await handler(limited_request)
+                    except HTTPException as exc:
+                        # Ошибки при разборе тела FastAPI заворачивает в 400
+                        if isinstance(exc.__cause__, FileTooLargeError):
+                            raise exc.__cause__
+                        raise
+
+            return limited_handler
+
+    return LimitedUploadRoute
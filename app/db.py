@@ -1,27 +1,320 @@
-import os
-
-from dotenv import load_dotenv
+import asyncio
+import itertools
+import logging
+import time
+from threading import Lock
+from typing import AsyncGenerator
 
+from fastapi import Request
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from typing import AsyncGenerator
+from app.core.config import settings
+from app.core.read_after_write import PrimaryPins, client_key, pinned_by_cookie
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Ожидание свободного соединения из пула: сколько раз, сколько всего
+    и максимум, плюс отказы по pool_timeout. Живые размеры пула — из самого пула."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waited_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self._lock = Lock()
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.waited_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            average = self.waited_seconds / self.checkouts if self.checkouts else 0.0
+            return {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                # QueuePool считает overflow от -pool_size: минус — ещё не открытые
+                "overflow": max(0, pool.overflow()),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(average * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+def _hit_rate(hits: int, misses: int) -> float | None:
+    return round(hits / (hits + misses), 4) if hits + misses else None
 
 
+class StatementMetrics:
+    """Попадания в кэш компиляции SQLAlchemy и в кэш prepared statements
+    asyncpg (он свой у каждого соединения) по всем движкам процесса."""
 
-load_dotenv()  # Загружаем переменные из .env
+    def __init__(self):
+        self.compiled_hits = 0
+        self.compiled_misses = 0
+        self.uncached = 0
+        self.prepared_hits = 0
+        self.prepared_misses = 0
+        self._lock = Lock()
 
+    def before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        # У asyncpg-адаптера кэш — LRU по тексту SQL
+        prepared = getattr(
+            conn.connection.dbapi_connection, "_prepared_statement_cache", None
+        )
+        with self._lock:
+            if context.cache_hit is CacheStats.CACHE_HIT:
+                self.compiled_hits += 1
+            elif context.cache_hit is CacheStats.CACHE_MISS:
+                self.compiled_misses += 1
+            else:
+                self.uncached += 1
+            if prepared is not None:
+                if statement in prepared:
+                    self.prepared_hits += 1
+                else:
+                    self.prepared_misses += 1
 
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "compiled_hits": self.compiled_hits,
+                "compiled_misses": self.compiled_misses,
+                "compiled_hit_rate": _hit_rate(
+                    self.compiled_hits, self.compiled_misses
+                ),
+                "uncached": self.uncached,
+                "prepared_hits": self.prepared_hits,
+                "prepared_misses": self.prepared_misses,
+                "prepared_hit_rate": _hit_rate(
+                    self.prepared_hits, self.prepared_misses
+                ),
+            }
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_async_engine(DATABASE_URL, echo=True)
+
+statement_metrics = StatementMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    # Свои метрики у каждого пула (primary и реплики); переживают recreate()
+    metrics = pool_metrics
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+
+def engine_options(url: str) -> dict:
+    """Один движок на процесс; параметры пула и сервера — из Settings."""
+    options = {
+        "echo": settings.DEBUG and settings.DB_ECHO,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if make_url(url).get_driver_name() == "asyncpg":
+        server_settings = {"application_name": settings.PROJECT_NAME}
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        options["connect_args"] = {
+            # 0 — для pgbouncer в transaction-режиме
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        }
+    return options
+
+
+def make_engine(url: str, metrics: PoolMetrics) -> AsyncEngine:
+    created = create_async_engine(url, **engine_options(url))
+    created.pool.metrics = metrics
+    event.listen(
+        created.sync_engine,
+        "before_cursor_execute",
+        statement_metrics.before_cursor_execute,
+    )
+    return created
+
+
+engine = make_engine(settings.DATABASE_URL, pool_metrics)
 
 
 async_session = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Ошибки соединения, после которых реплика считается недоступной
+REPLICA_DOWN_ERRORS = (OSError, exc.InterfaceError, exc.OperationalError)
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReplicaRouter:
+    """Чтения по кругу между живыми репликами.
+
+    Живость проверяет фоновый SELECT 1 с таймаутом; ошибка соединения
+    в запросе снимает реплику из ротации до следующей удачной проверки.
+    """
+
+    def __init__(self, urls: list[str]):
+        self.metrics = [PoolMetrics() for _ in urls]
+        self.engines = [make_engine(url, m) for url, m in zip(urls, self.metrics)]
+        self.sessions = [
+            async_sessionmaker(bind=e, class_=AsyncSession, expire_on_commit=False)
+            for e in self.engines
+        ]
+        self.healthy = [True] * len(urls)
+        self.reads = [0] * len(urls)
+        self.fallbacks = 0
+        self._turn = itertools.count()
+
+    def pick(self) -> int | None:
+        count = len(self.engines)
+        start = next(self._turn)
+        for offset in range(count):
+            index = (start + offset) % count
+            if self.healthy[index]:
+                self.reads[index] += 1
+                return index
+        self.fallbacks += 1
+        return None
+
+    def mark_down(self, index: int) -> None:
+        if self.healthy[index]:
+            logger.warning("Replica %s is down, reading from primary", index)
+        self.healthy[index] = False
+
+    async def check(self, index: int) -> bool:
+        try:
+            async with asyncio.timeout(settings.DB_REPLICA_HEALTH_TIMEOUT_SECONDS):
+                async with self.engines[index].connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+        except (TimeoutError, *REPLICA_DOWN_ERRORS):
+            self.mark_down(index)
+            return False
+        if not self.healthy[index]:
+            logger.info("Replica %s is back", index)
+        self.healthy[index] = True
+        return True
+
+    async def check_all(self) -> list[bool]:
+        return list(
+            await asyncio.gather(*(self.check(i) for i in range(len(self.engines))))
+        )
+
+    async def run_health_checks_forever(self, interval: float) -> None:
+        while True:
+            await self.check_all()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.engines:
+            await replica.dispose()
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "healthy": self.healthy[index],
+                "reads": self.reads[index],
+                **self.metrics[index].snapshot(replica.pool),
+            }
+            for index, replica in enumerate(self.engines)
+        ]
+
+
+replicas = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
+primary_pins = PrimaryPins(settings.DB_READ_AFTER_WRITE_SECONDS)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_write(session: Session) -> None:
+    request = session.info.get("request")
+    if request is not None:
+        request.state.db_wrote = True
+        primary_pins.pin(client_key(request.headers))
+
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    return primary_pins.is_pinned(client_key(request.headers)) or pinned_by_cookie(
+        request.headers
+    )
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
+
+
+def primary_session(request: Request) -> AsyncSession:
+    """Сессия primary; commit в ней закрепляет чтения клиента за primary."""
+    session = async_session()
+    session.sync_session.info["request"] = request
+    return session
+
+
+async def get_primary_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with primary_session(request) as session:
+        yield session
+
+
+async def get_request_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """GET/HEAD — в реплику (если есть живая и клиент недавно не писал),
+    остальные методы — в primary."""
+    index = None
+    if (
+        replicas.engines
+        and request.method in SAFE_METHODS
+        and not reads_pinned_to_primary(request)
+    ):
+        index = replicas.pick()
+    if index is None:
+        async with primary_session(request) as session:
+            yield session
+        return
+    async with replicas.sessions[index]() as session:
+        try:
+            yield session
+        except REPLICA_DOWN_ERRORS:
+            replicas.mark_down(index)
+            raise
+
+
+def pool_stats() -> dict:
+    return {
+        **pool_metrics.snapshot(engine.pool),
+        "replicas": replicas.stats(),
+        "replica_fallbacks": replicas.fallbacks,
+    }
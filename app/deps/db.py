@@ -1,29 +1,18 @@
-import os
+from typing import Annotated
 
-from dotenv import load_dotenv
-
-from sqlmodel.ext.asyncio.session import AsyncSession
-
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from typing import AsyncGenerator, Annotated
 from fastapi import Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-
-load_dotenv()  # Загружаем переменные из .env
-
-
-DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_async_engine(DATABASE_URL, echo=True)
-
-
-async_session = async_sessionmaker(
-    bind=engine, class_=AsyncSession, expire_on_commit=False
+# Движок и фабрика сессий — только в app.db, чтобы в процессе был один пул
+from app.db import (  # noqa: F401
+    async_session,
+    engine,
+    get_db,
+    get_primary_db,
+    get_request_db,
 )
 
-
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session() as session:
-        yield session
-
-
-SessionDep = Annotated[AsyncSession, Depends(get_db)]
+# GET/HEAD читают из реплики, остальные методы пишут в primary
+SessionDep = Annotated[AsyncSession, Depends(get_request_db)]
+# Для редких GET, которым нужна запись или свежие данные
+PrimarySessionDep = Annotated[AsyncSession, Depends(get_primary_db)]
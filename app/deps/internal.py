@@ -0,0 +1,19 @@
+import hmac
+
+from fastapi import Header
+
+from app.core.exceptions import InternalApiDisabledError, InvalidInternalTokenError
+from .settings import SettingsDep
+
+
+async def require_internal_token(
+    settings: SettingsDep, x_internal_token: str | None = Header(default=None)
+) -> None:
+    """Доступ к служебным эндпоинтам /internal/* по общему токену."""
+    if not settings.INTERNAL_API_TOKEN:
+        raise InternalApiDisabledError()
+    # Сравнение за постоянное время: токен не подбирается по таймингу
+    if x_internal_token is None or not hmac.compare_digest(
+        x_internal_token.encode(), settings.INTERNAL_API_TOKEN.encode()
+    ):
+        raise InvalidInternalTokenError()
@@ -1,5 +1,8 @@
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from app import routers
 
 from fastapi.middleware.cors import CORSMiddleware
@@ -11,14 +14,67 @@ from app.core.exceptions import (
     app_exception_handler,
 )
 from fastapi.exceptions import RequestValidationError
-from fastapi.staticfiles import StaticFiles
+from app.core.advisory_lock import AdvisoryLock
+from app.core.config import settings
+from app.core.response_cache import response_cache
+from app.core.static import MediaStaticFiles
+from app.core.read_after_write import ReadAfterWriteMiddleware
+from app.deps.internal import require_internal_token
+from app.db import async_session, engine, pool_stats, replicas, statement_metrics
+from app.movie.repositories.movie_statements import listing_statements
+from app.movie.services.import_jobs import import_jobs
+from app.movie.services.movie_service import router as import_router
+from app.shared.media.api import image_router
+from app.shared.media.resize import image_resizer
+from app.shared.media.storage import close_media_storage, get_media_storage
+from app.shared.media.sweeper import (
+    MEDIA_SWEEP_LOCK_KEY,
+    run_sweeper_forever,
+    sweeper_metrics,
+)
+from app.utils.image_pool import shutdown_image_pool
+from app.warmup import warmup
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 👇 Выполняется при запуске
     # SQLModel.metadata.create_all(engine)
+    sweeper_task = None
+    if settings.MEDIA_SWEEP_INTERVAL_SECONDS > 0:
+        # Чистка осиротевших файлов идёт в фоне, а не в запросах загрузки
+        sweeper_task = asyncio.create_task(
+            run_sweeper_forever(
+                async_session,
+                get_media_storage(),
+                AdvisoryLock(engine, MEDIA_SWEEP_LOCK_KEY),
+            )
+        )
+    replica_task = None
+    if replicas.engines:
+        replica_task = asyncio.create_task(
+            replicas.run_health_checks_forever(
+                settings.DB_REPLICA_HEALTH_INTERVAL_SECONDS
+            )
+        )
+    # Воркер принимает соединения сразу, трафик на него пускает /readyz
+    warmup_task = asyncio.create_task(warmup.run_until_ready(app))
     yield
+    warmup_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup_task
+    if replica_task is not None:
+        replica_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await replica_task
+    await replicas.dispose()
+    if sweeper_task is not None:
+        sweeper_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await sweeper_task
+    await import_jobs.shutdown()
+    shutdown_image_pool()
+    await close_media_storage()
 
 
 app = FastAPI(
@@ -37,6 +93,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    ReadAfterWriteMiddleware, window_seconds=settings.DB_READ_AFTER_WRITE_SECONDS
+)
 
 
 @app.get("/healthz", include_in_schema=False)
@@ -44,8 +103,61 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/readyz", include_in_schema=False)
+def readiness_check():
+    return JSONResponse(
+        jsonable_encoder(warmup.state.snapshot()),
+        status_code=200 if warmup.state.ready else 503,
+    )
+
+
+# Метрики воркера — только с X-Internal-Token (app/deps/internal.py)
+internal_router = APIRouter(
+    prefix="/internal",
+    dependencies=[Depends(require_internal_token)],
+    include_in_schema=False,
+)
+
+
+@internal_router.get("/cache-stats")
+def cache_stats():
+    return response_cache.stats()
+
+
+@internal_router.get("/image-cache")
+def image_cache_stats():
+    return image_resizer.stats()
+
+
+@internal_router.get("/db-pool")
+def db_pool_stats():
+    return pool_stats()
+
+
+@internal_router.get("/statement-cache")
+def statement_cache_stats():
+    return {"listings": listing_statements.stats(), **statement_metrics.snapshot()}
+
+
+@internal_router.get("/media-sweeper")
+def media_sweeper_stats():
+    return sweeper_metrics.snapshot()
+
+
 app.include_router(router=routers.api_router, prefix="/api", tags=["API movies"])
+app.include_router(router=image_router, tags=["images"])
+app.include_router(router=import_router, include_in_schema=False)
+app.include_router(router=internal_router)
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(AppBaseException, app_exception_handler)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+if settings.MEDIA_SERVE_STATIC:
+    app.mount(
+        "/static",
+        MediaStaticFiles(
+            directory=settings.MEDIA_LOCAL_ROOT,
+            sendfile_mode=settings.MEDIA_SENDFILE_MODE,
+            accel_redirect_prefix=settings.MEDIA_ACCEL_REDIRECT_PREFIX,
+        ),
+        name="static",
+    )
@@ -1,7 +1,8 @@
 from slugify import slugify
 from app.movie.models import Genre, Category
 from app.db import get_db
-from sqlmodel import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 
 
@@ -36,38 +37,38 @@ category_data = {
 }
 
 
-async def add_genres_to_db():
-    async for db in get_db():
-        for genre in genre_data["genres"]:
-            slug = slugify(genre["name"], separator="-")
-            stmt = select(Genre).where(Genre.slug == slug)
-            existing = (await db.exec(stmt)).first()
-
-            if existing:
-                continue
+async def insert_missing(db, model, rows: list[dict]) -> int:
+    """Один INSERT ... ON CONFLICT DO NOTHING вместо SELECT на каждую строку."""
+    connection = await db.connection()
+    insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(model.__table__).on_conflict_do_nothing().returning(model.id)
+    return len((await connection.execute(stmt, rows)).all())
 
-            genre_obj = Genre(name=genre["name"], id_tmdb=genre["id"], slug=slug)
-            db.add(genre_obj)
 
+async def add_genres_to_db():
+    rows = [
+        {
+            "name": genre["name"],
+            "id_tmdb": genre["id"],
+            "slug": slugify(genre["name"], separator="-"),
+        }
+        for genre in genre_data["genres"]
+    ]
+    async for db in get_db():
+        added = await insert_missing(db, Genre, rows)
         await db.commit()
-    print(f"Added {len(genre_data['genres'])} genres to the database.")
+    print(f"Added {added} genres to the database.")
 
 
 async def add_categories_to_db():
+    rows = [
+        {"name": category, "slug": slugify(category, separator="-")}
+        for category in category_data["categories"]
+    ]
     async for db in get_db():
-        for category in category_data["categories"]:
-            slug = slugify(category, separator="-")
-
-            stmt = select(Category).where(Category.slug == slug)
-            existing = (await db.exec(stmt)).first()
-
-            if existing:
-                continue  # уже есть — пропускаем
-
-            category_obj = Category(name=category, slug=slug)
-            db.add(category_obj)
+        added = await insert_missing(db, Category, rows)
         await db.commit()
-    print(f"Added {len(category_data['categories'])} categories to the database.")
+    print(f"Added {added} categories to the database.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.db import async_session
+from app.movie.services.tmdb_images import mirror_tmdb_images
+from app.shared.media.storage import close_media_storage
+
+
+async def main(concurrency: int, batch_size: int) -> None:
+    try:
+        stats = await mirror_tmdb_images(
+            async_session, concurrency=concurrency, batch_size=batch_size
+        )
+    finally:
+        await close_media_storage()
+    print(
+        f"Movies {stats.movies}, downloaded {stats.downloaded} "
+        f"({stats.bytes_downloaded} bytes), reused {stats.reused}, "
+        f"missing {stats.missing}, failed {stats.failed}."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Copy TMDB posters/backdrops into media storage"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.TMDB_MIRROR_CONCURRENCY
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.TMDB_MIRROR_BATCH_SIZE
+    )
+    args = parser.parse_args()
+    asyncio.run(main(concurrency=args.concurrency, batch_size=args.batch_size))
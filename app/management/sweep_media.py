@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+from datetime import timedelta
+
+from app.core.advisory_lock import AdvisoryLock
+from app.core.config import settings
+from app.db import async_session, engine
+from app.shared.media.storage import close_media_storage, get_media_storage
+from app.shared.media.sweeper import MEDIA_SWEEP_LOCK_KEY, sweep_orphans
+
+
+async def main(dry_run: bool, grace_hours: float) -> None:
+    # Тот же lock, что у фонового прохода в воркерах
+    lock = AdvisoryLock(engine, MEDIA_SWEEP_LOCK_KEY)
+    try:
+        async with lock.hold() as acquired:
+            if not acquired:
+                print("Another media sweep is running, try again later.")
+                return
+            stats = await sweep_orphans(
+                async_session,
+                get_media_storage(),
+                prefixes=settings.MEDIA_SWEEP_PREFIXES,
+                grace=timedelta(hours=grace_hours),
+                dry_run=dry_run,
+                batch_size=settings.MEDIA_SWEEP_BATCH_SIZE,
+                deletes_per_second=settings.MEDIA_SWEEP_DELETES_PER_SECOND,
+            )
+    finally:
+        await close_media_storage()
+    print(
+        f"Scanned {stats.scanned} files, orphans {stats.orphans} "
+        f"({stats.orphan_bytes} bytes), deleted {stats.deleted} "
+        f"({stats.bytes_reclaimed} bytes), errors {stats.errors}."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove unreferenced media files")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=settings.MEDIA_SWEEP_GRACE_SECONDS / 3600,
+        help="Keep orphans younger than this",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(dry_run=args.dry_run, grace_hours=args.grace_hours))
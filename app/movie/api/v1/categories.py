@@ -1,18 +1,31 @@
+from datetime import date
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlmodel import select
 from slugify import slugify
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.db import get_db
+from app.db import get_request_db
 from app.core.responses import BaseApiResponse
+from app.core.response_cache import cache_response, cached_response, response_cache
 from app.movie.schemas import category as schemas
-from app.movie.models import Category, Movie
-from app.movie.schemas.movie import MovieRead
-
+from app.movie.models import Category
+from app.movie.schemas.movie import (
+    GenreMode,
+    MovieFilters,
+    MovieRead,
+    TitleSearchMode,
+)
+from app.movie.repositories import (
+    catalog_repo,
+    movie_filters,
+    movie_repo,
+    movie_search,
+    movie_statements,
+)
+from .conditional import CatalogValidatorsDep
 
-SessionDep = Annotated[AsyncSession, Depends(get_db)]
+SessionDep = Annotated[AsyncSession, Depends(get_request_db)]
 
 category_router = APIRouter()
 
@@ -20,10 +33,21 @@ category_router = APIRouter()
 @category_router.get(
     "/category/", response_model=BaseApiResponse[list[schemas.CategoryRead]]
 )
-async def list_category(session: SessionDep):
+async def list_category(
+    request: Request, session: SessionDep, validators: CatalogValidatorsDep
+):
+    if (cached := cached_response(request, "category_list", validators)) is not None:
+        return cached
     data_categories = (await session.exec(select(Category))).all()
-    return BaseApiResponse.ok(
-        data=data_categories, message="Category retrieved successfully"
+    return cache_response(
+        request,
+        "category_list",
+        BaseApiResponse[list[schemas.CategoryRead]].ok(
+            data=[schemas.CategoryRead.model_validate(cat) for cat in data_categories],
+            message="Category retrieved successfully",
+        ),
+        tags=["categories"],
+        validators=validators,
     )
 
 
@@ -33,8 +57,10 @@ async def create_category(category: schemas.CategoryCreate, session: SessionDep)
     db_movie = Category(**category.model_dump(exclude={"slug"}), slug=generated_slug)
 
     session.add(db_movie)
+    await catalog_repo.bump_catalog_version(session)
     await session.commit()
     await session.refresh(db_movie)
+    response_cache.invalidate("categories", movie_repo.category_tag(db_movie.id))
     return db_movie
 
 
@@ -44,32 +70,72 @@ async def create_category(category: schemas.CategoryCreate, session: SessionDep)
 )
 async def get_category_movies(
     category_id: int,
+    request: Request,
     session: SessionDep,
+    validators: CatalogValidatorsDep,
     last_id: int = Query(default=None, ge=1),
     per_page: int = Query(default=10, le=100, ge=10),
     title: str | None = None,
-    release_date: str | None = Query(default=None, example="2023-01-01"),
+    search_mode: TitleSearchMode = Query(
+        default="contains",
+        description="contains (substring of title) or fulltext "
+        "(words in title, original title or description)",
+    ),
+    genres: list[int] = Query([], description="Filter by genre IDs"),
+    genre_mode: GenreMode = Query(
+        default="any",
+        description="any (at least one of the genres) or all (every genre)",
+    ),
+    exclude_genres: list[int] = Query(
+        [], description="Hide movies that have any of these genre IDs"
+    ),
+    release_date: date | None = Query(default=None, example="2023-01-01"),
+    vote_average_min: float | None = Query(default=None, ge=0.0, le=10.0),
+    vote_average_max: float | None = Query(default=None, ge=0.0, le=10.0),
+    vote_count_min: int | None = Query(default=None, ge=0),
+    vote_count_max: int | None = Query(default=None, ge=0),
+    duration_min: int | None = Query(default=None, ge=0, description="Minutes"),
+    duration_max: int | None = Query(default=None, ge=0, description="Minutes"),
+    popularity_min: float | None = Query(default=None, ge=0.0),
+    popularity_max: float | None = Query(default=None, ge=0.0),
 ):
+    if (cached := cached_response(request, "category_movies", validators)) is not None:
+        return cached
     if not await session.get(Category, category_id):
         raise HTTPException(status_code=404, detail="Category not found")
-    stmt = select(Movie).where(Movie.category_id == category_id)
-
-    if title:
-        stmt = stmt.where(Movie.title.ilike(f"%{title}%"))
-    if release_date:
-        stmt = stmt.where(Movie.release_date.ilike(f"{release_date}"))
+    filters = MovieFilters(
+        categories=[category_id],
+        genres=genres,
+        genre_mode=genre_mode,
+        exclude_genres=exclude_genres,
+        title=title,
+        search_mode=search_mode,
+        adult=True,
+        release_date_from=release_date,
+        release_date_to=release_date,
+        vote_average_min=vote_average_min,
+        vote_average_max=vote_average_max,
+        vote_count_min=vote_count_min,
+        vote_count_max=vote_count_max,
+        duration_min=duration_min,
+        duration_max=duration_max,
+        popularity_min=popularity_min,
+        popularity_max=popularity_max,
+    )
+    dialect_name = await movie_search.get_dialect_name(session)
+    params = movie_filters.filter_params(filters, dialect_name)
+    params["limit"] = per_page + 1
     if last_id is not None:
-        stmt = stmt.where(Movie.id > last_id)
-
-    stmt = stmt.order_by(Movie.id).limit(per_page + 1)
-    stmt = stmt.options(selectinload(Movie.genres), selectinload(Movie.category))
-    movies = (await session.exec(stmt)).all()
-    movies = movies[:per_page]
+        params["last_id"] = last_id
+    stmt = movie_statements.category_listing(
+        movie_filters.filter_shape(filters, dialect_name),
+        after_last_id=last_id is not None,
+    )
+    movies = (await session.exec(stmt, params=params)).all()
     if not movies:
         raise HTTPException(status_code=404, detail="No movies found for this category")
-    total_movies = len(movies)
-
-    has_more = total_movies > per_page
+    has_more = len(movies) > per_page
+    movies = movies[:per_page]
 
     category_movies_list = [MovieRead.model_validate(movie) for movie in movies]
 
@@ -82,6 +148,12 @@ async def get_category_movies(
         items=category_movies_list,
     )
 
-    return BaseApiResponse.ok(
-        data=data_movie_cat, message="Category movies retrieved successfully"
+    return cache_response(
+        request,
+        "category_movies",
+        BaseApiResponse[schemas.CatPaginationMovieRead].ok(
+            data=data_movie_cat, message="Category movies retrieved successfully"
+        ),
+        tags=movie_repo.listing_tags(filters),
+        validators=validators,
     )
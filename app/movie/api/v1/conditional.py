@@ -0,0 +1,25 @@
+from typing import Annotated
+
+from fastapi import Depends, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.conditional import Validators, make_validators
+from app.core.response_cache import make_cache_key
+from app.db import get_request_db
+from ...repositories import catalog_repo
+
+
+async def get_catalog_validators(
+    request: Request, session: AsyncSession = Depends(get_request_db)
+) -> Validators:
+    """ETag листинга = версия каталога + нормализованные параметры запроса.
+
+    Один запрос по PK вместо основного: при совпадении ETag отдаём 304.
+    """
+    state = await catalog_repo.get_catalog_version(session)
+    return make_validators(
+        state.updated_at, "catalog", state.version, make_cache_key(request)
+    )
+
+
+CatalogValidatorsDep = Annotated[Validators, Depends(get_catalog_validators)]
@@ -0,0 +1,69 @@
+from datetime import date
+from typing import Annotated
+
+from fastapi import Depends, Query
+
+from ...schemas.movie import GenreMode, MovieFilters, TitleSearchMode
+
+
+def get_movie_filters(
+    categories: list[int] = Query([], description="Filter by category IDs"),
+    genres: list[int] = Query([], description="Filter by genre IDs"),
+    genre_mode: GenreMode = Query(
+        default="any",
+        description="any (at least one of the genres) or all (every genre)",
+    ),
+    exclude_genres: list[int] = Query(
+        [], description="Hide movies that have any of these genre IDs"
+    ),
+    title: str | None = Query(None, description="Search by movie title"),
+    search_mode: TitleSearchMode = Query(
+        default="contains",
+        description="contains (substring of title) or fulltext "
+        "(words in title, original title or description)",
+    ),
+    adult: bool = Query(default=False, description="Include adult content"),
+    release_date_from: date | None = Query(
+        default=None, description="Show movies released on or after this date"
+    ),
+    release_date_to: date | None = Query(
+        default=None, description="Show movies released on or before this date"
+    ),
+    release_year: int | None = Query(
+        default=None,
+        ge=1870,
+        le=2100,
+        description="Show movies released in a specific year",
+    ),
+    vote_average_min: float | None = Query(default=None, ge=0.0, le=10.0),
+    vote_average_max: float | None = Query(default=None, ge=0.0, le=10.0),
+    vote_count_min: int | None = Query(default=None, ge=0),
+    vote_count_max: int | None = Query(default=None, ge=0),
+    duration_min: int | None = Query(default=None, ge=0, description="Minutes"),
+    duration_max: int | None = Query(default=None, ge=0, description="Minutes"),
+    popularity_min: float | None = Query(default=None, ge=0.0),
+    popularity_max: float | None = Query(default=None, ge=0.0),
+) -> MovieFilters:
+    return MovieFilters(
+        categories=categories,
+        genres=genres,
+        genre_mode=genre_mode,
+        exclude_genres=exclude_genres,
+        title=title,
+        search_mode=search_mode,
+        adult=adult,
+        release_date_from=release_date_from,
+        release_date_to=release_date_to,
+        release_year=release_year,
+        vote_average_min=vote_average_min,
+        vote_average_max=vote_average_max,
+        vote_count_min=vote_count_min,
+        vote_count_max=vote_count_max,
+        duration_min=duration_min,
+        duration_max=duration_max,
+        popularity_min=popularity_min,
+        popularity_max=popularity_max,
+    )
+
+
+MovieFiltersDep = Annotated[MovieFilters, Depends(get_movie_filters)]
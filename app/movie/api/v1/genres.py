@@ -1,25 +1,40 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from sqlmodel import not_, select, or_
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.responses import BaseApiResponse
+from app.core.response_cache import cache_response, cached_response
 from ...schemas import genre as schemas
-from app.db import get_db
+from app.db import get_request_db
 from ...models.genre import Genre
 from ...models.movie import Movie
 from ...schemas.movie import MovieRead
+from .conditional import CatalogValidatorsDep
 
 
 genre_router = APIRouter()
 
 
-SessionDep = Annotated[AsyncSession, Depends(get_db)]
+SessionDep = Annotated[AsyncSession, Depends(get_request_db)]
 
 
 @genre_router.get("/", response_model=BaseApiResponse[list[schemas.GenreRead]])
-async def get_list_genres(session: SessionDep):
+async def get_list_genres(
+    request: Request, session: SessionDep, validators: CatalogValidatorsDep
+):
+    if (cached := cached_response(request, "genres_list", validators)) is not None:
+        return cached
     result = await session.exec(select(Genre))
     list_genre = result.all()
 
-    return BaseApiResponse.ok(data=list_genre, message="Ok succesfully")
+    return cache_response(
+        request,
+        "genres_list",
+        BaseApiResponse[list[schemas.GenreRead]].ok(
+            data=[schemas.GenreRead.model_validate(genre) for genre in list_genre],
+            message="Ok succesfully",
+        ),
+        tags=["genres"],
+        validators=validators,
+    )
@@ -1,26 +1,63 @@
-import shutil
-from turtle import back
-import uuid
-
-
 from typing import Annotated, Literal
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status
-from sqlmodel import select, func, or_, not_
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    UploadFile,
+    File,
+    Query,
+    Request,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.responses import BaseApiResponse
+from app.core.conditional import make_validators
+from app.core.ndjson import spooled_ndjson_response
+from app.core.response_cache import cache_response, cached_response
+from app.shared.media import media_service
 from ...models.movie import Movie
 from slugify import slugify
 from ...schemas import movie as schemas
-from app.db import get_db
-from ...models.genre import Genre
+from app.db import get_request_db
+from ...repositories import (
+    catalog_repo,
+    movie_bulk,
+    movie_filters,
+    movie_repo,
+    movie_search,
+    movie_statements,
+)
+from ...services import image_service
+from .conditional import CatalogValidatorsDep
+from .filters import MovieFiltersDep
 
 
 movies_router = APIRouter()
 
 
-SessionDep = Annotated[AsyncSession, Depends(get_db)]
+SessionDep = Annotated[AsyncSession, Depends(get_request_db)]
+
+
+def to_main_page_item(movie: Movie) -> schemas.MovieReadMainPage:
+    return schemas.MovieReadMainPage(
+        id=movie.id,
+        title=movie.title,
+        release_date=movie.release_date,
+        age_rating=movie.age_rating,
+        genre=movie.genres[0].name if movie.genres else None,
+        category=movie.category.name if movie.category else None,
+        duration=movie.duration,
+        poster=movie.poster,
+        backdrop=movie.backdrop,
+        poster_renditions=movie.poster_renditions,
+        backdrop_renditions=movie.backdrop_renditions,
+        is_premium=movie.is_premium,
+        is_vip_only=movie.is_vip_only,
+    )
 
 
 @movies_router.post("/", response_model=schemas.MovieCreate)
@@ -35,8 +72,10 @@ async def create_movie(
         slug=generated_slug,
     )
     session.add(db_movie)
+    await catalog_repo.bump_catalog_version(session)
     await session.commit()
     await session.refresh(db_movie)
+    movie_repo.invalidate_catalog()
     return db_movie
 
 
@@ -46,104 +85,72 @@ async def upload_movie_poster(
     session: SessionDep,
     poster: UploadFile = File(...),
 ):
-    filename = f"{uuid.uuid4().hex[:8]}_{poster.filename}"
-    file_location = f"app/static/posters/{filename}"
-
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(poster.file, buffer)
+    return await image_service.upload_movie_image(session, movie_id, "poster", poster)
 
-    movie = await session.get(Movie, movie_id)
-    if not movie:
-        raise HTTPException(status_code=404, detail="Movie not found")
 
-    movie.poster = file_location
-
-    session.add(movie)
-    await session.commit()
-    session.refresh(movie)
-    return movie
+@movies_router.post("/{movie_id}/backdrop", response_model=schemas.MovieRead)
+async def upload_movie_backdrop(
+    movie_id: int,
+    session: SessionDep,
+    backdrop: UploadFile = File(...),
+):
+    return await image_service.upload_movie_image(
+        session, movie_id, "backdrop", backdrop
+    )
 
 
 @movies_router.get(
     "/", response_model=BaseApiResponse[schemas.PaginatedOffsetMovieRead]
 )
 async def list_movies_filter_offset(
+    request: Request,
     session: SessionDep,
+    filters: MovieFiltersDep,
+    validators: CatalogValidatorsDep,
     page: int = Query(1, ge=1, description="Page number (starting from 1)"),
     per_page: int = Query(10, le=100, ge=10, description="Number of movies per page"),
-    categories: list[int] = Query([], description="Filter by category IDs"),
-    genres: list[int] = Query([], description="Filter by genre IDs"),
-    title: str | None = Query(None, description="Search by movie title"),
-    adult: bool = Query(default=False, description="Include adult content"),
-    release_date_from: str | None = Query(
-        default=None, description="Show movies released on or after this date"
-    ),
-    release_date_to: str | None = Query(
-        default=None, description="Show movies released on or before this date"
-    ),
-    release_year: int | None = Query(
-        default=None, description="Show movies released in a specific year"
-    ),
     sort_by: Literal["latest", "newest", "popular"] = Query(
         default="latest",
         description="Sort by: latest (ID), newest (release date), or popular (popularity)",
     ),
+    include_total: bool = Query(
+        default=True, description="Calculate total_items and total_pages"
+    ),
+    count_mode: movie_repo.MovieCountMode = Query(
+        default="auto",
+        description="exact (COUNT), estimated (planner estimate) or auto "
+        "(estimate for very large result sets, exact otherwise)",
+    ),
 ):
+    if (cached := cached_response(request, "movies_list", validators)) is not None:
+        return cached
     per_page = min(per_page, 100)
-    stmt = select(Movie).options(
-        selectinload(Movie.genres), selectinload(Movie.category)
-    )
-
-    if categories:
-        stmt = stmt.where(Movie.category_id.in_(categories))
-    if genres:
-        stmt = stmt.where(or_(*[Movie.genres.any(Genre.id == g) for g in genres]))
-    if title:
-        stmt = stmt.where(Movie.title.ilike(f"%{title}%"))
-    if not adult:
-        stmt = stmt.where(not_(Movie.adult))
-    if release_date_from:
-        stmt = stmt.where(Movie.release_date >= release_date_from)
-    if release_date_to:
-        stmt = stmt.where(Movie.release_date <= release_date_to)
-    if release_year:
-        stmt = stmt.where(Movie.release_date.ilike(f"{release_year}-%"))
-    if sort_by == "latest":
-        stmt = stmt.order_by(Movie.id.desc())
-    elif sort_by == "newest":
-        stmt = stmt.order_by(Movie.release_date.desc())
-    elif sort_by == "popular":
-        stmt = stmt.order_by(Movie.popularity.desc())
-
-    total_items = (
-        await session.exec(select(func.count()).select_from(stmt.subquery()))
-    ).one()
-    if total_items == 0:
-        movies = []
-        total_pages = 0
-    else:
-        total_pages = (total_items + per_page - 1) // per_page
-        if page > total_pages:
-            return BaseApiResponse.fail(status_code=204, detail="Movie not found")
-        offset = (page - 1) * per_page
-        movies = (await session.exec(stmt.offset(offset).limit(per_page))).all()
-    has_more = page < total_pages
-    items = [
-        schemas.MovieReadMainPage(
-            id=mov.id,
-            title=mov.title,
-            release_date=mov.release_date,
-            age_rating=mov.age_rating,
-            genre=mov.genres[0].name if mov.genres else None,
-            category=mov.category.name,
-            duration=mov.duration,
-            poster=mov.poster,
-            backdrop=mov.backdrop,
-            is_premium=mov.is_premium,
-            is_vip_only=mov.is_vip_only,
+    dialect_name = await movie_search.get_dialect_name(session)
+    shape = movie_filters.filter_shape(filters, dialect_name)
+    params = movie_filters.filter_params(filters, dialect_name)
+
+    total_items = total_pages = None
+    is_estimated = False
+    if include_total:
+        filter_key = movie_repo.make_filter_key(**filters.model_dump())
+        total_items, is_estimated = await movie_repo.count_movies(
+            session,
+            movie_statements.filtered_movies(shape),
+            filter_key,
+            count_mode,
+            params=params,
         )
-        for mov in movies
-    ]
+        total_pages = (total_items + per_page - 1) // per_page
+        if total_items and not is_estimated and page > total_pages:
+            return BaseApiResponse.fail(
+                code=status.HTTP_204_NO_CONTENT, message="Movie not found"
+            )
+
+    stmt = movie_statements.offset_listing(shape, sort_by)
+    params.update(offset=(page - 1) * per_page, limit=per_page + 1)
+    rows = (await session.exec(stmt, params=params)).all()
+    has_more = len(rows) > per_page
+    items = [schemas.MovieReadMainPage.model_validate(row) for row in rows[:per_page]]
 
     response_data = schemas.PaginatedOffsetMovieRead(
         meta=schemas.MetaDataOffset(
@@ -151,12 +158,19 @@ async def list_movies_filter_offset(
             per_page=per_page,
             total_items=total_items,
             total_pages=total_pages,
+            is_estimated=is_estimated,
             has_more=has_more,
         ),
         items=items,
     )
-    return BaseApiResponse.ok(
-        data=response_data, message="Movies retrieved successfully"
+    return cache_response(
+        request,
+        "movies_list",
+        BaseApiResponse[schemas.PaginatedOffsetMovieRead].ok(
+            data=response_data, message="Movies retrieved successfully"
+        ),
+        tags=movie_repo.listing_tags(filters),
+        validators=validators,
     )
 
 
@@ -165,91 +179,210 @@ async def list_movies_filter_offset(
     response_model=BaseApiResponse[schemas.PaginatedCursorMovieRead],
 )
 async def list_movies_filter_cursor(
+    request: Request,
     session: SessionDep,
+    filters: MovieFiltersDep,
+    validators: CatalogValidatorsDep,
+    cursor: str | None = Query(
+        default=None,
+        description="Opaque cursor from `meta.next_cursor` of the previous page",
+    ),
     last_id: int = Query(
         default=None,
         gt=0,
-        description="Cursor ID to get movies before this ID (used for pagination)",
+        deprecated=True,
+        description="Cursor ID to get movies before this ID (only for sort_by=latest)",
     ),
     per_page: int = Query(10, le=100, ge=10, description="Number of movies per page"),
-    categories: list[int] = Query([], description="Filter by category IDs"),
-    genres: list[int] = Query([], description="Filter by genre IDs"),
-    title: str | None = Query(None, description="Search by movie title"),
-    adult: bool = Query(default=False, description="Include adult content"),
-    release_date_from: str | None = Query(
-        default=None, description="Show movies released on or after this date"
-    ),
-    release_date_to: str | None = Query(
-        default=None, description="Show movies released on or before this date"
-    ),
-    release_year: int | None = Query(
-        default=None, description="Show movies released in a specific year"
+    sort_by: movie_repo.MovieSortBy = Query(
+        default="latest",
+        description="Sort by: latest (ID), newest (release date), or popular (popularity)",
     ),
 ):
-    stmt = select(Movie).options(
-        selectinload(Movie.genres), selectinload(Movie.category)
+    if (cached := cached_response(request, "movies_cursor", validators)) is not None:
+        return cached
+    dialect_name = await movie_search.get_dialect_name(session)
+    params = movie_filters.filter_params(filters, dialect_name)
+    params["limit"] = per_page + 1
+    keyset = cursor is not None
+    after_last_id = not keyset and last_id is not None and sort_by == "latest"
+    if keyset:
+        params.update(movie_repo.keyset_params(sort_by, cursor))
+    elif after_last_id:
+        params["last_id"] = last_id
+    stmt = movie_statements.cursor_listing(
+        movie_filters.filter_shape(filters, dialect_name),
+        sort_by,
+        keyset=keyset,
+        after_last_id=after_last_id,
     )
 
-    if last_id is not None:
-        stmt = stmt.where(Movie.id < last_id)
-    if categories:
-        stmt = stmt.where(Movie.category_id.in_(categories))
-    if genres:
-        stmt = stmt.where(or_(*[Movie.genres.any(Genre.id == g) for g in genres]))
-    if title:
-        stmt = stmt.where(Movie.title.ilike(f"%{title}%"))
-    if not adult:
-        stmt = stmt.where(not_(Movie.adult))
-    if release_date_from:
-        stmt = stmt.where(Movie.release_date >= release_date_from)
-    if release_date_to:
-        stmt = stmt.where(Movie.release_date <= release_date_to)
-    if release_year:
-        stmt = stmt.where(Movie.release_date.ilike(f"{release_year}-%"))
-
-    stmt = stmt.order_by(Movie.id.desc()).limit(per_page + 1)
-
-    result = await session.exec(stmt)
-    movies = result.all()
-
-    if not movies:
+    rows = (await session.exec(stmt, params=params)).all()
+
+    if not rows:
         return BaseApiResponse.fail(
             code=status.HTTP_204_NO_CONTENT, message="Movie not found"
         )
-    count_movies = len(movies)
-
-    movies = movies[:per_page]
-    has_more = count_movies > per_page
-
-    next_last_id = movies[-1].id if has_more else None
-    items_movie = [
-        schemas.MovieReadMainPage(
-            id=mov.id,
-            title=mov.title,
-            release_date=mov.release_date,
-            age_rating=mov.age_rating,
-            genre=mov.genres[0].name if mov.genres else None,
-            category=mov.category.name,
-            duration=mov.duration,
-            poster=mov.poster,
-            backdrop=mov.backdrop,
-            is_premium=mov.is_premium,
-            is_vip_only=mov.is_vip_only,
-        )
-        for mov in movies
-    ]
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    next_cursor = movie_repo.make_movie_cursor(rows[-1], sort_by) if has_more else None
+    next_last_id = rows[-1].id if has_more else None
+    items_movie = [schemas.MovieReadMainPage.model_validate(row) for row in rows]
     response_data = schemas.PaginatedCursorMovieRead(
         meta=schemas.MetaDataCursor(
-            next_cursor=next_last_id, per_page=per_page, has_more=has_more
+            next_cursor=next_cursor,
+            last_id=next_last_id,
+            sort_by=sort_by,
+            per_page=per_page,
+            has_more=has_more,
         ),
         items=items_movie,
     )
 
-    return BaseApiResponse.ok(data=response_data, message="Succes")
+    return cache_response(
+        request,
+        "movies_cursor",
+        BaseApiResponse[schemas.PaginatedCursorMovieRead].ok(
+            data=response_data, message="Succes"
+        ),
+        tags=movie_repo.listing_tags(filters),
+        validators=validators,
+    )
+
+
+@movies_router.get(
+    "/search", response_model=BaseApiResponse[schemas.PaginatedSearchMovieRead]
+)
+async def search_movies(
+    session: SessionDep,
+    q: str = Query(
+        min_length=2,
+        max_length=200,
+        description="Words to search in title, original title and description",
+    ),
+    page: int = Query(1, ge=1, description="Page number (starting from 1)"),
+    per_page: int = Query(10, le=100, ge=10, description="Number of movies per page"),
+    adult: bool = Query(default=False, description="Include adult content"),
+    match: movie_search.SearchMatch = Query(
+        default="auto",
+        description="auto (fulltext, fuzzy title match if nothing found), "
+        "fulltext or fuzzy",
+    ),
+):
+    rows, used_match = await movie_search.search_movies(
+        session,
+        q.strip(),
+        adult=adult,
+        match=match,
+        limit=per_page + 1,
+        offset=(page - 1) * per_page,
+    )
+    has_more = len(rows) > per_page
+    items = [
+        schemas.MovieSearchItem(**to_main_page_item(mov).model_dump(), rank=rank)
+        for mov, rank in rows[:per_page]
+    ]
+    response_data = schemas.PaginatedSearchMovieRead(
+        meta=schemas.MetaDataSearch(
+            page=page, per_page=per_page, has_more=has_more, match=used_match
+        ),
+        items=items,
+    )
+    return BaseApiResponse.ok(data=response_data, message="Movies found")
+
+
+NDJSON_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+    }
+}
+
+
+async def bulk_response(
+    request: Request,
+    session: AsyncSession,
+    schema: type,
+    apply_batch: movie_bulk.ApplyBatch,
+) -> StreamingResponse:
+    results = movie_bulk.stream_bulk_results(
+        session, request.stream(), schema, apply_batch
+    )
+    return await spooled_ndjson_response(results)
+
+
+@movies_router.post("/bulk", openapi_extra=NDJSON_BODY)
+async def bulk_upsert_movies(request: Request, session: SessionDep):
+    """Create or update movies from an NDJSON body, one `MovieBulkUpsert` per line.
+
+    Rows are matched by `id_tmdb` (or `slug`); the response is NDJSON with one
+    `MovieBulkResult` per input line.
+    """
+    return await bulk_response(
+        request, session, schemas.MovieBulkUpsert, movie_bulk.apply_upsert_batch
+    )
+
+
+@movies_router.patch("/bulk", openapi_extra=NDJSON_BODY)
+async def bulk_update_movies(request: Request, session: SessionDep):
+    """Partially update movies from an NDJSON body, one `MovieBulkPatch` per line."""
+    return await bulk_response(
+        request, session, schemas.MovieBulkPatch, movie_bulk.apply_patch_batch
+    )
+
+
+@movies_router.post("/bulk/delete", openapi_extra=NDJSON_BODY)
+async def bulk_delete_movies(request: Request, session: SessionDep):
+    """Delete movies listed in an NDJSON body, one `MovieBulkKey` per line."""
+    return await bulk_response(
+        request, session, schemas.MovieBulkKey, movie_bulk.apply_delete_batch
+    )
+
+
+async def fetch_movie_batch(
+    session: AsyncSession, ids: list[int], view: schemas.MovieBatchView
+) -> BaseApiResponse[schemas.MovieBatchRead]:
+    movies, missing_ids = await movie_repo.get_movies_by_ids(session, ids, view)
+    item_schema = schemas.MovieReadMainPage if view == "card" else schemas.MovieRead
+    response_data = schemas.MovieBatchRead(
+        items=[item_schema.model_validate(movie) for movie in movies],
+        missing_ids=missing_ids,
+    )
+    return BaseApiResponse.ok(data=response_data, message="Movies retrieved")
+
+
+@movies_router.get("/batch", response_model=BaseApiResponse[schemas.MovieBatchRead])
+async def get_movies_batch(
+    session: SessionDep,
+    ids: list[int] = Query(
+        min_length=1,
+        max_length=schemas.MOVIE_BATCH_MAX_IDS,
+        description="Movie IDs (?ids=1&ids=2); the response keeps this order",
+    ),
+    view: schemas.MovieBatchView = Query(
+        default="full", description="full (MovieRead) or card (MovieReadMainPage)"
+    ),
+):
+    return await fetch_movie_batch(session, ids, view)
+
+
+@movies_router.post("/batch", response_model=BaseApiResponse[schemas.MovieBatchRead])
+async def post_movies_batch(body: schemas.MovieBatchRequest, session: SessionDep):
+    # POST для длинных списков, которые не помещаются в URL
+    return await fetch_movie_batch(session, body.ids, body.view)
 
 
 @movies_router.get("/{movie_id}", response_model=BaseApiResponse[schemas.MovieRead])
-async def read_movie(movie_id: int, session: SessionDep):
+async def read_movie(movie_id: int, request: Request, session: SessionDep):
+    version = await catalog_repo.get_movie_version(session, movie_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    validators = make_validators(
+        version.updated_at, "movie", movie_id, version.updated_at
+    )
+    if (cached := cached_response(request, "movie_detail", validators)) is not None:
+        return cached
     stmt = (
         select(Movie)
         .options(selectinload(Movie.category), selectinload(Movie.genres))
@@ -260,9 +393,19 @@ async def read_movie(movie_id: int, session: SessionDep):
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
 
-    return BaseApiResponse.ok(
-        data=schemas.MovieRead.model_validate(movie).model_dump(by_alias=True),
-        message="Succesfullu get details Movie",
+    tags = [movie_repo.movie_tag(movie.id)]
+    if movie.category_id is not None:
+        tags.append(movie_repo.category_tag(movie.category_id))
+    tags.extend(movie_repo.genre_tag(genre.id) for genre in movie.genres)
+    return cache_response(
+        request,
+        "movie_detail",
+        BaseApiResponse[schemas.MovieRead].ok(
+            data=schemas.MovieRead.model_validate(movie),
+            message="Succesfullu get details Movie",
+        ),
+        tags=tags,
+        validators=validators,
     )
 
 
@@ -275,8 +418,10 @@ async def update_movie(
         raise HTTPException(status_code=404, detail="Movie not found")
     for key, value in updated.model_dump(exclude_unset=True).items():
         setattr(movie, key, value)
+    await catalog_repo.bump_catalog_version(session)
     await session.commit()
     await session.refresh(movie)
+    movie_repo.invalidate_catalog(movie_repo.movie_tag(movie_id))
     return movie
 
 
@@ -285,7 +430,16 @@ async def delete_movie(movie_id: int, session: SessionDep):
     movie = await session.get(Movie, movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
-    session.delete(movie)
+    # Файлы без ссылок удалит чистильщик: их ещё могут отдавать кэши
+    await media_service.release_urls(
+        session,
+        [
+            *image_service.movie_image_urls(movie, "poster"),
+            *image_service.movie_image_urls(movie, "backdrop"),
+        ],
+    )
+    await session.delete(movie)
+    await catalog_repo.bump_catalog_version(session)
     await session.commit()
-    await session.refresh(movie)
+    movie_repo.invalidate_catalog(movie_repo.movie_tag(movie_id))
     return {"ok": True}
@@ -1,9 +1,18 @@
 from .movie import Movie
 from .category import Category
 from .genre import Genre
+from .catalog import CatalogSyncState, CatalogVersion
+from .import_job import ImportJob
 
 
 
 
 # This module imports the main models for the movie application.
-__all__ = ["Movie", "Category", "Genre"]
\ No newline at end of file
+__all__ = [
+    "Movie",
+    "Category",
+    "Genre",
+    "CatalogVersion",
+    "CatalogSyncState",
+    "ImportJob",
+]
\ No newline at end of file
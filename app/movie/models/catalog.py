@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime
+from sqlmodel import Field, SQLModel
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class CatalogVersion(SQLModel, table=True):
+    # Одна строка (id=1): версия каталога для ETag листингов, жанров и категорий.
+    # Увеличивается в той же транзакции, что и запись в каталог.
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=0)
+    updated_at: datetime = Field(
+        default_factory=utcnow, sa_type=DateTime(timezone=True)
+    )
+
+
+class CatalogSyncState(SQLModel, table=True):
+    # Водяной знак инкрементальной синхронизации: до какой даты изменения
+    # из внешнего источника (name="tmdb") уже применены.
+    name: str = Field(primary_key=True, max_length=50)
+    watermark: datetime = Field(sa_type=DateTime(timezone=True))
+    updated_at: datetime = Field(
+        default_factory=utcnow, sa_type=DateTime(timezone=True)
+    )
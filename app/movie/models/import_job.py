@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlmodel import Field, SQLModel
+
+from .catalog import utcnow
+
+
+class ImportJob(SQLModel, table=True):
+    # Фоновый импорт каталога: статус и прогресс пишутся после каждого батча,
+    # поэтому видны из любого воркера, а не только из того, где идёт импорт.
+    id: int | None = Field(default=None, primary_key=True)
+    kind: str = Field(max_length=50)
+    # pending -> running -> succeeded | failed | cancelled
+    status: str = Field(default="pending", max_length=20, index=True)
+    cancel_requested: bool = Field(default=False)
+    rows_read: int = Field(default=0)
+    rows_written: int = Field(default=0)
+    rows_skipped: int = Field(default=0)
+    batches: int = Field(default=0)
+    error: str | None = Field(default=None, max_length=2000)
+    created_at: datetime = Field(
+        default_factory=utcnow, sa_type=DateTime(timezone=True)
+    )
+    started_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
+    finished_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
+    updated_at: datetime = Field(
+        default_factory=utcnow, sa_type=DateTime(timezone=True)
+    )
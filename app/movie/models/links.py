@@ -1,4 +1,4 @@
-from sqlalchemy import null
+from sqlalchemy import Index, null
 from sqlmodel import Field, Relationship, SQLModel
 from datetime import datetime
 
@@ -10,6 +10,11 @@ if TYPE_CHECKING:
 
 
 class MovieGenreLink(SQLModel, table=True):
+    # PK (movie_id, genre_id) не помогает искать фильмы по жанру
+    __table_args__ = (
+        Index("ix_moviegenrelink_genre_id_movie_id", "genre_id", "movie_id"),
+    )
+
     movie_id: int = Field(foreign_key="movie.id", primary_key=True)
     genre_id: int = Field(foreign_key="genre.id", primary_key=True)
 
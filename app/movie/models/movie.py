@@ -1,6 +1,11 @@
+from datetime import date, datetime
+
+from sqlalchemy import JSON, DateTime, Index, event, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Relationship, SQLModel, Field
 from typing import TYPE_CHECKING
 
+from .catalog import utcnow
 from .links import MovieGenreLink
 from app.shared.links.movie_account_links import UserMovieVote
 
@@ -10,8 +15,20 @@ if TYPE_CHECKING:
     from .category import Category
     from .links import UserMovieVote
 
+RENDITIONS_TYPE = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Movie(SQLModel, table=True):
+    # Составные индексы для range-фильтров по popularity/released_on
+    # и для частого листинга "категория + без adult, свежие сначала".
+    # Keyset-ленты идут по индексам выражений (coalesce(key, floor), id)
+    # из миграции b7e4a2d9c815.
+    __table_args__ = (
+        Index("ix_movie_popularity_id", "popularity", "id"),
+        Index("ix_movie_released_on_id", "released_on", "id"),
+        Index("ix_movie_category_id_adult_id", "category_id", "adult", "id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     id_tmdb: int | None = Field(default=None, unique=True, index=True)
     title: str = Field(max_length=512, index=True)
@@ -30,10 +47,21 @@ class Movie(SQLModel, table=True):
     is_vip_only: bool = Field(default=False)
     poster: str | None = Field(default=None, max_length=255)
     backdrop: str | None = Field(default=None, max_length=255)
+    # {"w185": {"webp": url, "jpeg": url}, ...} — уменьшенные копии загрузок
+    poster_renditions: dict | None = Field(default=None, sa_type=RENDITIONS_TYPE)
+    backdrop_renditions: dict | None = Field(default=None, sa_type=RENDITIONS_TYPE)
     release_date: str | None = Field(default=None, max_length=10, index=True)
+    # Типизированная копия release_date для range-фильтров; заполняется при flush
+    released_on: date | None = Field(default=None)
     vote_average: float | None = Field(default=None, ge=0.0, le=10.0, index=True)
     vote_count: int | None = Field(default=None, ge=0, index=True)
     general_rating: int | None = Field(default=None)
+    # Для ETag/Last-Modified карточки; обновляется при каждом flush изменений
+    updated_at: datetime | None = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"server_default": func.now()},
+    )
 
     category_id: int | None = Field(
         default=None, foreign_key="category.id", sa_column_kwargs={"index": True}
@@ -45,3 +73,26 @@ class Movie(SQLModel, table=True):
     )
     category: "Category" = Relationship(back_populates="movies")
     votes: list["UserMovieVote"] = Relationship(back_populates="movie")
+
+
+def parse_release_date(value: str | None) -> date | None:
+    """TMDB иногда отдаёт пустые или битые даты — такие считаем неизвестными."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+@event.listens_for(Movie, "before_insert")
+@event.listens_for(Movie, "before_update")
+def sync_released_on(mapper, connection, target: Movie) -> None:
+    target.released_on = parse_release_date(target.release_date)
+
+
+@event.listens_for(Movie, "before_insert")
+@event.listens_for(Movie, "before_update")
+def touch_updated_at(mapper, connection, target: Movie) -> None:
+    # Bulk UPDATE в обход ORM должен выставлять updated_at сам
+    target.updated_at = utcnow()
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from sqlalchemy import Row
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models.catalog import CatalogSyncState, CatalogVersion, utcnow
+from ..models.movie import Movie
+
+CATALOG_VERSION_ID = 1
+
+
+async def get_catalog_version(session: AsyncSession) -> CatalogVersion:
+    # Строку создаёт миграция; до первой записи считаем каталог версией 0
+    state = await session.get(CatalogVersion, CATALOG_VERSION_ID)
+    return state or CatalogVersion(id=CATALOG_VERSION_ID, version=0, updated_at=None)
+
+
+async def bump_catalog_version(session: AsyncSession) -> None:
+    """Вызывать до commit() в той же транзакции, что и изменение каталога."""
+    stmt = (
+        update(CatalogVersion)
+        .where(CatalogVersion.id == CATALOG_VERSION_ID)
+        .values(version=CatalogVersion.version + 1, updated_at=utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.exec(stmt)
+    if result.rowcount == 0:
+        session.add(CatalogVersion(id=CATALOG_VERSION_ID, version=1))
+
+
+async def get_movie_version(session: AsyncSession, movie_id: int) -> Row | None:
+    """Лёгкая проверка для conditional GET: (id, updated_at) без загрузки связей."""
+    stmt = select(Movie.id, Movie.updated_at).where(Movie.id == movie_id)
+    return (await session.exec(stmt)).first()
+
+
+async def get_sync_watermark(session: AsyncSession, name: str) -> datetime | None:
+    state = await session.get(CatalogSyncState, name)
+    return state.watermark if state else None
+
+
+async def set_sync_watermark(
+    session: AsyncSession, name: str, watermark: datetime
+) -> None:
+    state = await session.get(CatalogSyncState, name)
+    if state is None:
+        state = CatalogSyncState(name=name, watermark=watermark)
+    state.watermark = watermark
+    state.updated_at = utcnow()
+    session.add(state)
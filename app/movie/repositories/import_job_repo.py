@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models.catalog import utcnow
+from ..models.import_job import ImportJob
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+async def create_job(session: AsyncSession, kind: str) -> ImportJob:
+    job = ImportJob(kind=kind)
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    return job
+
+
+async def get_job(session: AsyncSession, job_id: int) -> ImportJob | None:
+    return await session.get(ImportJob, job_id)
+
+
+async def update_job(session: AsyncSession, job_id: int, **values) -> ImportJob | None:
+    job = await session.get(ImportJob, job_id)
+    if job is None:
+        return None
+    for name, value in values.items():
+        setattr(job, name, value)
+    job.updated_at = utcnow()
+    session.add(job)
+    await session.commit()
+    return job
+
+
+async def fail_stale_jobs(session: AsyncSession, before: datetime) -> None:
+    """Задачи, чей процесс умер, не отпустив статус: блокировку никто не
+    держит, а строка всё ещё "running"."""
+    stmt = (
+        update(ImportJob)
+        .where(ImportJob.status.in_(ACTIVE_STATUSES), ImportJob.updated_at < before)
+        .values(status="failed", error="Interrupted", finished_at=utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await session.exec(stmt)
+    await session.commit()
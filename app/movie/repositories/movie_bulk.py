@@ -0,0 +1,362 @@
+from collections import defaultdict
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+from slugify import slugify
+from sqlalchemy import bindparam, column, delete, insert, or_, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.ndjson import iter_ndjson_lines
+from app.shared.links.movie_account_links import UserMovieVote
+from app.shared.media import media_service
+from ..models.catalog import utcnow
+from ..models.category import Category
+from ..models.genre import Genre
+from ..models.links import MovieGenreLink
+from ..models.movie import Movie, parse_release_date
+from ..schemas.movie import MovieBulkResult, MovieBulkUpsert
+from . import catalog_repo, movie_repo
+from .movie_search import get_dialect_name
+
+# Bulk-запись идёт Core-запросами в обход ORM, поэтому события Movie
+# (released_on, updated_at) здесь не срабатывают — поля заполняются вручную.
+MOVIE_TABLE = Movie.__table__
+LINK_TABLE = MovieGenreLink.__table__
+BULK_KEYS = ("id", "id_tmdb", "slug")
+MOVIE_IMAGE_COLUMNS = (
+    Movie.poster,
+    Movie.backdrop,
+    Movie.poster_renditions,
+    Movie.backdrop_renditions,
+)
+
+BulkRow = tuple[int, BaseModel]
+ApplyBatch = Callable[
+    [AsyncSession, list[BulkRow], str], Awaitable[list[MovieBulkResult]]
+]
+
+
+def bulk_key(row: BaseModel) -> tuple[str, Any]:
+    for name in BULK_KEYS:
+        value = getattr(row, name, None)
+        if value is not None and value != "":
+            return name, value
+    raise ValueError("Row has no key")
+
+
+def _error(line: int, message: str) -> MovieBulkResult:
+    return MovieBulkResult(line=line, status="error", error=message)
+
+
+def movie_values(row: BaseModel, fields: set[str]) -> dict[str, Any]:
+    values = row.model_dump(include=fields)
+    if "release_date" in values:
+        values["released_on"] = parse_release_date(values["release_date"])
+    values["updated_at"] = utcnow()
+    return values
+
+
+def new_movie_values(row: MovieBulkUpsert) -> dict[str, Any]:
+    values = movie_values(row, set(type(row).model_fields) - {"genres"})
+    values["slug"] = values["slug"] or slugify(row.title)
+    values["released_on"] = parse_release_date(row.release_date)
+    return values
+
+
+async def resolve_movie_ids(
+    session: AsyncSession, keys: list[tuple[str, Any]]
+) -> dict[tuple[str, Any], list[int]]:
+    """Один SELECT на батч: ключ (поле, значение) -> id найденных фильмов."""
+    conditions = []
+    for name in BULK_KEYS:
+        key_values = {value for key_name, value in keys if key_name == name}
+        if key_values:
+            conditions.append(getattr(Movie, name).in_(key_values))
+    if not conditions:
+        return {}
+    stmt = select(Movie.id, Movie.id_tmdb, Movie.slug).where(or_(*conditions))
+    found = defaultdict(list)
+    for row in (await session.exec(stmt)).all():
+        for name in BULK_KEYS:
+            found[(name, getattr(row, name))].append(row.id)
+    return found
+
+
+async def _existing_ids(session: AsyncSession, model, ids: set[int]) -> set[int]:
+    if not ids:
+        return set()
+    return set((await session.exec(select(model.id).where(model.id.in_(ids)))).all())
+
+
+async def check_references(
+    session: AsyncSession, batch: list[BulkRow]
+) -> tuple[list[BulkRow], dict[int, MovieBulkResult]]:
+    """Неизвестные жанры/категории отсекаем до записи: иначе FK уронит весь батч."""
+    genre_ids = {genre_id for _, row in batch for genre_id in row.genres}
+    category_ids = {row.category_id for _, row in batch if row.category_id is not None}
+    known_genres = await _existing_ids(session, Genre, genre_ids)
+    known_categories = await _existing_ids(session, Category, category_ids)
+
+    valid, errors = [], {}
+    for line, row in batch:
+        unknown_genres = sorted(set(row.genres) - known_genres)
+        if unknown_genres:
+            errors[line] = _error(line, f"Unknown genre ids: {unknown_genres}")
+        elif row.category_id is not None and row.category_id not in known_categories:
+            errors[line] = _error(line, f"Unknown category id: {row.category_id}")
+        else:
+            valid.append((line, row))
+    return valid, errors
+
+
+def _upsert_insert(dialect_name: str):
+    return pg_insert if dialect_name == "postgresql" else sqlite_insert
+
+
+async def insert_movies(
+    session: AsyncSession, rows: list[dict[str, Any]], dialect_name: str
+) -> list[int]:
+    """Многострочный INSERT ... ON CONFLICT (id_tmdb) DO UPDATE ... RETURNING id.
+
+    ON CONFLICT страхует от гонки с параллельной записью того же id_tmdb.
+    """
+    stmt = _upsert_insert(dialect_name)(MOVIE_TABLE)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MOVIE_TABLE.c.id_tmdb],
+        set_={name: stmt.excluded[name] for name in rows[0] if name != "id_tmdb"},
+    ).returning(MOVIE_TABLE.c.id, sort_by_parameter_order=True)
+    connection = await session.connection()
+    return list((await connection.execute(stmt, rows)).scalars())
+
+
+async def update_movies(
+    session: AsyncSession, rows: list[dict[str, Any]], dialect_name: str
+) -> None:
+    """UPDATE ... FROM (VALUES ...) — по одному запросу на набор колонок."""
+    groups = defaultdict(list)
+    for row in rows:
+        groups[tuple(sorted(name for name in row if name != "id"))].append(row)
+
+    connection = await session.connection()
+    for columns, group in groups.items():
+        if dialect_name == "postgresql":
+            data = values(
+                column("id", MOVIE_TABLE.c.id.type),
+                *(column(name, MOVIE_TABLE.c[name].type) for name in columns),
+                name="data",
+            ).data([(row["id"], *(row[name] for name in columns)) for row in group])
+            stmt = (
+                update(MOVIE_TABLE)
+                .where(MOVIE_TABLE.c.id == data.c.id)
+                .values({name: data.c[name] for name in columns})
+            )
+            await connection.execute(stmt)
+        else:
+            # Без VALUES-алиасов (SQLite): executemany одного UPDATE
+            stmt = (
+                update(MOVIE_TABLE)
+                .where(MOVIE_TABLE.c.id == bindparam("b_id"))
+                .values({name: bindparam(f"b_{name}") for name in columns})
+            )
+            await connection.execute(
+                stmt,
+                [{f"b_{name}": value for name, value in row.items()} for row in group],
+            )
+
+
+async def replace_genre_links(
+    session: AsyncSession, links: dict[int, list[int]]
+) -> None:
+    if not links:
+        return
+    connection = await session.connection()
+    await connection.execute(delete(LINK_TABLE).where(LINK_TABLE.c.movie_id.in_(links)))
+    pairs = [
+        {"movie_id": movie_id, "genre_id": genre_id}
+        for movie_id, genre_ids in links.items()
+        for genre_id in dict.fromkeys(genre_ids)
+    ]
+    if pairs:
+        await connection.execute(insert(LINK_TABLE), pairs)
+
+
+async def delete_movies(session: AsyncSession, movie_ids: list[int]) -> None:
+    images = await session.exec(
+        select(*MOVIE_IMAGE_COLUMNS).where(Movie.id.in_(movie_ids))
+    )
+    await media_service.release_urls(
+        session, media_service.media_urls(*(value for row in images for value in row))
+    )
+    connection = await session.connection()
+    for table, movie_column in (
+        (UserMovieVote.__table__, UserMovieVote.__table__.c.movie_id),
+        (LINK_TABLE, LINK_TABLE.c.movie_id),
+        (MOVIE_TABLE, MOVIE_TABLE.c.id),
+    ):
+        await connection.execute(delete(table).where(movie_column.in_(movie_ids)))
+
+
+def _resolve_one(
+    line: int, key: tuple[str, Any], found: dict
+) -> tuple[int | None, MovieBulkResult | None]:
+    movie_ids = found.get(key, [])
+    if len(movie_ids) > 1:
+        return None, _error(line, f"{key[0]}={key[1]!r} matches several movies")
+    return (movie_ids[0] if movie_ids else None), None
+
+
+async def apply_upsert_batch(
+    session: AsyncSession, batch: list[BulkRow], dialect_name: str
+) -> list[MovieBulkResult]:
+    valid, results = await check_references(session, batch)
+    keys = {line: bulk_key(row) for line, row in valid}
+    found = await resolve_movie_ids(session, list(keys.values()))
+
+    inserts, updates, links = [], [], {}
+    for line, row in valid:
+        movie_id, error = _resolve_one(line, keys[line], found)
+        if error is not None:
+            results[line] = error
+        elif movie_id is None:
+            inserts.append((line, row))
+        else:
+            fields = row.model_fields_set - {keys[line][0], "genres"}
+            updates.append({"id": movie_id, **movie_values(row, fields)})
+            if "genres" in row.model_fields_set:
+                links[movie_id] = row.genres
+            results[line] = MovieBulkResult(line=line, status="updated", id=movie_id)
+
+    if inserts:
+        new_ids = await insert_movies(
+            session, [new_movie_values(row) for _, row in inserts], dialect_name
+        )
+        for (line, row), movie_id in zip(inserts, new_ids):
+            links[movie_id] = row.genres
+            results[line] = MovieBulkResult(line=line, status="created", id=movie_id)
+    if updates:
+        await update_movies(session, updates, dialect_name)
+    await replace_genre_links(session, links)
+    return [results[line] for line, _ in batch]
+
+
+async def apply_patch_batch(
+    session: AsyncSession, batch: list[BulkRow], dialect_name: str
+) -> list[MovieBulkResult]:
+    valid, results = await check_references(session, batch)
+    keys = {line: bulk_key(row) for line, row in valid}
+    found = await resolve_movie_ids(session, list(keys.values()))
+
+    updates, links = [], {}
+    for line, row in valid:
+        movie_id, error = _resolve_one(line, keys[line], found)
+        if error is not None:
+            results[line] = error
+        elif movie_id is None:
+            results[line] = MovieBulkResult(line=line, status="not_found")
+        else:
+            fields = row.model_fields_set - {keys[line][0], "id", "genres"}
+            updates.append({"id": movie_id, **movie_values(row, fields)})
+            if "genres" in row.model_fields_set:
+                links[movie_id] = row.genres
+            results[line] = MovieBulkResult(line=line, status="updated", id=movie_id)
+
+    if updates:
+        await update_movies(session, updates, dialect_name)
+    await replace_genre_links(session, links)
+    return [results[line] for line, _ in batch]
+
+
+async def apply_delete_batch(
+    session: AsyncSession, batch: list[BulkRow], dialect_name: str
+) -> list[MovieBulkResult]:
+    keys = {line: bulk_key(row) for line, row in batch}
+    found = await resolve_movie_ids(session, list(keys.values()))
+
+    results, movie_ids = {}, []
+    for line, _ in batch:
+        movie_id, error = _resolve_one(line, keys[line], found)
+        if error is not None:
+            results[line] = error
+        elif movie_id is None:
+            results[line] = MovieBulkResult(line=line, status="not_found")
+        else:
+            movie_ids.append(movie_id)
+            results[line] = MovieBulkResult(line=line, status="deleted", id=movie_id)
+
+    if movie_ids:
+        await delete_movies(session, movie_ids)
+    return [results[line] for line, _ in batch]
+
+
+async def _commit_batch(
+    session: AsyncSession,
+    batch: list[BulkRow],
+    apply_batch: ApplyBatch,
+    dialect_name: str,
+) -> list[MovieBulkResult]:
+    try:
+        results = await apply_batch(session, batch, dialect_name)
+        await catalog_repo.bump_catalog_version(session)
+        await session.commit()
+    except SQLAlchemyError as exc:
+        await session.rollback()
+        message = str(getattr(exc, "orig", None) or exc).splitlines()[0]
+        return [_error(line, f"Batch failed: {message}") for line, _ in batch]
+    movie_repo.invalidate_catalog(
+        *(movie_repo.movie_tag(result.id) for result in results if result.id)
+    )
+    return results
+
+
+def _encode(result: MovieBulkResult) -> bytes:
+    return result.model_dump_json(exclude_none=True).encode() + b"\n"
+
+
+async def stream_bulk_results(
+    session: AsyncSession,
+    chunks: AsyncIterable[bytes],
+    schema: type[BaseModel],
+    apply_batch: ApplyBatch,
+) -> AsyncIterator[bytes]:
+    """Читает NDJSON по мере поступления и пишет батчами по
+    MOVIE_BULK_BATCH_SIZE строк, по транзакции на батч. Результат — NDJSON
+    с итогом по каждой входной строке.
+
+    Повтор ключа внутри батча сбрасывает батч досрочно: один многострочный
+    INSERT ... ON CONFLICT не может обновить строку дважды.
+    """
+    dialect_name = await get_dialect_name(session)
+    batch: list[BulkRow] = []
+    batch_keys: set[tuple[str, Any]] = set()
+
+    async for line, raw in iter_ndjson_lines(
+        chunks, settings.MOVIE_BULK_MAX_LINE_BYTES
+    ):
+        if raw is None:
+            yield _encode(_error(line, "Line is too long"))
+            continue
+        try:
+            row = schema.model_validate_json(raw)
+        except ValidationError as exc:
+            yield _encode(_error(line, exc.errors()[0]["msg"]))
+            continue
+
+        key = bulk_key(row)
+        if key in batch_keys or len(batch) >= settings.MOVIE_BULK_BATCH_SIZE:
+            for result in await _commit_batch(
+                session, batch, apply_batch, dialect_name
+            ):
+                yield _encode(result)
+            batch, batch_keys = [], set()
+        batch.append((line, row))
+        batch_keys.add(key)
+
+    if batch:
+        for result in await _commit_batch(session, batch, apply_batch, dialect_name):
+            yield _encode(result)
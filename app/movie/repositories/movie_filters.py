@@ -0,0 +1,179 @@
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import ColumnElement, Integer, any_, bindparam, exists, false
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import func, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from ..models.links import MovieGenreLink
+from ..models.movie import Movie
+from ..schemas.movie import GenreMode, MovieFilters, TitleSearchMode
+from .movie_search import title_search_condition, title_search_params, title_term_count
+
+RANGE_COLUMNS = {
+    "vote_average": Movie.vote_average,
+    "vote_count": Movie.vote_count,
+    "duration": Movie.duration,
+    "popularity": Movie.popularity,
+}
+
+
+@dataclass(frozen=True)
+class FilterShape:
+    """Какие фильтры заданы (но не их значения): по форме кэшируется
+    собранный запрос, значения приходят bind-параметрами из filter_params."""
+
+    dialect_name: str
+    categories: bool = False
+    adult: bool = False
+    genre_mode: GenreMode | None = None
+    exclude_genres: bool = False
+    ranges: tuple[str, ...] = ()
+    release_date_from: bool = False
+    release_date_to: bool = False
+    release_year: bool = False
+    search_mode: TitleSearchMode | None = None
+    title_terms: int = 0
+
+
+def ids_condition(column, name: str, dialect_name: str) -> ColumnElement[bool]:
+    """Список id одним параметром. В Postgres — массив (= ANY): текст запроса
+    не зависит от длины списка, и prepared statement asyncpg переиспользуется."""
+    if dialect_name == "postgresql":
+        return column == any_(bindparam(name, type_=ARRAY(Integer)))
+    return column.in_(bindparam(name, expanding=True))
+
+
+def genre_condition(genre_mode: GenreMode, dialect_name: str) -> ColumnElement[bool]:
+    """Один semi-join на moviegenrelink вместо EXISTS на каждый жанр."""
+    genre_ids = ids_condition(MovieGenreLink.genre_id, "genres", dialect_name)
+    if genre_mode == "all":
+        matching = (
+            select(MovieGenreLink.movie_id)
+            .where(genre_ids)
+            .group_by(MovieGenreLink.movie_id)
+            .having(func.count() == bindparam("genre_count"))
+        )
+        return Movie.id.in_(matching)
+    return exists().where(MovieGenreLink.movie_id == Movie.id, genre_ids)
+
+
+def excluded_genres_condition(dialect_name: str) -> ColumnElement[bool]:
+    # NOT EXISTS планируется как anti-join, в отличие от NOT IN (subquery)
+    return ~exists().where(
+        MovieGenreLink.movie_id == Movie.id,
+        ids_condition(MovieGenreLink.genre_id, "exclude_genres", dialect_name),
+    )
+
+
+def _set_ranges(filters: MovieFilters) -> dict[str, float | int]:
+    values = {}
+    for name in RANGE_COLUMNS:
+        for bound in ("min", "max"):
+            value = getattr(filters, f"{name}_{bound}")
+            if value is not None:
+                values[f"{name}_{bound}"] = value
+    return values
+
+
+def filter_shape(filters: MovieFilters, dialect_name: str) -> FilterShape:
+    genre_mode = None
+    if filters.genres:
+        # "all" с одним жанром — тот же semi-join, что и "any"
+        genre_mode = "all" if filters.genre_mode == "all" else "any"
+        if len(set(filters.genres)) == 1:
+            genre_mode = "any"
+    search_mode = filters.search_mode if filters.title else None
+    return FilterShape(
+        dialect_name=dialect_name,
+        categories=bool(filters.categories),
+        adult=filters.adult,
+        genre_mode=genre_mode,
+        exclude_genres=bool(filters.exclude_genres),
+        ranges=tuple(_set_ranges(filters)),
+        release_date_from=filters.release_date_from is not None,
+        release_date_to=filters.release_date_to is not None,
+        release_year=filters.release_year is not None,
+        search_mode=search_mode,
+        title_terms=(
+            title_term_count(filters.title, search_mode, dialect_name)
+            if search_mode
+            else 0
+        ),
+    )
+
+
+def filter_params(filters: MovieFilters, dialect_name: str) -> dict:
+    params = {}
+    if filters.categories:
+        params["categories"] = sorted(set(filters.categories))
+    if filters.genres:
+        params["genres"] = sorted(set(filters.genres))
+        params["genre_count"] = len(params["genres"])
+    if filters.exclude_genres:
+        params["exclude_genres"] = sorted(set(filters.exclude_genres))
+    params.update(_set_ranges(filters))
+    if filters.release_date_from is not None:
+        params["release_date_from"] = filters.release_date_from
+    if filters.release_date_to is not None:
+        params["release_date_to"] = filters.release_date_to
+    if filters.release_year is not None:
+        params["release_year_start"] = date(filters.release_year, 1, 1)
+        params["release_year_end"] = date(filters.release_year + 1, 1, 1)
+    if filters.title:
+        params.update(
+            title_search_params(filters.title, filters.search_mode, dialect_name)
+        )
+    return params
+
+
+def filter_conditions(shape: FilterShape) -> list[ColumnElement[bool]]:
+    """WHERE листинга для формы фильтров, значения — bind-параметрами.
+
+    Предикаты идут в порядке составного индекса (category_id, adult, id),
+    а сравнение adult = false (а не NOT adult / IS false) попадает в индекс.
+    Даты — полуинтервалы по released_on, чтобы планировщик мог взять range scan.
+    """
+    conditions = []
+    if shape.categories:
+        conditions.append(
+            ids_condition(Movie.category_id, "categories", shape.dialect_name)
+        )
+    if not shape.adult:
+        conditions.append(Movie.adult == false())
+    if shape.genre_mode:
+        conditions.append(genre_condition(shape.genre_mode, shape.dialect_name))
+    if shape.exclude_genres:
+        conditions.append(excluded_genres_condition(shape.dialect_name))
+    for name in shape.ranges:
+        column = RANGE_COLUMNS[name.removesuffix("_min").removesuffix("_max")]
+        if name.endswith("_min"):
+            conditions.append(column >= bindparam(name))
+        else:
+            conditions.append(column <= bindparam(name))
+    if shape.release_date_from:
+        conditions.append(Movie.released_on >= bindparam("release_date_from"))
+    if shape.release_date_to:
+        conditions.append(Movie.released_on <= bindparam("release_date_to"))
+    if shape.release_year:
+        conditions.append(Movie.released_on >= bindparam("release_year_start"))
+        conditions.append(Movie.released_on < bindparam("release_year_end"))
+    if shape.search_mode:
+        condition = title_search_condition(
+            shape.search_mode, shape.dialect_name, shape.title_terms
+        )
+        if condition is not None:
+            conditions.append(condition)
+    return conditions
+
+
+def apply_movie_filters(
+    stmt: SelectOfScalar, filters: MovieFilters, dialect_name: str
+) -> SelectOfScalar:
+    """Компилирует MovieFilters в WHERE для любого листинга фильмов
+    (значения уже подставлены; горячие листинги берут готовый запрос
+    из movie_statements и передают filter_params при выполнении)."""
+    params = filter_params(filters, dialect_name)
+    conditions = filter_conditions(filter_shape(filters, dialect_name))
+    return stmt.where(*(condition.params(params) for condition in conditions))
@@ -1,11 +1,283 @@
+import json
+from datetime import date
+from typing import Any, Literal
+
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
+from sqlmodel import func, select, tuple_
+from sqlmodel.sql.expression import Select, SelectOfScalar
 from datetime import datetime
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, bindparam, literal_column
+from sqlalchemy.orm import joinedload, selectinload
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.exceptions import InvalidInputError
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.response_cache import response_cache
+from ..models.category import Category
+from ..models.genre import Genre
+from ..models.links import MovieGenreLink
 from ..models.movie import Movie
+from ..schemas.movie import MovieBatchView, MovieFilters
+
+MovieSortBy = Literal["latest", "newest", "popular"]
+MovieCountMode = Literal["auto", "exact", "estimated"]
+
+# Колонка сортировки для каждого режима; id всегда добавляется как tiebreaker,
+# чтобы (sort_key, id) был уникален и keyset-переход был детерминированным.
+MOVIE_SORT_KEYS = {
+    "latest": None,
+    "newest": Movie.released_on,
+    "popular": Movie.popularity,
+}
+# Вместо NULL ключ сортировки получает значение ниже любого настоящего: фильмы
+# без даты/популярности идут в конце ленты, а (sort_key, id) сравним всегда.
+# SQL-литералы совпадают с индексами миграции b7e4a2d9c815.
+MOVIE_SORT_FLOORS = {
+    "newest": (date.min, literal_column("'0001-01-01'")),
+    "popular": (-1.0, literal_column("-1.0")),
+}
+
+
+# Колонки карточки MovieReadMainPage (+ ключи сортировки для курсора)
+MAIN_PAGE_COLUMNS = (
+    Movie.id,
+    Movie.title,
+    Movie.release_date,
+    Movie.age_rating,
+    Movie.duration,
+    Movie.poster,
+    Movie.backdrop,
+    Movie.poster_renditions,
+    Movie.backdrop_renditions,
+    Movie.is_premium,
+    Movie.is_vip_only,
+    Movie.popularity,
+    Movie.released_on,
+)
 
 
 async def get_movie(session: AsyncSession, movie_id):
     result = await session.get(Movie, movie_id)
     return result
+
+
+async def get_movies_by_ids(
+    session: AsyncSession, ids: list[int], view: MovieBatchView = "full"
+) -> tuple[list[Movie | Row], list[int]]:
+    """Фильмы по списку id в порядке запроса и id, которых нет в базе.
+
+    full: один SELECT с JOIN категории + один selectin по жанрам;
+    card: одна проекция main_page_select.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    filtered = select(Movie).where(Movie.id.in_(unique_ids))
+    if view == "card":
+        stmt = main_page_select(filtered)
+    else:
+        stmt = filtered.options(joinedload(Movie.category), selectinload(Movie.genres))
+    by_id = {row.id: row for row in (await session.exec(stmt)).all()}
+    found = [by_id[movie_id] for movie_id in unique_ids if movie_id in by_id]
+    missing = [movie_id for movie_id in unique_ids if movie_id not in by_id]
+    return found, missing
+
+
+def primary_genre_name():
+    # Коррелированный подзапрос: Postgres считает его только для строк страницы
+    return (
+        select(Genre.name)
+        .join(MovieGenreLink, MovieGenreLink.genre_id == Genre.id)
+        .where(MovieGenreLink.movie_id == Movie.id)
+        .order_by(MovieGenreLink.genre_id)
+        .limit(1)
+        .correlate(Movie)
+        .scalar_subquery()
+    )
+
+
+def main_page_select(filtered: SelectOfScalar) -> Select:
+    """Лёгкий листинг: только колонки карточки, категория и первый жанр в том же
+    запросе, без загрузки ORM-объектов и selectinload-раундтрипов."""
+    stmt = (
+        select(
+            *MAIN_PAGE_COLUMNS,
+            Category.name.label("category"),
+            primary_genre_name().label("genre"),
+        )
+        .select_from(Movie)
+        .outerjoin(Category, Category.id == Movie.category_id)
+    )
+    if filtered.whereclause is not None:
+        stmt = stmt.where(filtered.whereclause)
+    return stmt
+
+
+def movie_sort_key(sort_by: MovieSortBy):
+    sort_column = MOVIE_SORT_KEYS[sort_by]
+    if sort_column is None:
+        return None
+    return func.coalesce(sort_column, MOVIE_SORT_FLOORS[sort_by][1])
+
+
+def apply_movie_sorting(stmt: SelectOfScalar, sort_by: MovieSortBy) -> SelectOfScalar:
+    sort_key = movie_sort_key(sort_by)
+    if sort_key is None:
+        return stmt.order_by(Movie.id.desc())
+    return stmt.order_by(sort_key.desc(), Movie.id.desc())
+
+
+def keyset_params(sort_by: MovieSortBy, cursor: str) -> dict:
+    """Позиция курсора как bind-параметры для keyset_condition."""
+    position = decode_cursor(cursor)
+    sort_column = MOVIE_SORT_KEYS[sort_by]
+    if (
+        position.get("sort_by") != sort_by
+        or not isinstance(position.get("id"), int)
+        or (sort_column is not None and "value" not in position)
+    ):
+        raise InvalidInputError(
+            field="cursor", message="Cursor does not match the requested sort order"
+        )
+
+    if sort_column is None:
+        return {"cursor_id": position["id"]}
+    value = position["value"]
+    if value is None:
+        # Курсор уже в хвосте ленты — среди фильмов без ключа
+        value = MOVIE_SORT_FLOORS[sort_by][0]
+    elif sort_column is Movie.released_on:
+        try:
+            value = date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise InvalidInputError(field="cursor", message="Invalid pagination cursor")
+    return {"cursor_value": value, "cursor_id": position["id"]}
+
+
+def keyset_condition(sort_by: MovieSortBy):
+    sort_key = movie_sort_key(sort_by)
+    if sort_key is None:
+        return Movie.id < bindparam("cursor_id")
+    return tuple_(sort_key, Movie.id) < tuple_(
+        bindparam("cursor_value", type_=sort_key.type), bindparam("cursor_id")
+    )
+
+
+def apply_movie_keyset(
+    stmt: SelectOfScalar, sort_by: MovieSortBy, cursor: str
+) -> SelectOfScalar:
+    params = keyset_params(sort_by, cursor)
+    return stmt.where(keyset_condition(sort_by).params(params))
+
+
+def make_movie_cursor(movie: Movie | Row, sort_by: MovieSortBy) -> str:
+    sort_column = MOVIE_SORT_KEYS[sort_by]
+    payload = {"sort_by": sort_by, "id": movie.id}
+    if sort_column is not None:
+        value = getattr(movie, sort_column.key)
+        payload["value"] = value.isoformat() if isinstance(value, date) else value
+    return encode_cursor(payload)
+
+
+# (filter_key, count_mode) -> (total_items, is_estimated)
+movie_count_cache = TTLCache(
+    ttl=settings.MOVIE_COUNT_CACHE_TTL, maxsize=settings.MOVIE_COUNT_CACHE_SIZE
+)
+
+
+def make_filter_key(**filters: Any) -> tuple:
+    """Нормализует набор фильтров, чтобы одинаковые запросы давали один ключ."""
+    normalized = []
+    for name, value in sorted(filters.items()):
+        if value is None or value == []:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(set(value)))
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        normalized.append((name, value))
+    return tuple(normalized)
+
+
+def invalidate_movie_counts() -> None:
+    movie_count_cache.clear()
+
+
+# Теги кэша ответов: "catalog" висит на всех листингах, точечные теги —
+# на записях, которые зависят от конкретного фильма/категории/жанра.
+CATALOG_TAG = "catalog"
+
+
+def movie_tag(movie_id: int) -> str:
+    return f"movie:{movie_id}"
+
+
+def category_tag(category_id: int) -> str:
+    return f"category:{category_id}"
+
+
+def genre_tag(genre_id: int) -> str:
+    return f"genre:{genre_id}"
+
+
+def listing_tags(filters: MovieFilters) -> list[str]:
+    return [
+        CATALOG_TAG,
+        *(category_tag(category_id) for category_id in filters.categories),
+        *(genre_tag(genre_id) for genre_id in filters.genres),
+    ]
+
+
+def invalidate_catalog(*tags: str) -> None:
+    """Сбрасывает счётчики и кэш листингов после записи в каталог."""
+    invalidate_movie_counts()
+    response_cache.invalidate(CATALOG_TAG, *tags)
+
+
+async def estimate_row_count(
+    session: AsyncSession, stmt: SelectOfScalar, params: dict | None = None
+) -> int | None:
+    """Оценка числа строк по плану Postgres (EXPLAIN), без выполнения запроса."""
+    connection = await session.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+    # Значения уходят bind-параметрами, а не literal_binds: у REGCONFIG
+    # (websearch_to_tsquery в fulltext-поиске) нет литерального рендера
+    compiled = stmt.compile(dialect=connection.dialect)
+    values = compiled.construct_params(params)
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}",
+        tuple(values[name] for name in compiled.positiontup),
+    )
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_movies(
+    session: AsyncSession,
+    stmt: SelectOfScalar,
+    filter_key: tuple,
+    count_mode: MovieCountMode = "auto",
+    params: dict | None = None,
+) -> tuple[int, bool]:
+    cache_key = (filter_key, count_mode)
+    cached = movie_count_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    estimated_total = None
+    if count_mode != "exact":
+        estimated_total = await estimate_row_count(session, stmt, params)
+
+    if estimated_total is not None and (
+        count_mode == "estimated"
+        or estimated_total >= settings.MOVIE_COUNT_ESTIMATE_THRESHOLD
+    ):
+        counted = (estimated_total, True)
+    else:
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+        counted = ((await session.exec(count_stmt, params=params)).one(), False)
+
+    movie_count_cache.set(cache_key, counted)
+    return counted
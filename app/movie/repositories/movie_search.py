@@ -0,0 +1,197 @@
+from difflib import SequenceMatcher
+from typing import Literal
+
+from sqlalchemy import ColumnElement, bindparam, case, desc, literal, literal_column
+from sqlalchemy.orm import selectinload
+from sqlmodel import and_, func, not_, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from ..models.movie import Movie
+from ..schemas.movie import TitleSearchMode
+
+SearchMatch = Literal["auto", "fulltext", "fuzzy"]
+
+# GIN-индекс по этому выражению создаёт миграция 9b4e7d2c1a60 только в Postgres
+# (SQLite-движок тестов про tsvector не знает). Текст держим литералом один в
+# один с миграцией: с bind-параметрами планировщик не сопоставит его с индексом.
+TS_CONFIG = "simple"
+SEARCH_VECTOR = literal_column(
+    "(setweight(to_tsvector('simple'::regconfig, coalesce(movie.title, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(movie.original_title, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(movie.description, '')), 'C'))"
+)
+
+# Порог похожести для fuzzy-поиска без pg_trgm (SQLite)
+FUZZY_MIN_RATIO = 0.6
+
+
+async def get_dialect_name(session: AsyncSession) -> str:
+    return (await session.connection()).dialect.name
+
+
+def _search_terms(query: str) -> list[str]:
+    return [term for term in query.split() if term]
+
+
+def _like_condition(patterns: list):
+    # Шаблоны — строки '%term%' или bind-параметры с ними
+    return and_(
+        *[
+            or_(
+                Movie.title.ilike(pattern),
+                Movie.original_title.ilike(pattern),
+                Movie.description.ilike(pattern),
+            )
+            for pattern in patterns
+        ]
+    )
+
+
+def _like_rank(terms: list[str]):
+    # Те же веса, что и у tsvector: title (A) > original_title (B) > description (C)
+    rank = literal(0.0)
+    for term in terms:
+        rank = rank + (
+            case((Movie.title.ilike(f"%{term}%"), 1.0), else_=0.0)
+            + case((Movie.original_title.ilike(f"%{term}%"), 0.4), else_=0.0)
+            + case((Movie.description.ilike(f"%{term}%"), 0.1), else_=0.0)
+        )
+    return rank
+
+
+def title_term_count(
+    title: str, search_mode: TitleSearchMode, dialect_name: str
+) -> int:
+    """Часть формы запроса: LIKE-фоллбэк даёт по условию на каждое слово."""
+    if search_mode == "fulltext" and dialect_name != "postgresql":
+        return len(_search_terms(title))
+    return 1
+
+
+def title_search_condition(
+    search_mode: TitleSearchMode, dialect_name: str, term_count: int
+) -> ColumnElement[bool] | None:
+    """Условие по названию с bind-параметрами (значения — title_search_params)."""
+    if search_mode == "contains":
+        # В Postgres ILIKE '%...%' обслуживается trigram-индексом ix_movie_title_trgm
+        return Movie.title.ilike(bindparam("title_pattern"))
+    if dialect_name == "postgresql":
+        tsquery = func.websearch_to_tsquery(TS_CONFIG, bindparam("title_query"))
+        return SEARCH_VECTOR.op("@@")(tsquery)
+    if not term_count:
+        return None
+    terms = [bindparam(f"title_term_{index}") for index in range(term_count)]
+    return _like_condition(terms)
+
+
+def title_search_params(
+    title: str, search_mode: TitleSearchMode, dialect_name: str
+) -> dict:
+    if search_mode == "contains":
+        return {"title_pattern": f"%{title}%"}
+    if dialect_name == "postgresql":
+        return {"title_query": title}
+    return {
+        f"title_term_{index}": f"%{term}%"
+        for index, term in enumerate(_search_terms(title))
+    }
+
+
+def apply_title_search(
+    stmt: SelectOfScalar, title: str, search_mode: TitleSearchMode, dialect_name: str
+) -> SelectOfScalar:
+    """Фильтр по названию для листингов: подстрока или полнотекстовый поиск."""
+    condition = title_search_condition(
+        search_mode, dialect_name, title_term_count(title, search_mode, dialect_name)
+    )
+    if condition is None:
+        return stmt
+    return stmt.where(
+        condition.params(title_search_params(title, search_mode, dialect_name))
+    )
+
+
+async def _fuzzy_ids_fallback(
+    session: AsyncSession, query: str, adult: bool, limit: int, offset: int
+) -> list[tuple[int, float]]:
+    # Медленный путь без pg_trgm: сравниваем названия в Python
+    stmt = select(Movie.id, Movie.title)
+    if not adult:
+        stmt = stmt.where(not_(Movie.adult))
+    needle = query.lower()
+    scored = []
+    for movie_id, title in (await session.exec(stmt)).all():
+        haystack = (title or "").lower()
+        ratio = max(
+            [SequenceMatcher(None, needle, haystack).ratio()]
+            + [SequenceMatcher(None, needle, word).ratio() for word in haystack.split()]
+        )
+        if ratio >= FUZZY_MIN_RATIO:
+            scored.append((movie_id, ratio))
+    scored.sort(key=lambda item: (-item[1], -item[0]))
+    return scored[offset : offset + limit]
+
+
+async def search_movies(
+    session: AsyncSession,
+    query: str,
+    *,
+    adult: bool = False,
+    match: SearchMatch = "auto",
+    limit: int = 10,
+    offset: int = 0,
+) -> tuple[list[tuple[Movie, float]], str]:
+    """Ранжированный поиск по title/original_title/description.
+
+    match=auto сначала ищет полнотекстово и, если первая страница пуста,
+    переключается на fuzzy-поиск по названию (опечатки). Возвращает строки
+    (movie, rank) и фактически использованный режим.
+    """
+    dialect_name = await get_dialect_name(session)
+    loaders = (selectinload(Movie.genres), selectinload(Movie.category))
+    adult_filter = () if adult else (not_(Movie.adult),)
+
+    if match in ("auto", "fulltext"):
+        if dialect_name == "postgresql":
+            tsquery = func.websearch_to_tsquery(TS_CONFIG, query)
+            rank = func.ts_rank_cd(SEARCH_VECTOR, tsquery)
+            condition = SEARCH_VECTOR.op("@@")(tsquery)
+        else:
+            terms = _search_terms(query)
+            rank = _like_rank(terms)
+            condition = _like_condition([f"%{term}%" for term in terms])
+        stmt = (
+            select(Movie, rank.label("rank"))
+            .options(*loaders)
+            .where(condition, *adult_filter)
+            .order_by(desc("rank"), Movie.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = (await session.exec(stmt)).all()
+        if rows or match == "fulltext" or offset:
+            return [(movie, float(rank)) for movie, rank in rows], "fulltext"
+
+    if dialect_name == "postgresql":
+        # title %> query == word_similarity(query, title) >= порога, GIN trgm индекс
+        rank = func.word_similarity(query, Movie.title)
+        stmt = (
+            select(Movie, rank.label("rank"))
+            .options(*loaders)
+            .where(Movie.title.op("%>")(query), *adult_filter)
+            .order_by(desc("rank"), Movie.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = (await session.exec(stmt)).all()
+        return [(movie, float(rank)) for movie, rank in rows], "fuzzy"
+
+    scored = await _fuzzy_ids_fallback(session, query, adult, limit, offset)
+    if not scored:
+        return [], "fuzzy"
+    ranks = dict(scored)
+    stmt = select(Movie).options(*loaders).where(Movie.id.in_(ranks))
+    movies = (await session.exec(stmt)).all()
+    movies = sorted(movies, key=lambda movie: (-ranks[movie.id], -movie.id))
+    return [(movie, ranks[movie.id]) for movie in movies], "fuzzy"
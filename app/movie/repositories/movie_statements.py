@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from threading import Lock
+
+from sqlalchemy import bindparam
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+from app.core.config import settings
+from ..models.movie import Movie
+from .movie_filters import FilterShape, filter_conditions
+from .movie_repo import (
+    MOVIE_SORT_KEYS,
+    MovieSortBy,
+    apply_movie_sorting,
+    keyset_condition,
+    main_page_select,
+)
+
+
+class StatementCache:
+    """Готовые SELECT листингов по форме фильтров.
+
+    Запрос собирается один раз на форму; значения фильтров, курсора и
+    limit/offset — bind-параметры при выполнении. SQLAlchemy запоминает ключ
+    кэша компиляции на самом объекте, так что повторный запрос не строит
+    выражение и не компилирует SQL, а одинаковый текст SQL даёт asyncpg
+    переиспользовать prepared statement.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._statements: OrderedDict[Hashable, Select] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, build: Callable[[], Select]) -> Select:
+        with self._lock:
+            stmt = self._statements.get(key)
+            if stmt is not None:
+                self.hits += 1
+                self._statements.move_to_end(key)
+                return stmt
+            self.misses += 1
+        stmt = build()
+        with self._lock:
+            self._statements[key] = stmt
+            while len(self._statements) > self.maxsize:
+                self._statements.popitem(last=False)
+        return stmt
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._statements),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+listing_statements = StatementCache(settings.MOVIE_STATEMENT_CACHE_SIZE)
+
+
+def filtered_movies(shape: FilterShape) -> SelectOfScalar:
+    return listing_statements.get(
+        ("filtered", shape), lambda: select(Movie).where(*filter_conditions(shape))
+    )
+
+
+def offset_listing(shape: FilterShape, sort_by: MovieSortBy) -> Select:
+    """Карточки страницы page: параметры limit и offset.
+
+    Порядок тот же, что у ленты по курсору (фильмы без ключа в конце, id как
+    tiebreaker), так что обе пагинации отдают одни и те же строки.
+    """
+
+    def build() -> Select:
+        stmt = main_page_select(filtered_movies(shape))
+        return (
+            apply_movie_sorting(stmt, sort_by)
+            .offset(bindparam("offset"))
+            .limit(bindparam("limit"))
+        )
+
+    return listing_statements.get(("offset", shape, sort_by), build)
+
+
+def cursor_listing(
+    shape: FilterShape, sort_by: MovieSortBy, keyset: bool, after_last_id: bool
+) -> Select:
+    """Лента по курсору: параметры limit и keyset_params (cursor_*) или last_id."""
+
+    def build() -> Select:
+        stmt = main_page_select(filtered_movies(shape))
+        if keyset:
+            stmt = stmt.where(keyset_condition(sort_by))
+        elif after_last_id:
+            stmt = stmt.where(Movie.id < bindparam("last_id"))
+        return apply_movie_sorting(stmt, sort_by).limit(bindparam("limit"))
+
+    return listing_statements.get(
+        ("cursor", shape, sort_by, keyset, after_last_id), build
+    )
+
+
+def category_listing(shape: FilterShape, after_last_id: bool) -> SelectOfScalar:
+    """Полные фильмы категории по возрастанию id: параметры limit и last_id."""
+
+    def build() -> SelectOfScalar:
+        stmt = filtered_movies(shape)
+        if after_last_id:
+            stmt = stmt.where(Movie.id > bindparam("last_id"))
+        return (
+            stmt.order_by(Movie.id)
+            .limit(bindparam("limit"))
+            .options(selectinload(Movie.genres), selectinload(Movie.category))
+        )
+
+    return listing_statements.get(("category", shape, after_last_id), build)
+
+
+def hot_statements(dialect_name: str) -> list[tuple[Select, dict]]:
+    """Листинги без фильтров во всех сортировках (первая страница) —
+    основная масса запросов; их готовит прогрев при старте."""
+    shape = FilterShape(dialect_name=dialect_name)
+    statements = []
+    for sort_by in MOVIE_SORT_KEYS:
+        statements.append((offset_listing(shape, sort_by), {"offset": 0, "limit": 11}))
+        statements.append(
+            (
+                cursor_listing(shape, sort_by, keyset=False, after_last_id=False),
+                {"limit": 11},
+            )
+        )
+    return statements
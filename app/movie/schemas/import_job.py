@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from pydantic import BaseModel, computed_field
+
+
+class ImportJobRead(BaseModel):
+    model_config = {"from_attributes": True}
+
+    id: int
+    kind: str
+    status: str
+    cancel_requested: bool
+    rows_read: int
+    rows_written: int
+    rows_skipped: int
+    batches: int
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    updated_at: datetime
+
+    @computed_field
+    @property
+    def rows_per_second(self) -> float | None:
+        if self.started_at is None:
+            return None
+        # SQLite отдаёт даты без зоны, а свежие значения из Python — с зоной
+        end = (self.finished_at or self.updated_at).replace(tzinfo=None)
+        elapsed = (end - self.started_at.replace(tzinfo=None)).total_seconds()
+        return round(self.rows_read / elapsed, 1) if elapsed > 0 else None
@@ -1,4 +1,12 @@
-from pydantic import BaseModel, Field, ConfigDict
+from datetime import date
+from typing import Literal
+
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+
+TitleSearchMode = Literal["contains", "fulltext"]
+GenreMode = Literal["any", "all"]
+# {"w185": {"webp": "static/posters/..", "jpeg": "static/posters/.."}, ...}
+ImageRenditions = dict[str, dict[str, str]]
 
 
 class MovieBase(BaseModel):
@@ -17,6 +25,8 @@ class MovieRead(MovieBase):
     original_language: str | None = Field(default=None, max_length=15)
     poster: str | None = None
     backdrop: str | None = None
+    poster_renditions: ImageRenditions | None = None
+    backdrop_renditions: ImageRenditions | None = None
     release_date: str | None = Field(default=None, max_length=10)
     popularity: float | None = Field(default=None, ge=0.0)
     vote_average: float | None = Field(default=None, ge=0.0, le=10.0)
@@ -54,20 +64,52 @@ class MovieReadMainPage(BaseModel):
     duration: int | None = None
     poster: str | None = None
     backdrop: str | None = None
+    poster_renditions: ImageRenditions | None = None
+    backdrop_renditions: ImageRenditions | None = None
     is_premium: bool
     is_vip_only: bool
 
 
+class MovieSearchItem(MovieReadMainPage):
+    rank: float = Field(description="Relevance score, higher is better")
+
+
+class MetaDataSearch(BaseModel):
+    page: int
+    per_page: int
+    has_more: bool
+    match: str = Field(
+        description="fulltext or fuzzy; pass it back as `match` for the next pages"
+    )
+
+
+class PaginatedSearchMovieRead(BaseModel):
+    meta: MetaDataSearch
+    items: list[MovieSearchItem]
+
+
 class MetaDataOffset(BaseModel):
     page: int
     per_page: int
-    total_items: int
-    total_pages: int
+    total_items: int | None = Field(
+        default=None, description="Not calculated when include_total=false"
+    )
+    total_pages: int | None = None
+    is_estimated: bool = Field(
+        default=False,
+        description="total_items is a query planner estimate, not an exact count",
+    )
     has_more: bool
 
 
 class MetaDataCursor(BaseModel):
-    next_cursor: int | None = None
+    next_cursor: str | None = Field(
+        default=None, description="Opaque cursor to pass as `cursor` for the next page"
+    )
+    last_id: int | None = Field(
+        default=None, description="Deprecated: id of the last movie on the page"
+    )
+    sort_by: str = "latest"
     per_page: int
     has_more: bool
 
@@ -86,6 +128,29 @@ class PaginatedCursorMovieRead(BaseModel):
     items: list[MovieReadMainPage]
 
 
+# Лимит id в одном batch-запросе: один IN (...) и один selectin по жанрам
+MOVIE_BATCH_MAX_IDS = 300
+MovieBatchView = Literal["full", "card"]
+
+
+class MovieBatchRequest(BaseModel):
+    ids: list[int] = Field(
+        min_length=1,
+        max_length=MOVIE_BATCH_MAX_IDS,
+        description="Movie IDs; the response keeps this order (duplicates dropped)",
+    )
+    view: MovieBatchView = Field(
+        default="full", description="full (MovieRead) or card (MovieReadMainPage)"
+    )
+
+
+class MovieBatchRead(BaseModel):
+    items: list[MovieRead] | list[MovieReadMainPage]
+    missing_ids: list[int] = Field(
+        default_factory=list, description="Requested IDs that do not exist"
+    )
+
+
 class MovieCreate(MovieBase):
     release_date: str | None = Field(
         default=None,
@@ -157,6 +222,58 @@ class MovieUpdate(MovieBase):
     genre_id: int | None = Field(default=None)
 
 
+MovieBulkStatus = Literal["created", "updated", "deleted", "not_found", "error"]
+
+
+class MovieBulkKey(BaseModel):
+    """Строка NDJSON для bulk-удаления: фильм ищется по id, id_tmdb или slug."""
+
+    id: int | None = None
+    id_tmdb: int | None = None
+    slug: str | None = Field(default=None, max_length=512)
+
+    @model_validator(mode="after")
+    def check_key(self):
+        if self.id is None and self.id_tmdb is None and not self.slug:
+            raise ValueError("id, id_tmdb or slug is required")
+        return self
+
+
+class MovieBulkUpsert(MovieCreate):
+    """Создание или обновление по id_tmdb (приоритетно) или slug.
+
+    У существующего фильма меняются только переданные поля.
+    """
+
+    @model_validator(mode="after")
+    def check_key(self):
+        if self.id_tmdb is None and not self.slug:
+            raise ValueError("id_tmdb or slug is required")
+        return self
+
+
+class MovieBulkPatch(MovieCreate):
+    """Частичное обновление: ключ id, id_tmdb или slug + изменяемые поля."""
+
+    id: int | None = None
+    title: str | None = Field(default=None, max_length=512)
+
+    @model_validator(mode="after")
+    def check_key(self):
+        if self.id is None and self.id_tmdb is None and not self.slug:
+            raise ValueError("id, id_tmdb or slug is required")
+        if "title" in self.model_fields_set and self.title is None:
+            raise ValueError("title cannot be null")
+        return self
+
+
+class MovieBulkResult(BaseModel):
+    line: int = Field(description="Line number in the NDJSON body, starting from 1")
+    status: MovieBulkStatus
+    id: int | None = None
+    error: str | None = None
+
+
 class MovieReadAccount(BaseModel):
     title: str
     genres: list[str] = Field(
@@ -172,6 +289,29 @@ class MovieReadAccount(BaseModel):
     poster: str | None = None
 
 
+class MovieFilters(BaseModel):
+    """Общий набор фильтров для листингов фильмов (см. movie_filters)."""
+
+    categories: list[int] = Field(default_factory=list)
+    genres: list[int] = Field(default_factory=list)
+    genre_mode: GenreMode = "any"
+    exclude_genres: list[int] = Field(default_factory=list)
+    title: str | None = None
+    search_mode: TitleSearchMode = "contains"
+    adult: bool = False
+    release_date_from: date | None = None
+    release_date_to: date | None = None
+    release_year: int | None = None
+    vote_average_min: float | None = None
+    vote_average_max: float | None = None
+    vote_count_min: int | None = None
+    vote_count_max: int | None = None
+    duration_min: int | None = None
+    duration_max: int | None = None
+    popularity_min: float | None = None
+    popularity_max: float | None = None
+
+
 from app.movie.schemas.category import CategoryRead, CategoryReadMainPage  # noqa: E402
 from app.movie.schemas.genre import GenreRead, GenreReadMainPage  # noqa: E402
 
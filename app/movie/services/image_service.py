@@ -0,0 +1,84 @@
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Literal
+
+from anyio import to_thread
+from fastapi import UploadFile
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import ResourceNotFoundError
+from app.shared.media import media_service
+from app.utils.file_utils import save_file_to_disk
+from app.utils.image_pool import process_image
+from ..models.movie import Movie
+from ..repositories import catalog_repo, movie_repo
+
+MovieImageKind = Literal["poster", "backdrop"]
+
+
+def _widths(kind: MovieImageKind) -> tuple[int, ...]:
+    widths = settings.POSTER_WIDTHS if kind == "poster" else settings.BACKDROP_WIDTHS
+    return tuple(widths)
+
+
+def movie_image_urls(movie: Movie, kind: MovieImageKind) -> list[str]:
+    """Оригинал и все рендишены постера/бэкдропа фильма."""
+    return media_service.media_urls(
+        getattr(movie, kind), getattr(movie, f"{kind}_renditions")
+    )
+
+
+async def upload_movie_image(
+    session: AsyncSession, movie_id: int, kind: MovieImageKind, file: UploadFile
+) -> Movie:
+    """Постер/бэкдроп: поток во временный каталог -> декодирование и
+    рендишены в пуле процессов -> файлы в хранилище по хэшу содержимого.
+
+    Ссылки на прежние файлы снимаются, но сами файлы не удаляются здесь:
+    на них могут ссылаться закэшированные ответы, их подбирает чистильщик.
+    """
+    stmt = (
+        select(Movie)
+        .options(selectinload(Movie.category), selectinload(Movie.genres))
+        .where(Movie.id == movie_id)
+    )
+    movie = (await session.exec(stmt)).first()
+    if not movie:
+        raise ResourceNotFoundError(resource="movie")
+
+    folder = f"{kind}s"
+    Path(settings.MEDIA_TMP_DIR).mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(dir=settings.MEDIA_TMP_DIR))
+    try:
+        source = await save_file_to_disk(
+            file=file,
+            directory=str(work_dir),
+            filename="source.upload",
+            max_size_mb=settings.IMAGE_MAX_UPLOAD_MB,
+        )
+        result = await process_image(Path(source), work_dir, "image", _widths(kind))
+
+        async def store(name: str) -> str:
+            ext = name.rsplit(".", 1)[-1]
+            return await media_service.store_file(session, work_dir / name, folder, ext)
+
+        original_url = await store(result["original"])
+        renditions = {
+            size: {extension: await store(name) for extension, name in files.items()}
+            for size, files in result["renditions"].items()
+        }
+    finally:
+        await to_thread.run_sync(shutil.rmtree, work_dir, True)
+
+    await media_service.release_urls(session, movie_image_urls(movie, kind))
+    setattr(movie, kind, original_url)
+    setattr(movie, f"{kind}_renditions", renditions)
+    session.add(movie)
+    await catalog_repo.bump_catalog_version(session)
+    await session.commit()
+    movie_repo.invalidate_catalog(movie_repo.movie_tag(movie_id))
+    return movie
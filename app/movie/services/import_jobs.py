@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.advisory_lock import AdvisoryLock
+from app.core.exceptions import ImportAlreadyRunningError
+from app.db import async_session, engine
+from app.management.get_movieslist import DUMP_PATH
+from app.management.manage_add_db_data import add_categories_to_db, add_genres_to_db
+from ..models.catalog import utcnow
+from ..models.import_job import ImportJob
+from ..repositories import import_job_repo, movie_repo
+from .tmdb_import import ImportStats, import_tmdb_movies
+
+logger = logging.getLogger(__name__)
+
+TMDB_IMPORT_JOB = "tmdb_import"
+# Ключ pg_advisory_lock, общий для всех воркеров приложения
+CATALOG_IMPORT_LOCK_KEY = 7_301_994_112
+
+
+class ImportCancelledError(Exception):
+    pass
+
+
+class ImportJobRunner:
+    """Запускает импорт фоновой задачей и ведёт её строку в ImportJob.
+
+    HTTP-запрос только создаёт задачу; прогресс пишется после каждого
+    батча, отмена (флаг в БД) проверяется там же — батч либо записан
+    целиком, либо не начат.
+    """
+
+    def __init__(
+        self, session_factory: async_sessionmaker[AsyncSession], lock: AdvisoryLock
+    ):
+        self.session_factory = session_factory
+        self.lock = lock
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    async def start(self, kind: str = TMDB_IMPORT_JOB) -> ImportJob:
+        # Блокировку берём до ответа 202: два одновременных POST не должны
+        # оба получить задачу. Дальше её держит и отпускает _run
+        lock = AsyncExitStack()
+        if not await lock.enter_async_context(self.lock.hold()):
+            await lock.aclose()
+            raise ImportAlreadyRunningError()
+        try:
+            async with self.session_factory() as session:
+                # Блокировка наша — "активные" строки остались от упавших процессов
+                await import_job_repo.fail_stale_jobs(session, before=utcnow())
+                job = await import_job_repo.create_job(session, kind)
+        except BaseException:
+            await lock.aclose()
+            raise
+        task = asyncio.create_task(self._run(job.id, lock))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    async def get(self, job_id: int) -> ImportJob | None:
+        async with self.session_factory() as session:
+            return await import_job_repo.get_job(session, job_id)
+
+    async def cancel(self, job_id: int) -> ImportJob | None:
+        async with self.session_factory() as session:
+            job = await import_job_repo.get_job(session, job_id)
+            if job is None or job.status not in import_job_repo.ACTIVE_STATUSES:
+                return job
+            return await import_job_repo.update_job(
+                session, job_id, cancel_requested=True
+            )
+
+    async def _update(self, job_id: int, **values) -> ImportJob | None:
+        async with self.session_factory() as session:
+            return await import_job_repo.update_job(session, job_id, **values)
+
+    async def _progress(self, job_id: int, stats: ImportStats) -> None:
+        job = await self._update(
+            job_id,
+            rows_read=stats.read,
+            rows_written=stats.written,
+            rows_skipped=stats.skipped,
+            batches=stats.batches,
+        )
+        if job is not None and job.cancel_requested:
+            raise ImportCancelledError()
+
+    async def _run(self, job_id: int, lock: AsyncExitStack) -> None:
+        async with lock:
+            job = await self._update(job_id, status="running", started_at=utcnow())
+            if job is None:
+                # Строку удалили до старта — вести прогресс некуда
+                logger.warning("Import job %s disappeared before start", job_id)
+                return
+            try:
+                if job.cancel_requested:
+                    raise ImportCancelledError()
+                await self._import(job_id)
+            except ImportCancelledError:
+                await self._update(job_id, status="cancelled", finished_at=utcnow())
+            except asyncio.CancelledError:
+                await self._update(
+                    job_id,
+                    status="cancelled",
+                    error="Server shutdown",
+                    finished_at=utcnow(),
+                )
+                raise
+            except Exception as exc:
+                await self._update(
+                    job_id, status="failed", error=str(exc)[:2000], finished_at=utcnow()
+                )
+            else:
+                await self._update(job_id, status="succeeded", finished_at=utcnow())
+            finally:
+                movie_repo.invalidate_catalog()
+
+    async def _import(self, job_id: int) -> ImportStats:
+        if not DUMP_PATH.exists():
+            raise FileNotFoundError(f"{DUMP_PATH} does not exist, run the fetch first")
+        await add_categories_to_db()
+        await add_genres_to_db()
+        return await import_tmdb_movies(
+            self.session_factory,
+            DUMP_PATH,
+            on_batch=lambda stats: self._progress(job_id, stats),
+        )
+
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+import_jobs = ImportJobRunner(
+    async_session, AdvisoryLock(engine, CATALOG_IMPORT_LOCK_KEY)
+)
@@ -1,27 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel.ext.asyncio.session import AsyncSession
-from app.db import get_db
-from app.management.get_movieslist import save_movies_to_movies_category
-from app.management.manage_add_db_data import add_categories_to_db, add_genres_to_db
-
-
-
-router = APIRouter()
-
-
-@router.post("/internal/import-movies")
-async def import_movies_endpoint(session: AsyncSession = Depends(get_db)):
-    # Здесь вызови функцию импорта, например
-    # чтобы передать сессию, можно изменить save_movies_to_movies_category на async и принимать сессию
-    # Но для простоты вызовем её напрямую (если нужно — перепиши под async)
-
-    # ВАЖНО! Защити этот эндпоинт токеном или IP, чтобы никто чужой не запустил!
-
-    try:
-        await add_categories_to_db()
-        await add_genres_to_db()
-        await save_movies_to_movies_category()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-    return {"message": "Movies import started"}
+from fastapi import APIRouter, Depends
+
+from app.core.constants import status_codes as status
+from app.core.exceptions import ResourceNotFoundError
+from app.core.responses import BaseApiResponse
+from app.deps.internal import require_internal_token
+from app.movie.schemas.import_job import ImportJobRead
+from app.movie.services.import_jobs import import_jobs
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@router.post(
+    "/internal/import-movies",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=BaseApiResponse[ImportJobRead],
+)
+async def import_movies_endpoint():
+    """Запускает импорт дампа TMDB фоновой задачей и сразу отдаёт её id."""
+    job = await import_jobs.start()
+    return BaseApiResponse.ok(
+        data=ImportJobRead.model_validate(job), message="Movies import started"
+    )
+
+
+@router.get(
+    "/internal/import-movies/{job_id}",
+    response_model=BaseApiResponse[ImportJobRead],
+)
+async def import_job_status(job_id: int):
+    job = await import_jobs.get(job_id)
+    if job is None:
+        raise ResourceNotFoundError(resource="import_job")
+    return BaseApiResponse.ok(data=ImportJobRead.model_validate(job))
+
+
+@router.delete(
+    "/internal/import-movies/{job_id}",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=BaseApiResponse[ImportJobRead],
+)
+async def cancel_import_job(job_id: int):
+    """Отмена срабатывает после текущего батча."""
+    job = await import_jobs.cancel(job_id)
+    if job is None:
+        raise ResourceNotFoundError(resource="import_job")
+    return BaseApiResponse.ok(
+        data=ImportJobRead.model_validate(job), message="Cancellation requested"
+    )
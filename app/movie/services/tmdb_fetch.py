@@ -0,0 +1,209 @@
+import asyncio
+import gzip
+import json
+import os
+import random
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import httpx
+
+from app.core.config import settings
+from app.core.rate_limit import TokenBucket
+
+RETRY_STATUSES = {500, 502, 503, 504}
+# TMDB не отдаёт discover дальше 500-й страницы
+TMDB_MAX_PAGES = 500
+
+
+@dataclass
+class FetchCheckpoint:
+    """Прогресс выгрузки: все страницы до next_page уже лежат в файле."""
+
+    params: dict
+    next_page: int = 1
+    total_pages: int | None = None
+    movies: int = 0
+
+    @classmethod
+    def load(cls, path: Path, params: dict) -> "FetchCheckpoint | None":
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("params") != params:
+            return None
+        return cls(**data)
+
+    def save(self, path: Path) -> None:
+        partial = path.with_name(f".{path.name}.partial")
+        partial.write_text(json.dumps(asdict(self)), encoding="utf-8")
+        os.replace(partial, path)
+
+
+@dataclass
+class FetchStats:
+    pages: int = 0
+    movies: int = 0
+    retries: int = 0
+    throttled: int = 0
+    resumed_from: int = 1
+    total_pages: int | None = None
+    errors: list[str] = field(default_factory=list)
+
+
+def make_tmdb_client(concurrency: int) -> httpx.AsyncClient:
+    if not settings.TMDB_API_TOKEN:
+        raise RuntimeError("TMDB_API_TOKEN is not set")
+    return httpx.AsyncClient(
+        base_url=settings.TMDB_API_URL,
+        headers={
+            "accept": "application/json",
+            "Authorization": f"Bearer {settings.TMDB_API_TOKEN}",
+        },
+        timeout=settings.TMDB_FETCH_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=concurrency, max_keepalive_connections=concurrency
+        ),
+    )
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after", "")
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+async def get_json(
+    client: httpx.AsyncClient,
+    bucket: TokenBucket,
+    url: str,
+    params: dict,
+    stats: FetchStats,
+) -> dict:
+    """GET с повторами: 429 притормаживает общий bucket,
+    5xx и сетевые ошибки — экспоненциальная задержка с полным джиттером."""
+    attempts = settings.TMDB_FETCH_RETRIES + 1
+    for attempt in range(attempts):
+        await bucket.acquire()
+        try:
+            response = await client.get(url, params=params)
+        except httpx.TransportError:
+            if attempt == attempts - 1:
+                raise
+        else:
+            if response.status_code == 429:
+                bucket.throttle(_retry_after(response))
+                stats.throttled += 1
+                stats.retries += 1
+                continue
+            if response.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+                response.raise_for_status()
+                bucket.recover()
+                return response.json()
+        stats.retries += 1
+        backoff = settings.TMDB_FETCH_BACKOFF_SECONDS * 2**attempt
+        await asyncio.sleep(random.uniform(0, backoff))
+    raise httpx.HTTPError(f"{url}: still throttled after {attempts} attempts")
+
+
+async def fetch_page(
+    client: httpx.AsyncClient,
+    bucket: TokenBucket,
+    url: str,
+    params: dict,
+    page: int,
+    stats: FetchStats,
+) -> dict:
+    return await get_json(client, bucket, url, {**params, "page": page}, stats)
+
+
+def append_ndjson_gz(path: Path, records: list[dict]) -> None:
+    # Каждая дозапись — отдельный gzip-member: файл читается целиком
+    # gzip.open, а обрыв процесса не портит уже записанное.
+    with gzip.open(path, "at", encoding="utf-8") as file:
+        file.writelines(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        )
+
+
+async def fetch_discover_movies(
+    client: httpx.AsyncClient,
+    output: Path,
+    params: dict,
+    *,
+    checkpoint_path: Path | None = None,
+    max_pages: int = TMDB_MAX_PAGES,
+    concurrency: int | None = None,
+    rate: float | None = None,
+) -> FetchStats:
+    """Выгружает /discover/movie в NDJSON.gz, продолжая с чекпойнта.
+
+    Страницы качаются параллельно, но в файл пишутся строго по порядку:
+    чекпойнт хранит первую ещё не записанную страницу, так что перезапуск
+    продолжит с неё (в худшем случае одна страница запишется дважды —
+    импорт дедуплицирует по id_tmdb).
+    """
+    concurrency = concurrency or settings.TMDB_FETCH_CONCURRENCY
+    bucket = TokenBucket(rate or settings.TMDB_REQUESTS_PER_SECOND)
+    checkpoint_path = checkpoint_path or output.with_name(f"{output.name}.checkpoint")
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    checkpoint = FetchCheckpoint.load(checkpoint_path, params)
+    if checkpoint is None or not output.exists():
+        # Другие параметры, первый запуск или дамп удалён/перенесён (чекпойнт
+        # без него врёт о записанных страницах) — начинаем файл заново
+        output.unlink(missing_ok=True)
+        checkpoint = FetchCheckpoint(params=params)
+    stats = FetchStats(resumed_from=checkpoint.next_page, movies=checkpoint.movies)
+
+    def write_pages(records: list[dict]) -> None:
+        if records:
+            append_ndjson_gz(output, records)
+        checkpoint.save(checkpoint_path)
+
+    if checkpoint.total_pages is None:
+        first = await fetch_page(client, bucket, "/discover/movie", params, 1, stats)
+        checkpoint.total_pages = min(max_pages, first.get("total_pages") or 1)
+        checkpoint.next_page = 2
+        checkpoint.movies += len(first.get("results", []))
+        write_pages(first.get("results", []))
+        stats.pages += 1
+    stats.total_pages = checkpoint.total_pages
+
+    pages = iter(range(checkpoint.next_page, checkpoint.total_pages + 1))
+    done: dict[int, list[dict]] = {}
+    write_lock = asyncio.Lock()
+
+    async def flush() -> None:
+        async with write_lock:
+            ready = []
+            while checkpoint.next_page in done:
+                ready.extend(done.pop(checkpoint.next_page))
+                checkpoint.next_page += 1
+                stats.pages += 1
+            if not ready:
+                return
+            checkpoint.movies += len(ready)
+            # Синхронно: страница — единицы КБ, а await здесь дал бы отмене
+            # (падение соседнего воркера) разорвать запись и чекпойнт
+            write_pages(ready)
+
+    async def worker() -> None:
+        for page in pages:
+            data = await fetch_page(
+                client, bucket, "/discover/movie", params, page, stats
+            )
+            done[page] = data.get("results", [])
+            await flush()
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            for _ in range(concurrency):
+                group.create_task(worker())
+    except* httpx.HTTPError as errors:
+        stats.errors = [str(error) for error in errors.exceptions]
+    finally:
+        stats.movies = checkpoint.movies
+    return stats
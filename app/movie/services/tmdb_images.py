@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from uuid import uuid4
+
+import httpx
+from anyio import open_file
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.shared.media import media_service
+from app.shared.media.repositories import media_repo
+from app.shared.media.storage import get_media_storage
+from app.utils.file_utils import delete_file_from_disk, image_extension_from_bytes
+from ..models.movie import Movie
+from ..repositories import catalog_repo, movie_repo
+
+logger = logging.getLogger(__name__)
+
+# Поле фильма -> префикс ключа в хранилище
+MIRRORED_FIELDS = {"poster": "posters", "backdrop": "backdrops"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class MirrorStats:
+    movies: int = 0
+    downloaded: int = 0
+    reused: int = 0
+    missing: int = 0
+    failed: int = 0
+    bytes_downloaded: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def is_tmdb_path(value: str | None) -> bool:
+    # TMDB отдаёт относительные пути вида "/abc.jpg"; свои файлы — "static/..."
+    return bool(value) and value.startswith("/")
+
+
+def make_mirror_client(concurrency: int) -> httpx.AsyncClient:
+    """Один клиент на весь прогон: пул keep-alive соединений к CDN TMDB."""
+    return httpx.AsyncClient(
+        base_url=settings.TMDB_IMAGE_BASE_URL,
+        timeout=settings.TMDB_MIRROR_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=concurrency, max_keepalive_connections=concurrency
+        ),
+        follow_redirects=True,
+    )
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    retry_after = response.headers.get("retry-after") if response else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    backoff = settings.TMDB_MIRROR_BACKOFF_SECONDS * 2**attempt
+    return backoff + random.uniform(0, backoff / 2)
+
+
+async def download_image(
+    client: httpx.AsyncClient, tmdb_path: str, directory: Path
+) -> tuple[Path, str, int] | None:
+    """Скачивает картинку потоком во временный файл с повторами.
+
+    Повторяет сетевые ошибки, 429 и 5xx с экспоненциальной задержкой
+    (Retry-After, если он есть). Возвращает (путь, расширение, размер) или
+    None, если картинки нет (404) или это не JPEG/PNG.
+    """
+    target = directory / uuid4().hex
+    for attempt in range(settings.TMDB_MIRROR_RETRIES + 1):
+        response = None
+        try:
+            async with client.stream("GET", tmdb_path) as response:
+                if response.status_code == 404:
+                    return None
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    head, size = b"", 0
+                    async with await open_file(target, "wb") as file:
+                        async for chunk in response.aiter_bytes(64 * 1024):
+                            if len(head) < 16:
+                                head += chunk[:16]
+                            size += len(chunk)
+                            await file.write(chunk)
+                    extension = image_extension_from_bytes(head)
+                    if extension is None:
+                        await delete_file_from_disk(target)
+                        return None
+                    return target, extension, size
+        except httpx.TransportError:
+            pass
+        except BaseException:
+            await delete_file_from_disk(target)
+            raise
+        if attempt < settings.TMDB_MIRROR_RETRIES:
+            await asyncio.sleep(_retry_delay(attempt, response))
+    await delete_file_from_disk(target)
+    raise httpx.HTTPError(f"Giving up on {tmdb_path}")
+
+
+async def _download_batch(
+    client: httpx.AsyncClient,
+    paths: set[str],
+    directory: Path,
+    concurrency: int,
+    stats: MirrorStats,
+) -> dict[str, tuple[Path, str, int]]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(tmdb_path: str):
+        async with semaphore:
+            try:
+                result = await download_image(client, tmdb_path, directory)
+            except httpx.HTTPError as exc:
+                stats.failed += 1
+                logger.warning("Failed to mirror %s: %s", tmdb_path, exc)
+                return None
+            if result is None:
+                stats.missing += 1
+            else:
+                stats.downloaded += 1
+                stats.bytes_downloaded += result[2]
+            return tmdb_path, result
+
+    # Упавшие после всех повторов не попадают в результат (повтор в след. прогон),
+    # отсутствующие у TMDB — попадают как None
+    results = await asyncio.gather(*(fetch(path) for path in paths))
+    return dict(result for result in results if result is not None)
+
+
+async def _mirror_batch(
+    session: AsyncSession,
+    client: httpx.AsyncClient,
+    rows: list,
+    mirrored: dict[tuple[str, str], tuple[str, int] | None],
+    directory: Path,
+    concurrency: int,
+    stats: MirrorStats,
+) -> None:
+    storage = get_media_storage()
+    wanted = {
+        getattr(row, field)
+        for row in rows
+        for field, prefix in MIRRORED_FIELDS.items()
+        if is_tmdb_path(getattr(row, field))
+        and (prefix, getattr(row, field)) not in mirrored
+    }
+    downloaded = await _download_batch(client, wanted, directory, concurrency, stats)
+
+    # Запись в БД и хранилище — последовательно: одна сессия на батч
+    touched = []
+    for row in rows:
+        values = {}
+        for field, prefix in MIRRORED_FIELDS.items():
+            tmdb_path = getattr(row, field)
+            if not is_tmdb_path(tmdb_path):
+                continue
+            if (prefix, tmdb_path) in mirrored:
+                blob = mirrored[(prefix, tmdb_path)]
+                if blob is None:
+                    continue
+                # Тот же файл у другого фильма — ещё одна ссылка на blob
+                await media_repo.acquire_blob(session, *blob)
+                stats.reused += 1
+            elif downloaded.get(tmdb_path) is not None:
+                source, extension, size = downloaded[tmdb_path]
+                url = await media_service.store_file(session, source, prefix, extension)
+                blob = (storage.key_from_url(url), size)
+                mirrored[(prefix, tmdb_path)] = blob
+            else:
+                if tmdb_path in downloaded:
+                    mirrored[(prefix, tmdb_path)] = None
+                continue
+            values[field] = storage.url(blob[0])
+            values[f"{field}_renditions"] = None
+        if values:
+            movie = await session.get(Movie, row.id)
+            for field, value in values.items():
+                setattr(movie, field, value)
+            session.add(movie)
+            touched.append(row.id)
+
+    # store_file удаляет исходник сам; остаются только невостребованные
+    for result in downloaded.values():
+        if result is not None:
+            await delete_file_from_disk(result[0])
+    if touched:
+        await catalog_repo.bump_catalog_version(session)
+    await session.commit()
+    movie_repo.invalidate_catalog(
+        *(movie_repo.movie_tag(movie_id) for movie_id in touched)
+    )
+
+
+async def mirror_tmdb_images(
+    session_factory: async_sessionmaker[AsyncSession],
+    client: httpx.AsyncClient | None = None,
+    concurrency: int | None = None,
+    batch_size: int | None = None,
+) -> MirrorStats:
+    """Переносит постеры/бэкдропы TMDB в своё хранилище и переписывает поля.
+
+    Фильмы читаются keyset-пачками по id; уже перенесённые (путь не TMDB)
+    пропускаются, одинаковые пути качаются один раз за прогон, а одинаковое
+    содержимое хранится один раз (ключ — хэш).
+    """
+    concurrency = concurrency or settings.TMDB_MIRROR_CONCURRENCY
+    batch_size = batch_size or settings.TMDB_MIRROR_BATCH_SIZE
+    stats = MirrorStats()
+    # (префикс, путь TMDB) -> (ключ, размер); None — у TMDB картинки нет
+    mirrored: dict[tuple[str, str], tuple[str, int] | None] = {}
+    directory = Path(settings.MEDIA_TMP_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    own_client = client is None
+    client = client or make_mirror_client(concurrency)
+    try:
+        last_id = 0
+        while True:
+            async with session_factory() as session:
+                stmt = (
+                    select(Movie.id, Movie.poster, Movie.backdrop)
+                    .where(
+                        Movie.id > last_id,
+                        or_(
+                            Movie.poster.startswith("/"), Movie.backdrop.startswith("/")
+                        ),
+                    )
+                    .order_by(Movie.id)
+                    .limit(batch_size)
+                )
+                rows = (await session.exec(stmt)).all()
+                if not rows:
+                    break
+                stats.movies += len(rows)
+                await _mirror_batch(
+                    session, client, rows, mirrored, directory, concurrency, stats
+                )
+            last_id = rows[-1].id
+    finally:
+        if own_client:
+            await client.aclose()
+    return stats
@@ -0,0 +1,235 @@
+import gzip
+import json
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from anyio import to_thread
+from slugify import slugify
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from ..models.catalog import utcnow
+from ..models.category import Category
+from ..models.genre import Genre
+from ..models.movie import Movie, parse_release_date
+from ..repositories import catalog_repo, movie_repo
+from ..repositories.movie_bulk import MOVIE_TABLE, replace_genre_links
+from ..repositories.movie_search import get_dialect_name
+
+MOVIES_CATEGORY_SLUG = "movies"
+# Поля, которые TMDB со временем меняет; slug и картинки (их может
+# переписать mirror_tmdb_images) при повторном импорте не трогаем.
+REFRESHED_COLUMNS = (
+    "title",
+    "original_title",
+    "original_language",
+    "description",
+    "release_date",
+    "released_on",
+    "vote_average",
+    "vote_count",
+    "popularity",
+    "adult",
+    "updated_at",
+)
+READ_CHUNK_CHARS = 1024 * 1024
+_SEPARATORS = " \t\r\n[],"
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    written: int = 0
+    skipped: int = 0
+    batches: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def iter_json_records(path: Path) -> Iterator[dict]:
+    """Читает дамп по одной записи, не загружая файл целиком.
+
+    Понимает и JSON-массив (как пишет save_to_json), и NDJSON; ".gz" —
+    распаковывается на лету.
+    """
+    opener = gzip.open if path.suffix == ".gz" else open
+    decoder = json.JSONDecoder()
+    with opener(path, "rt", encoding="utf-8") as file:
+        buffer, pos, eof = "", 0, False
+        while True:
+            while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+                pos += 1
+            if pos == len(buffer) and eof:
+                return
+            try:
+                if pos == len(buffer):
+                    raise json.JSONDecodeError("Need more data", buffer, pos)
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = file.read(READ_CHUNK_CHARS)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield record
+
+
+def iter_batches(records: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def _clip(name: str, value: Any) -> Any:
+    # Core INSERT идёт мимо валидации модели: длинное описание уронило бы батч
+    length = getattr(MOVIE_TABLE.c[name].type, "length", None)
+    if isinstance(value, str) and length:
+        return value[:length]
+    return value
+
+
+def tmdb_movie_values(movie: dict, category_id: int | None) -> dict[str, Any] | None:
+    title = movie.get("title")
+    slug = slugify(title or "", separator="-")
+    if not movie.get("id") or not slug:
+        return None
+    values = {
+        "id_tmdb": movie["id"],
+        "title": title,
+        "original_title": movie.get("original_title"),
+        "original_language": movie.get("original_language"),
+        "description": movie.get("overview"),
+        "slug": slug,
+        "download_url": None,
+        "poster": movie.get("poster_path"),
+        "backdrop": movie.get("backdrop_path"),
+        "release_date": movie.get("release_date"),
+        "released_on": parse_release_date(movie.get("release_date")),
+        "vote_average": movie.get("vote_average"),
+        "vote_count": movie.get("vote_count"),
+        "popularity": movie.get("popularity"),
+        "adult": movie.get("adult", False),
+        "category_id": category_id,
+        "updated_at": utcnow(),
+    }
+    return {name: _clip(name, value) for name, value in values.items()}
+
+
+async def _free_slugs(session: AsyncSession, rows: list[dict]) -> list[dict]:
+    """Один SELECT на батч: slug, занятый другим фильмом, — пропуск."""
+    stmt = select(Movie.slug, Movie.id_tmdb).where(
+        Movie.slug.in_({row["slug"] for row in rows})
+    )
+    taken = dict((await session.exec(stmt)).all())
+    return [
+        row
+        for row in rows
+        if row["slug"] not in taken or taken[row["slug"]] == row["id_tmdb"]
+    ]
+
+
+async def import_batch(
+    session: AsyncSession,
+    batch: list[dict],
+    genre_ids: dict[int, int],
+    category_id: int | None,
+    dialect_name: str,
+    update_existing: bool,
+) -> tuple[int, int]:
+    """Пишет батч многострочным INSERT ... ON CONFLICT (id_tmdb) и связями
+    жанров одним INSERT. Возвращает (записано, пропущено)."""
+    rows, genres, slugs = {}, {}, set()
+    for movie in batch:
+        values = tmdb_movie_values(movie, category_id)
+        if values is None or values["id_tmdb"] in rows or values["slug"] in slugs:
+            continue
+        rows[values["id_tmdb"]] = values
+        slugs.add(values["slug"])
+        genres[values["id_tmdb"]] = [
+            genre_ids[genre]
+            for genre in movie.get("genre_ids", [])
+            if genre in genre_ids
+        ]
+    values = await _free_slugs(session, list(rows.values())) if rows else []
+    if not values:
+        return 0, len(batch)
+
+    insert = pg_insert if dialect_name == "postgresql" else sqlite_insert
+    stmt = insert(MOVIE_TABLE)
+    if update_existing:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MOVIE_TABLE.c.id_tmdb],
+            set_={name: stmt.excluded[name] for name in REFRESHED_COLUMNS},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[MOVIE_TABLE.c.id_tmdb])
+    stmt = stmt.returning(MOVIE_TABLE.c.id, MOVIE_TABLE.c.id_tmdb)
+    connection = await session.connection()
+    written = (await connection.execute(stmt, values)).all()
+
+    await replace_genre_links(
+        session, {movie_id: genres[id_tmdb] for movie_id, id_tmdb in written}
+    )
+    if written:
+        await catalog_repo.bump_catalog_version(session)
+    await session.commit()
+    movie_repo.invalidate_catalog(
+        *(movie_repo.movie_tag(movie_id) for movie_id, _ in written)
+    )
+    return len(written), len(batch) - len(written)
+
+
+async def import_tmdb_movies(
+    session_factory: async_sessionmaker[AsyncSession],
+    path: Path,
+    batch_size: int | None = None,
+    update_existing: bool = False,
+    on_batch: Callable[[ImportStats], Awaitable[None]] | None = None,
+) -> ImportStats:
+    """Импорт дампа TMDB в категорию "movies" с постоянным расходом памяти.
+
+    Жанры и категория читаются один раз; дальше файл идёт потоком батчами
+    по TMDB_IMPORT_BATCH_SIZE записей, по транзакции на батч. Уже
+    импортированные фильмы (по id_tmdb) пропускаются или, с
+    update_existing, обновляются. on_batch вызывается после каждого
+    закоммиченного батча (прогресс фоновой задачи, отмена).
+    """
+    batch_size = batch_size or settings.TMDB_IMPORT_BATCH_SIZE
+    stats = ImportStats()
+    async with session_factory() as session:
+        dialect_name = await get_dialect_name(session)
+        genre_ids = dict(
+            (
+                await session.exec(
+                    select(Genre.id_tmdb, Genre.id).where(Genre.id_tmdb.is_not(None))
+                )
+            ).all()
+        )
+        category_id = (
+            await session.exec(
+                select(Category.id).where(Category.slug == MOVIES_CATEGORY_SLUG)
+            )
+        ).first()
+
+        batches = iter_batches(iter_json_records(path), batch_size)
+        # Разбор файла — в потоке, чтобы не блокировать цикл событий
+        while batch := await to_thread.run_sync(next, batches, None):
+            written, skipped = await import_batch(
+                session, batch, genre_ids, category_id, dialect_name, update_existing
+            )
+            stats.read += len(batch)
+            stats.written += written
+            stats.skipped += skipped
+            stats.batches += 1
+            if on_batch is not None:
+                await on_batch(stats)
+    return stats
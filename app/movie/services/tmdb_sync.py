@@ -0,0 +1,189 @@
+import asyncio
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.rate_limit import TokenBucket
+from ..models.catalog import utcnow
+from ..models.category import Category
+from ..models.genre import Genre
+from ..models.movie import Movie
+from ..repositories import catalog_repo
+from ..repositories.movie_search import get_dialect_name
+from .tmdb_fetch import FetchStats, fetch_page, get_json
+from .tmdb_import import MOVIES_CATEGORY_SLUG, import_batch
+
+SYNC_NAME = "tmdb"
+# /movie/changes принимает окно не длиннее 14 дней
+CHANGES_MAX_WINDOW = timedelta(days=14)
+
+
+@dataclass
+class SyncStats:
+    windows: int = 0
+    changed: int = 0
+    matched: int = 0
+    fetched: int = 0
+    missing: int = 0
+    written: int = 0
+    retries: int = 0
+    throttled: int = 0
+    watermark: datetime | None = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def sync_windows(start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    windows = []
+    while start < end:
+        windows.append((start, min(end, start + CHANGES_MAX_WINDOW)))
+        start = windows[-1][1]
+    return windows
+
+
+async def fetch_changed_ids(
+    client: httpx.AsyncClient,
+    bucket: TokenBucket,
+    start: datetime,
+    end: datetime,
+    fetch_stats: FetchStats,
+) -> set[int]:
+    params = {
+        "start_date": start.date().isoformat(),
+        "end_date": end.date().isoformat(),
+    }
+    first = await fetch_page(client, bucket, "/movie/changes", params, 1, fetch_stats)
+    pages = [first]
+    total_pages = first.get("total_pages") or 1
+    if total_pages > 1:
+        pages += await asyncio.gather(
+            *(
+                fetch_page(client, bucket, "/movie/changes", params, page, fetch_stats)
+                for page in range(2, total_pages + 1)
+            )
+        )
+    return {item["id"] for data in pages for item in data.get("results", [])}
+
+
+async def fetch_details(
+    client: httpx.AsyncClient,
+    bucket: TokenBucket,
+    tmdb_ids: list[int],
+    concurrency: int,
+    fetch_stats: FetchStats,
+) -> list[dict]:
+    """Карточки фильмов в формате записей discover (genre_ids вместо genres)."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(tmdb_id: int) -> dict | None:
+        async with semaphore:
+            try:
+                movie = await get_json(
+                    client, bucket, f"/movie/{tmdb_id}", {}, fetch_stats
+                )
+            except httpx.HTTPStatusError as exc:
+                # Фильм удалён из TMDB — пропускаем, остальное пусть падает
+                if exc.response.status_code == 404:
+                    return None
+                raise
+        movie["genre_ids"] = [genre["id"] for genre in movie.pop("genres", [])]
+        return movie
+
+    return [
+        movie
+        for movie in await asyncio.gather(*(fetch(tmdb_id) for tmdb_id in tmdb_ids))
+        if movie is not None
+    ]
+
+
+async def _known_ids(session: AsyncSession, tmdb_ids: list[int]) -> list[int]:
+    stmt = select(Movie.id_tmdb).where(Movie.id_tmdb.in_(tmdb_ids))
+    return sorted((await session.exec(stmt)).all())
+
+
+async def sync_changed_movies(
+    session_factory: async_sessionmaker[AsyncSession],
+    client: httpx.AsyncClient,
+    *,
+    since: datetime | None = None,
+    include_new: bool = False,
+    concurrency: int | None = None,
+    batch_size: int | None = None,
+    rate: float | None = None,
+) -> SyncStats:
+    """Дельта-синхронизация каталога по ленте изменений TMDB.
+
+    Берёт id, изменённые после водяного знака (или since), оставляет только
+    уже известные фильмы (include_new — добавляет и новые), параллельно
+    качает их карточки и пишет батчами INSERT ... ON CONFLICT DO UPDATE
+    изменяемых полей. Водяной знак сдвигается после каждого окна.
+    """
+    concurrency = concurrency or settings.TMDB_FETCH_CONCURRENCY
+    batch_size = batch_size or settings.TMDB_IMPORT_BATCH_SIZE
+    bucket = TokenBucket(rate or settings.TMDB_REQUESTS_PER_SECOND)
+    fetch_stats = FetchStats()
+    stats = SyncStats()
+    now = utcnow()
+
+    async with session_factory() as session:
+        dialect_name = await get_dialect_name(session)
+        start = since or await catalog_repo.get_sync_watermark(session, SYNC_NAME)
+        start = start or now - timedelta(days=1)
+        # SQLite отдаёт даты без зоны
+        start = start.replace(tzinfo=start.tzinfo or timezone.utc)
+        genre_ids = dict(
+            (
+                await session.exec(
+                    select(Genre.id_tmdb, Genre.id).where(Genre.id_tmdb.is_not(None))
+                )
+            ).all()
+        )
+        category_id = (
+            await session.exec(
+                select(Category.id).where(Category.slug == MOVIES_CATEGORY_SLUG)
+            )
+        ).first()
+
+        for window_start, window_end in sync_windows(start, now):
+            changed = sorted(
+                await fetch_changed_ids(
+                    client, bucket, window_start, window_end, fetch_stats
+                )
+            )
+            stats.windows += 1
+            stats.changed += len(changed)
+            for offset in range(0, len(changed), batch_size):
+                chunk = changed[offset : offset + batch_size]
+                if not include_new:
+                    chunk = await _known_ids(session, chunk)
+                stats.matched += len(chunk)
+                if not chunk:
+                    continue
+                movies = await fetch_details(
+                    client, bucket, chunk, concurrency, fetch_stats
+                )
+                stats.fetched += len(movies)
+                stats.missing += len(chunk) - len(movies)
+                if movies:
+                    written, _ = await import_batch(
+                        session,
+                        movies,
+                        genre_ids,
+                        category_id,
+                        dialect_name,
+                        update_existing=True,
+                    )
+                    stats.written += written
+            await catalog_repo.set_sync_watermark(session, SYNC_NAME, window_end)
+            await session.commit()
+            stats.watermark = window_end
+
+    stats.retries = fetch_stats.retries
+    stats.throttled = fetch_stats.throttled
+    return stats
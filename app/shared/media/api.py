@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import FileResponse, Response
+
+from app.core.conditional import Validators, is_not_modified
+from app.core.static import CONTENT_HASH_NAME, REVALIDATE_CACHE_CONTROL
+from .resize import (
+    OUTPUT_MEDIA_TYPES,
+    check_resize_request,
+    get_resized_image,
+    resized_etag,
+)
+from .storage import IMMUTABLE_CACHE_CONTROL
+
+image_router = APIRouter()
+
+
+@image_router.get("/img/{width}/{key:path}", response_class=FileResponse)
+async def resized_image(request: Request, width: int, key: str):
+    """Poster, backdrop or avatar resized to one of the allowed widths.
+
+    WebP for clients that accept it, JPEG otherwise.
+    """
+    check_resize_request(key, width)
+    extension = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+    etag = resized_etag(key, width, extension)
+    name = key.rsplit("/", 1)[-1]
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept",
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL
+            if CONTENT_HASH_NAME.match(name)
+            else REVALIDATE_CACHE_CONTROL
+        ),
+    }
+    if is_not_modified(request, Validators(etag=etag)):
+        return Response(status_code=304, headers=headers)
+
+    path = await get_resized_image(key, width, extension)
+    return FileResponse(path, media_type=OUTPUT_MEDIA_TYPES[extension], headers=headers)
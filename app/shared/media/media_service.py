@@ -0,0 +1,91 @@
+import hashlib
+from pathlib import Path
+from uuid import uuid4
+
+from anyio import to_thread
+from fastapi import UploadFile
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.utils.file_utils import delete_file_from_disk, save_file_to_disk
+from .repositories import media_repo
+from .storage import get_media_storage
+
+CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+
+def media_urls(*values: str | dict | None) -> list[str]:
+    """URL файлов из значений колонок: строки и вложенные словари рендишенов."""
+    urls = []
+    for value in values:
+        if isinstance(value, dict):
+            urls.extend(media_urls(*value.values()))
+        elif value:
+            urls.append(value)
+    return urls
+
+
+def hash_file(path: Path) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as file:
+        while chunk := file.read(1024 * 1024):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+async def store_file(session: AsyncSession, source: Path, prefix: str, ext: str) -> str:
+    """Переносит локальный файл в хранилище под ключом sha256 содержимого и
+    добавляет ссылку на него. Возвращает публичный URL.
+
+    Одинаковые файлы хранятся один раз: повторная загрузка только
+    увеличивает refcount. Запись в БД — в транзакции вызывающего.
+    """
+    digest, size = await to_thread.run_sync(hash_file, source)
+    key = f"{prefix}/{digest}.{ext}"
+    storage = get_media_storage()
+    try:
+        # Сначала ссылка, потом файл. Если чистильщик (sweeper) как раз
+        # забирает этот ключ в media_repo.claim_unreferenced, acquire_blob ждёт
+        # его коммита, а чистильщик удаляет файл до коммита — put увидит, что
+        # файла нет, и запишет его заново. После acquire_blob refcount > 0,
+        # и новый проход чистильщика строку не заберёт.
+        await media_repo.acquire_blob(session, key, size)
+        await storage.put(key, source, CONTENT_TYPES[ext], digest)
+    finally:
+        await delete_file_from_disk(source)
+    return storage.url(key)
+
+
+async def store_upload(
+    session: AsyncSession, file: UploadFile, prefix: str, ext: str, max_size_mb: int
+) -> str:
+    """Загрузка потоком во временный файл (с лимитом размера) -> хранилище."""
+    source = Path(
+        await save_file_to_disk(
+            file=file,
+            directory=settings.MEDIA_TMP_DIR,
+            filename=f"{uuid4().hex}.{ext}",
+            max_size_mb=max_size_mb,
+        )
+    )
+    return await store_file(session, source, prefix, ext)
+
+
+async def release_urls(session: AsyncSession, urls: list[str]) -> list[str]:
+    """Снимает ссылки с файлов по их URL и возвращает ключи этих файлов.
+
+    URL не из хранилища (внешние, TMDB-пути) пропускаются. Сами файлы
+    удаляет чистильщик (sweeper.py), когда на них не осталось ссылок.
+    """
+    storage = get_media_storage()
+    keys = [key for url in urls if (key := storage.key_from_url(url))]
+    if keys:
+        await media_repo.release_blobs(session, keys)
+    return keys
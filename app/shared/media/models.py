@@ -0,0 +1,17 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime
+from sqlmodel import Field, SQLModel
+
+
+class MediaBlob(SQLModel, table=True):
+    # Файл в хранилище по ключу "<prefix>/<sha256>.<ext>". refcount — сколько
+    # полей (постеры, рендишены, аватары) ссылаются на него; при нуле файл
+    # можно удалять.
+    key: str = Field(primary_key=True, max_length=255)
+    size: int
+    refcount: int = Field(default=0)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+    )
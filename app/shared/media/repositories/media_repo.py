@@ -0,0 +1,68 @@
+from collections import Counter
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models import MediaBlob
+
+
+async def acquire_blob(session: AsyncSession, key: str, size: int) -> None:
+    """+1 ссылка на файл; строка создаётся при первой ссылке."""
+    connection = await session.connection()
+    insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    stmt = (
+        insert(MediaBlob)
+        .values(key=key, size=size, refcount=1)
+        .on_conflict_do_update(
+            index_elements=[MediaBlob.key],
+            set_={"refcount": MediaBlob.refcount + 1},
+        )
+    )
+    await session.exec(stmt)
+
+
+async def track_blobs(session: AsyncSession, blobs: list[tuple[str, int]]) -> None:
+    """Строки с refcount=0 для файлов без строки (старые uuid-имена,
+    несостоявшиеся коммиты), чтобы их тоже забирал claim_unreferenced."""
+    if not blobs:
+        return
+    connection = await session.connection()
+    insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    stmt = (
+        insert(MediaBlob)
+        .values([{"key": key, "size": size, "refcount": 0} for key, size in blobs])
+        .on_conflict_do_nothing(index_elements=[MediaBlob.key])
+    )
+    await session.exec(stmt)
+
+
+async def release_blobs(session: AsyncSession, keys: list[str]) -> None:
+    """-1 ссылка за каждое вхождение ключа; файлы без строки (старые) не трогаем."""
+    by_count: dict[int, list[str]] = {}
+    for key, count in Counter(keys).items():
+        by_count.setdefault(count, []).append(key)
+    for count, grouped in by_count.items():
+        await session.exec(
+            update(MediaBlob)
+            .where(MediaBlob.key.in_(grouped))
+            .values(refcount=MediaBlob.refcount - count)
+        )
+
+
+async def claim_unreferenced(session: AsyncSession, keys: list[str]) -> list[str]:
+    """Удаляет строки файлов без ссылок и возвращает их ключи.
+
+    Условие refcount <= 0 проверяется в том же DELETE: файл, на который
+    успела сослаться параллельная загрузка, не попадёт в список. До коммита
+    удалённые строки заблокированы, и acquire_blob того же ключа ждёт его.
+    """
+    if not keys:
+        return []
+    result = await session.exec(
+        delete(MediaBlob)
+        .where(MediaBlob.key.in_(set(keys)), MediaBlob.refcount <= 0)
+        .returning(MediaBlob.key)
+    )
+    return list(result.scalars())
@@ -0,0 +1,207 @@
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+from anyio import to_thread
+
+from app.core.config import settings
+from app.core.conditional import make_etag
+from app.core.exceptions import InvalidInputError, ResourceNotFoundError
+from app.utils.image_pool import resize_image_in_pool
+from .storage import MediaStorage, get_media_storage
+
+# Ресайзятся только картинки из хранилища: "<prefix>/<имя>.<ext>", без "..".
+RESIZABLE_KEY = re.compile(
+    r"^(?:avatars|posters|backdrops)/[A-Za-z0-9_-]+\.(?:jpg|jpeg|png|webp)$"
+)
+OUTPUT_MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+# Меняется вместе с параметрами кодирования: старые ETag и файлы кэша устаревают
+RESIZE_VERSION = 1
+
+
+def resized_name(key: str, width: int, extension: str) -> str:
+    stem = key.rsplit(".", 1)[0]
+    return f"v{RESIZE_VERSION}/{stem}_w{width}.{extension}"
+
+
+def resized_etag(key: str, width: int, extension: str) -> str:
+    # Сильный ETag: ключ содержит хэш исходника, ресайз детерминирован
+    return make_etag("img", RESIZE_VERSION, key, width, extension)
+
+
+class ImageDiskCache:
+    """LRU по суммарному размеру файлов в каталоге кэша.
+
+    Индекс живёт в памяти воркера и при первом обращении заполняется
+    сканированием каталога (старые по mtime вытесняются первыми).
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._loaded = False
+
+    def path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _scan(self) -> list[tuple[float, str, int]]:
+        found = []
+        for directory, _, names in os.walk(self.directory):
+            for file_name in names:
+                if file_name.endswith(".partial"):
+                    continue
+                path = Path(directory) / file_name
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                name = path.relative_to(self.directory).as_posix()
+                found.append((stat.st_mtime, name, stat.st_size))
+        return sorted(found)
+
+    async def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        for _, name, size in await to_thread.run_sync(self._scan):
+            self._entries[name] = size
+            self.size_bytes += size
+        await self._evict()
+
+    async def get(self, name: str) -> Path | None:
+        await self.load()
+        if name not in self._entries:
+            self.misses += 1
+            return None
+        path = self.path(name)
+        if not await to_thread.run_sync(path.is_file):
+            self.size_bytes -= self._entries.pop(name)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(name)
+        self.hits += 1
+        return path
+
+    async def add(self, name: str, size: int) -> None:
+        await self.load()
+        if name in self._entries:
+            self.size_bytes -= self._entries.pop(name)
+        self._entries[name] = size
+        self.size_bytes += size
+        await self._evict(keep=name)
+
+    async def _evict(self, keep: str | None = None) -> None:
+        evicted = []
+        while self.size_bytes > self.max_bytes and self._entries:
+            name, size = next(iter(self._entries.items()))
+            if name == keep:
+                break
+            del self._entries[name]
+            self.size_bytes -= size
+            self.evictions += 1
+            evicted.append(self.path(name))
+        if evicted:
+            await to_thread.run_sync(
+                lambda: [path.unlink(missing_ok=True) for path in evicted]
+            )
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class ImageResizer:
+    """Ресайз на лету с дисковым кэшем.
+
+    Одинаковые одновременные запросы ждут одну задачу ресайза, поэтому
+    холодный кэш не превращается в N одинаковых задач в пуле процессов.
+    """
+
+    def __init__(self, cache: ImageDiskCache):
+        self.cache = cache
+        self.coalesced = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def get(
+        self, storage: MediaStorage, key: str, width: int, extension: str
+    ) -> Path:
+        name = resized_name(key, width, extension)
+        cached = await self.cache.get(name)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.create_task(
+                self._render(storage, key, name, width, extension)
+            )
+            self._inflight[name] = task
+            task.add_done_callback(lambda done: self._finished(name, done))
+        else:
+            self.coalesced += 1
+        # shield: отмена одного клиента не отменяет ресайз для остальных
+        return await asyncio.shield(task)
+
+    def _finished(self, name: str, task: asyncio.Task) -> None:
+        self._inflight.pop(name, None)
+        # Ошибку забирают ожидающие; если все отменились — не шуметь в лог
+        if not task.cancelled():
+            task.exception()
+
+    async def _render(
+        self, storage: MediaStorage, key: str, name: str, width: int, extension: str
+    ) -> Path:
+        Path(settings.MEDIA_TMP_DIR).mkdir(parents=True, exist_ok=True)
+        work_dir = Path(tempfile.mkdtemp(dir=settings.MEDIA_TMP_DIR))
+        try:
+            source = await storage.fetch(key, work_dir)
+            if source is None:
+                raise ResourceNotFoundError(resource="image")
+            target = self.cache.path(name)
+            size = await resize_image_in_pool(source, target, width, extension)
+        finally:
+            await to_thread.run_sync(shutil.rmtree, work_dir, True)
+        await self.cache.add(name, size)
+        return target
+
+    def stats(self) -> dict:
+        return self.cache.stats() | {
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+image_resizer = ImageResizer(
+    ImageDiskCache(
+        Path(settings.IMAGE_RESIZE_CACHE_DIR), settings.IMAGE_RESIZE_CACHE_MAX_BYTES
+    )
+)
+
+
+def check_resize_request(key: str, width: int) -> None:
+    if width not in settings.IMAGE_RESIZE_WIDTHS:
+        allowed = ", ".join(map(str, settings.IMAGE_RESIZE_WIDTHS))
+        raise InvalidInputError(
+            field="width", message=f"Width must be one of {allowed}"
+        )
+    if not RESIZABLE_KEY.match(key):
+        raise ResourceNotFoundError(resource="image")
+
+
+async def get_resized_image(key: str, width: int, extension: str) -> Path:
+    return await image_resizer.get(get_media_storage(), key, width, extension)
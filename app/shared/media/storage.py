@@ -0,0 +1,343 @@
+import hashlib
+import hmac
+import os
+import shutil
+import xml.etree.ElementTree as ET
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+
+import httpx
+from anyio import open_file, to_thread
+
+from app.core.config import settings
+from app.core.exceptions import StorageUnavailableError
+
+# Ключ содержит хэш содержимого, поэтому по одному URL всегда одни и те же байты
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+S3_XML_NAMESPACE = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    modified_at: datetime
+
+
+class MediaStorage(ABC):
+    """Хранилище медиафайлов с ключами вида "<prefix>/<sha256>.<ext>"."""
+
+    async def put(self, key: str, source: Path, content_type: str, digest: str):
+        """Кладёт файл под ключом; уже существующий ключ не перезаписывается."""
+        if not await self.exists(key):
+            await self._upload(key, source, content_type, digest)
+
+    @abstractmethod
+    async def _upload(
+        self, key: str, source: Path, content_type: str, digest: str
+    ) -> None: ...
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def url(self, key: str) -> str: ...
+
+    @abstractmethod
+    async def fetch(self, key: str, directory: Path) -> Path | None:
+        """Локальный путь к файлу для чтения (S3 скачивается в directory);
+        None, если ключа нет."""
+
+    @abstractmethod
+    def list_objects(self, prefix: str) -> AsyncIterator[StoredObject]:
+        """Все файлы с ключом, начинающимся с prefix."""
+
+    def key_from_url(self, url: str | None) -> str | None:
+        prefix = self.url("")
+        if not url or not url.startswith(prefix):
+            return None
+        return url[len(prefix) :] or None
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalStorage(MediaStorage):
+    def __init__(self, root: Path, url_prefix: str = "static/"):
+        self.root = root
+        self.url_prefix = url_prefix
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    async def _upload(self, key: str, source: Path, content_type: str, digest: str):
+        target = self.path(key)
+
+        def _move():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Через файл рядом и rename: читатель не увидит файл наполовину.
+            # move переименовывает в пределах диска и копирует между дисками.
+            partial = target.with_name(f".{target.name}.partial")
+            shutil.move(source, partial)
+            os.replace(partial, target)
+
+        await to_thread.run_sync(_move)
+
+    async def exists(self, key: str) -> bool:
+        return await to_thread.run_sync(self.path(key).exists)
+
+    async def delete(self, key: str) -> None:
+        await to_thread.run_sync(lambda: self.path(key).unlink(missing_ok=True))
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}{key}"
+
+    async def fetch(self, key: str, directory: Path) -> Path | None:
+        path = self.path(key)
+        return path if await to_thread.run_sync(path.is_file) else None
+
+    async def list_objects(self, prefix: str) -> AsyncIterator[StoredObject]:
+        def _scan() -> list[StoredObject]:
+            found = []
+            for directory, _, names in os.walk(self.root / prefix):
+                for name in names:
+                    path = Path(directory) / name
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    found.append(
+                        StoredObject(
+                            key=path.relative_to(self.root).as_posix(),
+                            size=stat.st_size,
+                            modified_at=datetime.fromtimestamp(
+                                stat.st_mtime, timezone.utc
+                            ),
+                        )
+                    )
+            return found
+
+        for stored in await to_thread.run_sync(_scan):
+            yield stored
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def sign_s3_request(
+    method: str,
+    host: str,
+    path: str,
+    headers: dict[str, str],
+    payload_hash: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    now: datetime,
+    query: dict[str, str] | None = None,
+) -> dict[str, str]:
+    """Заголовки запроса с подписью AWS Signature V4."""
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    datestamp = now.strftime("%Y%m%d")
+    signed = {name.lower(): value.strip() for name, value in headers.items()}
+    signed |= {
+        "host": host,
+        "x-amz-content-sha256": payload_hash,
+        "x-amz-date": amz_date,
+    }
+
+    names = sorted(signed)
+    signed_headers = ";".join(names)
+    canonical_request = "\n".join(
+        [
+            method,
+            quote(path, safe="/-_.~"),
+            "&".join(
+                f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+                for name, value in sorted((query or {}).items())
+            ),
+            "".join(f"{name}:{signed[name]}\n" for name in names),
+            signed_headers,
+            payload_hash,
+        ]
+    )
+    scope = f"{datestamp}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+    signing_key = f"AWS4{secret_key}".encode()
+    for part in (datestamp, region, "s3", "aws4_request"):
+        signing_key = _hmac(signing_key, part)
+    signature = hmac.new(
+        signing_key, string_to_sign.encode(), hashlib.sha256
+    ).hexdigest()
+    signed["authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+    return signed
+
+
+class S3Storage(MediaStorage):
+    """S3-совместимый бакет (path-style адреса: подходят MinIO, moto, AWS)."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str,
+        public_url: str,
+        client: httpx.AsyncClient | None = None,
+    ):
+        self.endpoint = httpx.URL(endpoint)
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.public_url = public_url.rstrip("/")
+        self.client = client or httpx.AsyncClient(timeout=30.0)
+
+    async def _request(
+        self,
+        method: str,
+        key: str | None,
+        headers: dict[str, str] | None = None,
+        content: AsyncIterator[bytes] | None = None,
+        payload_hash: str = EMPTY_SHA256,
+        query: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        path = f"/{self.bucket}" if key is None else f"/{self.bucket}/{key}"
+        signed = sign_s3_request(
+            method,
+            self.endpoint.netloc.decode(),
+            path,
+            headers or {},
+            payload_hash,
+            self.access_key,
+            self.secret_key,
+            self.region,
+            datetime.now(timezone.utc),
+            query,
+        )
+        try:
+            return await self.client.request(
+                method,
+                self.endpoint.copy_with(path=path),
+                params=query,
+                headers=signed,
+                content=content,
+            )
+        except httpx.HTTPError:
+            raise StorageUnavailableError()
+
+    @staticmethod
+    def _check(response: httpx.Response, *ok_statuses: int) -> None:
+        if response.status_code not in ok_statuses:
+            raise StorageUnavailableError(
+                f"Media storage returned HTTP {response.status_code}"
+            )
+
+    async def _upload(self, key: str, source: Path, content_type: str, digest: str):
+        async def chunks() -> AsyncIterator[bytes]:
+            async with await open_file(source, "rb") as file:
+                while chunk := await file.read(64 * 1024):
+                    yield chunk
+
+        size = await to_thread.run_sync(lambda: source.stat().st_size)
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(size),
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        }
+        # Хэш содержимого уже посчитан для ключа — он же payload hash подписи
+        response = await self._request("PUT", key, headers, chunks(), digest)
+        self._check(response, 200)
+
+    async def exists(self, key: str) -> bool:
+        response = await self._request("HEAD", key)
+        self._check(response, 200, 404)
+        return response.status_code == 200
+
+    async def delete(self, key: str) -> None:
+        response = await self._request("DELETE", key)
+        self._check(response, 200, 204, 404)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    async def fetch(self, key: str, directory: Path) -> Path | None:
+        response = await self._request("GET", key)
+        self._check(response, 200, 404)
+        if response.status_code == 404:
+            return None
+        target = directory / key.replace("/", "_")
+        await to_thread.run_sync(target.write_bytes, response.content)
+        return target
+
+    async def list_objects(self, prefix: str) -> AsyncIterator[StoredObject]:
+        # ListObjectsV2 постранично (до 1000 ключей на ответ)
+        query = {"list-type": "2", "prefix": prefix}
+        while True:
+            response = await self._request("GET", None, query=query)
+            self._check(response, 200)
+            root = ET.fromstring(response.content)
+            for item in root.iter(f"{S3_XML_NAMESPACE}Contents"):
+                yield StoredObject(
+                    key=item.findtext(f"{S3_XML_NAMESPACE}Key"),
+                    size=int(item.findtext(f"{S3_XML_NAMESPACE}Size")),
+                    modified_at=datetime.fromisoformat(
+                        item.findtext(f"{S3_XML_NAMESPACE}LastModified").replace(
+                            "Z", "+00:00"
+                        )
+                    ),
+                )
+            token = root.findtext(f"{S3_XML_NAMESPACE}NextContinuationToken")
+            if root.findtext(f"{S3_XML_NAMESPACE}IsTruncated") != "true" or not token:
+                return
+            query = {**query, "continuation-token": token}
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+_storage: MediaStorage | None = None
+
+
+def get_media_storage() -> MediaStorage:
+    global _storage
+    if _storage is None:
+        if settings.MEDIA_STORAGE == "s3":
+            _storage = S3Storage(
+                endpoint=settings.MEDIA_S3_ENDPOINT,
+                bucket=settings.MEDIA_S3_BUCKET,
+                access_key=settings.MEDIA_S3_ACCESS_KEY or "",
+                secret_key=settings.MEDIA_S3_SECRET_KEY or "",
+                region=settings.MEDIA_S3_REGION,
+                public_url=settings.MEDIA_S3_PUBLIC_URL,
+            )
+        else:
+            _storage = LocalStorage(Path(settings.MEDIA_LOCAL_ROOT))
+    return _storage
+
+
+async def close_media_storage() -> None:
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
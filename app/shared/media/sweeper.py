@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.account.models.user import AccountUser
+from app.core.advisory_lock import AdvisoryLock
+from app.core.config import settings
+from app.movie.models.movie import Movie
+from .media_service import media_urls
+from .repositories import media_repo
+from .storage import MediaStorage, StoredObject
+
+logger = logging.getLogger(__name__)
+
+# Ключ pg_advisory_lock: проход чистки делает один воркер на весь кластер
+MEDIA_SWEEP_LOCK_KEY = 7_301_994_113
+
+# Колонки, которые ссылаются на файлы хранилища: (модель, колонки)
+MEDIA_REFERENCES = (
+    (
+        Movie,
+        (
+            Movie.poster,
+            Movie.backdrop,
+            Movie.poster_renditions,
+            Movie.backdrop_renditions,
+        ),
+    ),
+    (AccountUser, (AccountUser.user_image,)),
+)
+
+
+@dataclass
+class SweepStats:
+    dry_run: bool
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    duration_seconds: float = 0.0
+    referenced: int = 0
+    scanned: int = 0
+    skipped_recent: int = 0
+    # Без ссылок в колонках, но refcount > 0: ссылка ещё не закоммичена
+    skipped_pending: int = 0
+    orphans: int = 0
+    orphan_bytes: int = 0
+    deleted: int = 0
+    bytes_reclaimed: int = 0
+    errors: int = 0
+
+
+@dataclass
+class SweeperMetrics:
+    runs: int = 0
+    deleted: int = 0
+    bytes_reclaimed: int = 0
+    errors: int = 0
+    last_run: SweepStats | None = None
+
+    def record(self, stats: SweepStats) -> None:
+        self.runs += 1
+        self.deleted += stats.deleted
+        self.bytes_reclaimed += stats.bytes_reclaimed
+        self.errors += stats.errors
+        self.last_run = stats
+
+    def snapshot(self) -> dict:
+        return asdict(self)
+
+
+sweeper_metrics = SweeperMetrics()
+
+
+async def collect_referenced_keys(
+    session: AsyncSession, storage: MediaStorage, batch_size: int
+) -> set[str]:
+    """Ключи всех файлов, на которые ссылаются строки БД.
+
+    Таблицы читаются keyset-пачками по id: без OFFSET и без долгой транзакции
+    поверх всей таблицы.
+    """
+    keys = set()
+    for model, columns in MEDIA_REFERENCES:
+        last_id = 0
+        while True:
+            stmt = (
+                select(model.id, *columns)
+                .where(model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+            )
+            rows = (await session.exec(stmt)).all()
+            if not rows:
+                break
+            for row_id, *values in rows:
+                for url in media_urls(*values):
+                    if key := storage.key_from_url(url):
+                        keys.add(key)
+            last_id = rows[-1][0]
+            await session.commit()
+    return keys
+
+
+async def _claim_deletable(
+    session: AsyncSession, candidates: list[StoredObject]
+) -> list[StoredObject]:
+    """Из кандидатов оставляет файлы без ссылок по refcount.
+
+    Файлам без строки в mediablob сначала заводится строка с refcount=0,
+    затем все забираются условным DELETE: файл, на который только что
+    сослалась загрузка, не тронут. Транзакцию не коммитит — см. delete_batch.
+    """
+    await media_repo.track_blobs(
+        session, [(candidate.key, candidate.size) for candidate in candidates]
+    )
+    claimed = set(
+        await media_repo.claim_unreferenced(
+            session, [candidate.key for candidate in candidates]
+        )
+    )
+    return [candidate for candidate in candidates if candidate.key in claimed]
+
+
+async def sweep_orphans(
+    session_factory: async_sessionmaker[AsyncSession],
+    storage: MediaStorage,
+    *,
+    prefixes: list[str],
+    grace: timedelta,
+    dry_run: bool = False,
+    batch_size: int = 1000,
+    deletes_per_second: float = 0.0,
+) -> SweepStats:
+    """Удаляет файлы хранилища, на которые не ссылается ни одна строка.
+
+    Файлы моложе grace не трогаются: их загрузка может быть ещё не
+    закоммичена. dry_run только считает. deletes_per_second ограничивает
+    темп удаления, чтобы не нагружать диск/S3 вместе с живым трафиком.
+    """
+    stats = SweepStats(dry_run=dry_run)
+    started = time.monotonic()
+    async with session_factory() as session:
+        referenced = await collect_referenced_keys(session, storage, batch_size)
+    stats.referenced = len(referenced)
+    cutoff = datetime.now(timezone.utc) - grace
+    interval = 1 / deletes_per_second if deletes_per_second > 0 else 0.0
+
+    async def delete_batch(candidates: list[StoredObject]) -> None:
+        async with session_factory() as session:
+            deletable = await _claim_deletable(session, candidates)
+            stats.skipped_pending += len(candidates) - len(deletable)
+            # Файлы удаляются до коммита: пока строки заблокированы, загрузка
+            # того же содержимого ждёт в acquire_blob, а потом её put увидит,
+            # что файла нет, и запишет его заново.
+            for stored in deletable:
+                try:
+                    await storage.delete(stored.key)
+                except Exception as exc:
+                    # Строки уже нет, следующий проход заведёт её снова
+                    stats.errors += 1
+                    logger.warning("Failed to delete media %s: %s", stored.key, exc)
+                    continue
+                stats.deleted += 1
+                stats.bytes_reclaimed += stored.size
+                if interval:
+                    await asyncio.sleep(interval)
+            await session.commit()
+
+    batch: list[StoredObject] = []
+    for prefix in prefixes:
+        async for stored in storage.list_objects(f"{prefix}/"):
+            stats.scanned += 1
+            if stored.key in referenced:
+                continue
+            if stored.modified_at > cutoff:
+                stats.skipped_recent += 1
+                continue
+            stats.orphans += 1
+            stats.orphan_bytes += stored.size
+            if dry_run:
+                continue
+            batch.append(stored)
+            if len(batch) >= batch_size:
+                await delete_batch(batch)
+                batch = []
+    if batch:
+        await delete_batch(batch)
+
+    stats.duration_seconds = round(time.monotonic() - started, 3)
+    sweeper_metrics.record(stats)
+    return stats
+
+
+async def run_sweeper_forever(
+    session_factory: async_sessionmaker[AsyncSession],
+    storage: MediaStorage,
+    lock: AdvisoryLock,
+) -> None:
+    """Фоновая задача lifespan: проход раз в MEDIA_SWEEP_INTERVAL_SECONDS.
+
+    Задача есть в каждом воркере, но проход делает тот, кто взял lock;
+    остальные пропускают этот интервал.
+    """
+    while True:
+        await asyncio.sleep(settings.MEDIA_SWEEP_INTERVAL_SECONDS)
+        try:
+            async with lock.hold() as acquired:
+                if not acquired:
+                    logger.debug("Media sweep is running in another worker")
+                    continue
+                stats = await sweep_orphans(
+                    session_factory,
+                    storage,
+                    prefixes=settings.MEDIA_SWEEP_PREFIXES,
+                    grace=timedelta(seconds=settings.MEDIA_SWEEP_GRACE_SECONDS),
+                    dry_run=settings.MEDIA_SWEEP_DRY_RUN,
+                    batch_size=settings.MEDIA_SWEEP_BATCH_SIZE,
+                    deletes_per_second=settings.MEDIA_SWEEP_DELETES_PER_SECOND,
+                )
+        except Exception:
+            sweeper_metrics.errors += 1
+            logger.exception("Media sweep failed")
+            continue
+        logger.info(
+            "Media sweep: deleted %s files, reclaimed %s bytes",
+            stats.deleted,
+            stats.bytes_reclaimed,
+        )
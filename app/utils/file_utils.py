@@ -4,13 +4,46 @@ from pathlib import Path
 from fastapi import UploadFile
 from anyio import open_file, to_thread
 
+from app.core.exceptions import FileTooLargeError
 
-async def save_file_to_disk(file: UploadFile, directory: str, filename: str) -> str:
+# Сигнатуры форматов по первым байтам файла -> расширение
+IMAGE_SIGNATURES = {
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"\xff\xd8\xff": "jpg",
+}
+
+
+def image_extension_from_bytes(head: bytes) -> str | None:
+    for signature, ext in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return ext
+    return None
+
+
+async def sniff_image_extension(file: UploadFile) -> str | None:
+    """Определяет формат по магическим байтам, а не по content_type/имени."""
+    head = await file.read(16)
+    await file.seek(0)
+    return image_extension_from_bytes(head)
+
+
+async def save_file_to_disk(
+    file: UploadFile, directory: str, filename: str, max_size_mb: int | None = None
+) -> str:
     os.makedirs(directory, exist_ok=True)
     path = os.path.join(directory, filename)
-    async with open_file(path, "wb") as buffer:
+    max_size = max_size_mb * 1024 * 1024 if max_size_mb else None
+    written = 0
+    async with await open_file(path, "wb") as buffer:
         while chunk := await file.read(size=64 * 1024):
+            written += len(chunk)
+            # Лимит проверяется по ходу записи, файл целиком в память не читается
+            if max_size is not None and written > max_size:
+                break
             await buffer.write(chunk)
+    if max_size is not None and written > max_size:
+        await delete_file_from_disk(Path(path))
+        raise FileTooLargeError(limit_mb=max_size_mb)
     return path
 
 
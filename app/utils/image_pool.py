@@ -0,0 +1,59 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.exceptions import InvalidInputError
+from app.utils.images import InvalidImageError, render_renditions, resize_image
+
+_pool: ProcessPoolExecutor | None = None
+# Ограничивает очередь задач к пулу: лишние загрузки ждут слота, а не копятся
+_pending_jobs = asyncio.Semaphore(settings.IMAGE_MAX_PENDING_JOBS)
+
+
+def get_image_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: воркер приложения многопоточный (драйверы БД), fork небезопасен
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def run_in_image_pool(func, *args):
+    """Декодирование и ресайз в пуле процессов, не блокируя event loop.
+
+    Очередь к пулу общая для загрузок и ресайза на лету.
+    """
+    async with _pending_jobs:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(get_image_pool(), func, *args)
+        except InvalidImageError as exc:
+            raise InvalidInputError(field="image", message=str(exc))
+
+
+async def process_image(
+    source: Path, directory: Path, stem: str, widths: tuple[int, ...]
+) -> dict:
+    return await run_in_image_pool(
+        render_renditions, str(source), str(directory), stem, tuple(widths)
+    )
+
+
+async def resize_image_in_pool(
+    source: Path, target: Path, width: int, extension: str
+) -> int:
+    return await run_in_image_pool(
+        resize_image, str(source), str(target), width, extension
+    )
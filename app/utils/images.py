@@ -0,0 +1,83 @@
+from pathlib import Path
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Модуль выполняется в процессах пула (spawn): только Pillow, без импортов app.*
+ALLOWED_IMAGE_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+RENDITION_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+def render_renditions(
+    source: str, directory: str, stem: str, widths: tuple[int, ...]
+) -> dict:
+    """Проверяет загрузку декодированием и пишет уменьшенные WebP/JPEG копии.
+
+    Исходник переименовывается в <stem>.<ext> по реальному формату. Ширины
+    больше оригинала не апскейлятся (кроме самой маленькой — она есть всегда).
+    Возвращает имена файлов относительно directory.
+    """
+    source_path, directory_path = Path(source), Path(directory)
+    try:
+        with Image.open(source_path) as image:
+            image_format = image.format
+            image.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise InvalidImageError("File is not a valid image")
+    if image_format not in ALLOWED_IMAGE_FORMATS:
+        raise InvalidImageError(f"Unsupported image format: {image_format}")
+
+    original = directory_path / f"{stem}.{ALLOWED_IMAGE_FORMATS[image_format]}"
+    source_path.replace(original)
+
+    renditions = {}
+    with Image.open(original) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        for width in sorted(widths):
+            if width > image.width and renditions:
+                continue
+            if width < image.width:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            else:
+                resized = image
+            files = {}
+            for extension, (image_format, options) in RENDITION_FORMATS.items():
+                name = f"{stem}_w{width}.{extension}"
+                resized.save(directory_path / name, image_format, **options)
+                files[extension] = name
+            renditions[f"w{width}"] = files
+    return {"original": original.name, "renditions": renditions}
+
+
+def resize_image(source: str, target: str, width: int, extension: str) -> int:
+    """Уменьшает картинку до width (без апскейла) и пишет её в target.
+
+    Запись через соседний .partial и rename: параллельный читатель кэша не
+    увидит недописанный файл. Возвращает размер результата в байтах.
+    """
+    try:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            if width < image.width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+            image_format, options = RENDITION_FORMATS[extension]
+            target_path = Path(target)
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            partial = target_path.with_name(f".{target_path.name}.partial")
+            image.save(partial, image_format, **options)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise InvalidImageError("File is not a valid image")
+    partial.replace(target_path)
+    return target_path.stat().st_size
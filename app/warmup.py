@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import configure_mappers, selectinload
+from sqlmodel import select
+
+from app.core.config import settings
+from app.db import async_session, engine, replicas
+from app.movie.models.movie import Movie
+from app.movie.repositories import movie_search, movie_statements
+from app.movie.schemas.movie import MovieRead, MovieReadMainPage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupState:
+    status: str = "pending"  # pending | running | ready | failed
+    attempts: int = 0
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    # Длительность шагов последней попытки, мс
+    steps: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def snapshot(self) -> dict:
+        return asdict(self)
+
+
+async def warm_pool(target: AsyncEngine, count: int) -> int:
+    """Открывает count соединений разом и на каждом выполняет горячие
+    запросы: прогревается пул, кэш компиляции и prepared statements asyncpg
+    (они у каждого соединения свои)."""
+    count = min(count or target.pool.size(), target.pool.size())
+    statements = movie_statements.hot_statements(target.dialect.name)
+    async with AsyncExitStack() as stack:
+        # Держим все сразу, иначе пул отдаст одно и то же соединение
+        connections = [
+            await stack.enter_async_context(target.connect()) for _ in range(count)
+        ]
+        for connection in connections:
+            await connection.execute(text("SELECT 1"))
+            for stmt, params in statements:
+                await connection.execute(stmt, params)
+    return count
+
+
+async def warm_schemas() -> None:
+    """Первая валидация/сериализация карточек на настоящих строках."""
+    async with async_session() as session:
+        dialect_name = await movie_search.get_dialect_name(session)
+        stmt, params = movie_statements.hot_statements(dialect_name)[0]
+        for row in (await session.exec(stmt, params=params)).all():
+            MovieReadMainPage.model_validate(row).model_dump_json()
+        full = select(Movie).options(
+            selectinload(Movie.genres), selectinload(Movie.category)
+        )
+        for movie in (await session.exec(full.limit(1))).all():
+            MovieRead.model_validate(movie).model_dump_json()
+
+
+async def warm_routes(app, paths: list[str]) -> None:
+    """Справочники и первые страницы через сам ASGI-стек: роутинг, зависимости,
+    схемы ответов и кэш ответов заполняются так же, как при живом запросе."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://warmup"
+    ) as client:
+        for path in paths:
+            response = await client.get(path)
+            if response.status_code >= 500:
+                raise RuntimeError(f"GET {path}: {response.status_code}")
+
+
+class Warmup:
+    """Прогрев воркера до того, как /readyz пустит на него трафик."""
+
+    def __init__(self):
+        self.state = WarmupState()
+
+    @contextmanager
+    def _step(self, name: str):
+        started = time.perf_counter()
+        yield
+        self.state.steps[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def run(self, app) -> None:
+        self.state.status = "running"
+        self.state.attempts += 1
+        self.state.started_at = datetime.now(timezone.utc)
+        self.state.steps = {}
+        with self._step("mappers"):
+            configure_mappers()
+        with self._step("connections"):
+            await warm_pool(engine, settings.WARMUP_DB_CONNECTIONS)
+        for index, replica in enumerate(replicas.engines):
+            if replicas.healthy[index]:
+                with self._step(f"replica_{index}"):
+                    await warm_pool(replica, settings.WARMUP_DB_CONNECTIONS)
+        with self._step("schemas"):
+            await warm_schemas()
+        with self._step("routes"):
+            await warm_routes(app, settings.WARMUP_PATHS)
+        self.state.status = "ready"
+        self.state.error = None
+        self.state.finished_at = datetime.now(timezone.utc)
+
+    async def run_until_ready(self, app) -> None:
+        """Повторяет прогрев, пока он не пройдёт (БД может подняться позже)."""
+        if not settings.WARMUP_ENABLED:
+            self.state.status = "ready"
+            return
+        while True:
+            try:
+                async with asyncio.timeout(settings.WARMUP_TIMEOUT_SECONDS):
+                    await self.run(app)
+                logger.info("Warm-up finished: %s", self.state.steps)
+                return
+            except Exception as exc:
+                self.state.status = "failed"
+                self.state.error = f"{type(exc).__name__}: {exc}"[:500]
+                logger.warning("Warm-up failed, retrying: %s", self.state.error)
+            await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+
+
+warmup = Warmup()
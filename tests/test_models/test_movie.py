@@ -1,5 +1,6 @@
 import pytest
-from app.movie.models.movie import Movie
+from datetime import date
+from app.movie.models.movie import Movie, parse_release_date
 
 
 def test_movie_model_fields():
@@ -26,4 +27,15 @@ def test_movie_model_fields():
     assert movie.release_date == "2010-07-16"
 
 
-
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("2010-07-16", date(2010, 7, 16)),
+        ("", None),
+        (None, None),
+        ("2023-02-30", None),
+        ("unknown", None),
+    ],
+)
+def test_parse_release_date(raw, expected):
+    assert parse_release_date(raw) == expected
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.conditional import is_not_modified, make_validators
+
+LAST_MODIFIED = datetime(2025, 5, 1, 12, 30, 15, 500, tzinfo=timezone.utc)
+
+
+def make_request(**headers) -> MagicMock:
+    request = MagicMock()
+    request.headers = {name.replace("_", "-"): value for name, value in headers.items()}
+    return request
+
+
+def test_validators_headers():
+    validators = make_validators(LAST_MODIFIED, "catalog", 7)
+    headers = validators.headers()
+    assert headers["ETag"] == validators.etag
+    assert headers["ETag"].startswith('"')
+    assert headers["Last-Modified"] == "Thu, 01 May 2025 12:30:15 GMT"
+    assert make_validators(None, "catalog", 8).etag != validators.etag
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({}, False),
+        ({"if_none_match": "<etag>"}, True),
+        ({"if_none_match": 'W/"other", <etag>'}, True),
+        ({"if_none_match": '"other"'}, False),
+        ({"if_none_match": "*"}, True),
+        ({"if_modified_since": "Thu, 01 May 2025 12:30:15 GMT"}, True),
+        ({"if_modified_since": "Thu, 01 May 2025 12:30:14 GMT"}, False),
+        ({"if_modified_since": "not a date"}, False),
+        # If-None-Match важнее If-Modified-Since
+        (
+            {
+                "if_none_match": '"other"',
+                "if_modified_since": "Thu, 01 May 2025 12:30:15 GMT",
+            },
+            False,
+        ),
+    ],
+)
+def test_is_not_modified(headers, expected):
+    validators = make_validators(LAST_MODIFIED, "movie", 1)
+    headers = {
+        name: value.replace("<etag>", validators.etag)
+        for name, value in headers.items()
+    }
+    assert is_not_modified(make_request(**headers), validators) is expected
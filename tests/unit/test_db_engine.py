@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from app import db
+from app.db import engine_options, pool_metrics
+
+
+def test_asyncpg_gets_pool_and_server_settings():
+    with (
+        patch.object(db.settings, "DEBUG", False),
+        patch.object(db.settings, "DB_ECHO", True),
+        patch.object(db.settings, "DB_STATEMENT_CACHE_SIZE", 0),
+        patch.object(db.settings, "DB_STATEMENT_TIMEOUT_MS", 5000),
+    ):
+        options = engine_options("postgresql+asyncpg://u:p@db/movies")
+
+    assert options["echo"] is False
+    assert options["pool_size"] == db.settings.DB_POOL_SIZE
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    assert options["connect_args"]["server_settings"]["statement_timeout"] == "5000"
+
+
+def test_other_drivers_get_no_asyncpg_args():
+    assert "connect_args" not in engine_options("sqlite+aiosqlite:///x.db")
+
+
+def test_single_engine_is_shared():
+    from app.deps import db as deps_db
+
+    assert deps_db.engine is db.engine
+    assert deps_db.get_db is db.get_db
+
+
+def test_pool_snapshot_reports_waits():
+    before = pool_metrics.checkouts
+    pool_metrics.record(0.002)
+    pool_metrics.record(0.5, timed_out=True)
+
+    stats = db.pool_stats()
+
+    assert stats["checkouts"] == before + 1
+    assert stats["timeouts"] >= 1
+    assert stats["max_wait_ms"] >= 500
+    assert stats["checked_out"] == 0 and stats["size"] == db.settings.DB_POOL_SIZE
@@ -0,0 +1,85 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.core.exceptions import InvalidInputError, ResourceNotFoundError
+from app.shared.media import resize
+from app.shared.media.resize import ImageDiskCache, ImageResizer, check_resize_request
+from app.shared.media.storage import LocalStorage
+
+KEY = "posters/" + "a" * 64 + ".jpg"
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = ImageDiskCache(tmp_path, max_bytes=10)
+
+    async def scenario():
+        for name in ("a", "b", "c"):
+            cache.path(name).write_bytes(b"x" * 4)
+            await cache.add(name, 4)
+            if name == "b":
+                assert await cache.get("a") is not None
+
+    asyncio.run(scenario())
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a", "c"]
+    assert cache.size_bytes == 8
+    assert cache.evictions == 1
+
+
+def test_disk_cache_loads_existing_files(tmp_path):
+    (tmp_path / "v1").mkdir()
+    (tmp_path / "v1" / "old.webp").write_bytes(b"x" * 6)
+    cache = ImageDiskCache(tmp_path, max_bytes=100)
+
+    path = asyncio.run(cache.get("v1/old.webp"))
+
+    assert path == tmp_path / "v1" / "old.webp"
+    assert cache.size_bytes == 6
+
+
+def test_concurrent_requests_share_one_resize(tmp_path):
+    storage = LocalStorage(tmp_path / "static")
+    source = storage.path(KEY)
+    source.parent.mkdir(parents=True)
+    source.write_bytes(b"jpeg")
+    resizer = ImageResizer(ImageDiskCache(tmp_path / "cache", max_bytes=1024))
+    calls = []
+
+    async def fake_resize(source: Path, target: Path, width: int, extension: str):
+        calls.append((width, extension))
+        await asyncio.sleep(0.01)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(b"small")
+        return 5
+
+    async def scenario():
+        return await asyncio.gather(
+            *(resizer.get(storage, KEY, 185, "webp") for _ in range(5))
+        )
+
+    with (
+        patch.object(resize, "resize_image_in_pool", fake_resize),
+        patch.object(resize.settings, "MEDIA_TMP_DIR", str(tmp_path / "tmp")),
+    ):
+        paths = asyncio.run(scenario())
+        again = asyncio.run(resizer.get(storage, KEY, 185, "webp"))
+
+    assert calls == [(185, "webp")]
+    assert len(set(paths)) == 1 and again == paths[0]
+    assert resizer.coalesced == 4
+    assert resizer.cache.hits == 1
+
+
+@pytest.mark.parametrize(
+    ("key", "width", "error"),
+    [
+        (KEY, 333, InvalidInputError),
+        ("posters/../../app/core/config.py", 185, ResourceNotFoundError),
+        ("secrets/x.jpg", 185, ResourceNotFoundError),
+    ],
+)
+def test_rejects_unknown_widths_and_paths(key, width, error):
+    with pytest.raises(error):
+        check_resize_request(key, width)
@@ -0,0 +1,38 @@
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+
+from app.core.exceptions import FileTooLargeError
+from app.utils.file_utils import save_file_to_disk
+from app.utils.images import InvalidImageError, render_renditions
+
+
+def test_render_renditions_does_not_upscale(tmp_path):
+    source = tmp_path / "upload.tmp"
+    Image.new("RGBA", (400, 600), (255, 0, 0, 128)).save(source, "PNG")
+
+    result = render_renditions(str(source), str(tmp_path), "abc", (185, 342, 780))
+
+    assert result["original"] == "abc.png"
+    assert list(result["renditions"]) == ["w185", "w342"]
+    with Image.open(tmp_path / result["renditions"]["w185"]["webp"]) as image:
+        assert image.format == "WEBP"
+        assert image.size == (185, 278)
+    assert not source.exists()
+
+
+def test_render_renditions_rejects_non_images(tmp_path):
+    source = tmp_path / "upload.tmp"
+    source.write_bytes(b"<?php echo 1; ?>")
+    with pytest.raises(InvalidImageError):
+        render_renditions(str(source), str(tmp_path), "abc", (185,))
+
+
+@pytest.mark.asyncio
+async def test_save_file_to_disk_enforces_limit_while_streaming(tmp_path):
+    upload = UploadFile(file=BytesIO(b"x" * (1024 * 1024 + 1)), filename="big.png")
+    with pytest.raises(FileTooLargeError):
+        await save_file_to_disk(upload, str(tmp_path), "big.png", max_size_mb=1)
+    assert not (tmp_path / "big.png").exists()
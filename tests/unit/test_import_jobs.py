@@ -0,0 +1,115 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.advisory_lock import AdvisoryLock
+from app.core.exceptions import (
+    ImportAlreadyRunningError,
+    InternalApiDisabledError,
+    InvalidInternalTokenError,
+)
+from app.deps.internal import require_internal_token
+from app.movie.repositories import import_job_repo
+from app.movie.schemas.import_job import ImportJobRead
+from app.movie.services.import_jobs import ImportJobRunner
+
+STARTED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_lock_allows_one_import_per_process():
+    lock = AdvisoryLock(SimpleNamespace(dialect=SimpleNamespace(name="sqlite")), 1)
+
+    async def scenario():
+        async with lock.hold() as first:
+            async with lock.hold() as second:
+                held = await lock.is_held()
+        return first, second, held, await lock.is_held()
+
+    assert asyncio.run(scenario()) == (True, False, True, False)
+
+
+def make_runner(job=None):
+    lock = AdvisoryLock(SimpleNamespace(dialect=SimpleNamespace(name="sqlite")), 1)
+    runner = ImportJobRunner(MagicMock(), lock)
+    repo = patch.multiple(
+        import_job_repo,
+        fail_stale_jobs=AsyncMock(),
+        create_job=AsyncMock(side_effect=lambda _, kind: SimpleNamespace(id=1)),
+        update_job=AsyncMock(return_value=job),
+    )
+    return runner, lock, repo
+
+
+def test_start_takes_the_lock_before_answering():
+    runner, lock, repo = make_runner(job=SimpleNamespace(cancel_requested=False))
+    release = asyncio.Event()
+
+    async def slow_import(job_id):
+        await release.wait()
+
+    async def scenario():
+        await runner.start()
+        # Задача ещё не успела стартовать, а второй запуск уже получает 409
+        with pytest.raises(ImportAlreadyRunningError):
+            await runner.start()
+        release.set()
+        await asyncio.gather(*runner._tasks.values())
+        return await lock.is_held()
+
+    with repo, patch.object(runner, "_import", slow_import):
+        assert asyncio.run(scenario()) is False
+
+
+def test_missing_job_row_releases_the_lock():
+    runner, lock, repo = make_runner(job=None)
+
+    async def scenario():
+        await runner.start()
+        await asyncio.gather(*runner._tasks.values())
+        return await lock.is_held()
+
+    with repo, patch.object(runner, "_import", AsyncMock()) as run_import:
+        assert asyncio.run(scenario()) is False
+    run_import.assert_not_awaited()
+
+
+def test_job_reports_throughput():
+    job = ImportJobRead(
+        id=1,
+        kind="tmdb_import",
+        status="running",
+        cancel_requested=False,
+        rows_read=5000,
+        rows_written=4000,
+        rows_skipped=1000,
+        batches=5,
+        created_at=STARTED,
+        started_at=STARTED,
+        updated_at=STARTED + timedelta(seconds=10),
+    )
+
+    assert job.rows_per_second == 500.0
+    assert job.model_copy(update={"started_at": None}).rows_per_second is None
+
+
+@pytest.mark.parametrize(
+    "configured, sent, error",
+    [
+        ("", "anything", InternalApiDisabledError),
+        ("s3cret", None, InvalidInternalTokenError),
+        ("s3cret", "s3cre", InvalidInternalTokenError),
+        ("s3cret", "s3cret", None),
+    ],
+)
+def test_internal_endpoints_require_token(configured, sent, error):
+    settings = SimpleNamespace(INTERNAL_API_TOKEN=configured)
+    check = require_internal_token(settings, x_internal_token=sent)
+
+    if error is None:
+        assert asyncio.run(check) is None
+    else:
+        with pytest.raises(error):
+            asyncio.run(check)
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.advisory_lock import AdvisoryLock
+from app.shared.media import sweeper
+from app.shared.media.models import MediaBlob
+from app.shared.media.repositories import media_repo
+from app.shared.media.storage import LocalStorage
+
+DAY = 24 * 60 * 60
+
+
+def make_file(root, key: str, size: int, age_seconds: int) -> None:
+    path = root / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age_seconds
+    os.utime(path, (stamp, stamp))
+
+
+@asynccontextmanager
+async def fake_session():
+    yield AsyncMock()
+
+
+def run_sweep(storage, dry_run: bool, pending: set[str] = frozenset()):
+    async def referenced(session, storage, batch_size):
+        return {"posters/kept.jpg"}
+
+    async def claim(session, candidates):
+        return [candidate for candidate in candidates if candidate.key not in pending]
+
+    with (
+        patch.object(sweeper, "collect_referenced_keys", referenced),
+        patch.object(sweeper, "_claim_deletable", claim),
+    ):
+        return asyncio.run(
+            sweeper.sweep_orphans(
+                fake_session,
+                storage,
+                prefixes=["posters", "avatars"],
+                grace=timedelta(days=1),
+                dry_run=dry_run,
+                batch_size=2,
+            )
+        )
+
+
+def test_deletes_only_old_unreferenced_files(tmp_path):
+    make_file(tmp_path, "posters/kept.jpg", 10, 3 * DAY)
+    make_file(tmp_path, "posters/old.jpg", 20, 3 * DAY)
+    make_file(tmp_path, "posters/fresh.jpg", 30, 60)
+    make_file(tmp_path, "avatars/old.png", 40, 2 * DAY)
+    make_file(tmp_path, "avatars/pending.png", 50, 2 * DAY)
+    storage = LocalStorage(tmp_path)
+
+    stats = run_sweep(storage, dry_run=False, pending={"avatars/pending.png"})
+
+    assert sorted(p.name for p in tmp_path.rglob("*.*")) == [
+        "fresh.jpg",
+        "kept.jpg",
+        "pending.png",
+    ]
+    assert (stats.scanned, stats.skipped_recent, stats.orphans) == (5, 1, 3)
+    assert (stats.deleted, stats.bytes_reclaimed, stats.skipped_pending) == (2, 60, 1)
+    assert sweeper.sweeper_metrics.last_run is stats
+
+
+def test_dry_run_only_counts(tmp_path):
+    make_file(tmp_path, "posters/old.jpg", 20, 3 * DAY)
+    storage = LocalStorage(tmp_path)
+
+    stats = run_sweep(storage, dry_run=True)
+
+    assert (tmp_path / "posters" / "old.jpg").exists()
+    assert (stats.orphans, stats.orphan_bytes, stats.deleted) == (1, 20, 0)
+
+
+def test_only_the_lock_holder_sweeps():
+    lock = AdvisoryLock(SimpleNamespace(dialect=SimpleNamespace(name="sqlite")), 1)
+    passes = []
+
+    async def sweep(*args, **kwargs):
+        passes.append(kwargs["dry_run"])
+        return sweeper.SweepStats(dry_run=kwargs["dry_run"])
+
+    async def scenario():
+        task = asyncio.create_task(
+            sweeper.run_sweeper_forever(fake_session, None, lock)
+        )
+        # Пока lock у "соседнего воркера", проходы пропускаются
+        async with lock.hold():
+            for _ in range(5):
+                await asyncio.sleep(0)
+        assert passes == []
+        while not passes:
+            await asyncio.sleep(0)
+        task.cancel()
+
+    with (
+        patch.object(sweeper.settings, "MEDIA_SWEEP_INTERVAL_SECONDS", 0),
+        patch.object(sweeper, "sweep_orphans", sweep),
+    ):
+        asyncio.run(scenario())
+
+
+def test_upload_racing_the_sweeper_keeps_its_file(tmp_path):
+    root = tmp_path / "media"
+    make_file(root, "posters/orphan.jpg", 20, 3 * DAY)
+    make_file(root, "posters/untracked.jpg", 30, 3 * DAY)
+    make_file(root, "posters/used.jpg", 40, 3 * DAY)
+    upload = tmp_path / "upload.jpg"
+    upload.write_bytes(b"x" * 20)
+    storage = LocalStorage(root)
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(
+                SQLModel.metadata.create_all, tables=[MediaBlob.__table__]
+            )
+        sessions = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with sessions() as session:
+            session.add(MediaBlob(key="posters/orphan.jpg", size=20, refcount=0))
+            session.add(MediaBlob(key="posters/used.jpg", size=40, refcount=1))
+            await session.commit()
+
+        async def store_same_content():
+            # Как media_service.store_file: сначала ссылка, потом файл
+            async with sessions() as session:
+                await media_repo.acquire_blob(session, "posters/orphan.jpg", 20)
+                await storage.put("posters/orphan.jpg", upload, "image/jpeg", "")
+                await session.commit()
+
+        delete = storage.delete
+        uploads = []
+
+        async def delete_while_uploading(key):
+            if key == "posters/orphan.jpg":
+                uploads.append(asyncio.create_task(store_same_content()))
+                await asyncio.sleep(0.2)
+                # Загрузка ждёт блокировку строки, пока файл не удалён
+                assert not uploads[0].done()
+            await delete(key)
+
+        async def referenced(session, storage, batch_size):
+            return set()
+
+        with (
+            patch.object(sweeper, "collect_referenced_keys", referenced),
+            patch.object(storage, "delete", delete_while_uploading),
+        ):
+            stats = await sweeper.sweep_orphans(
+                sessions, storage, prefixes=["posters"], grace=timedelta(days=1)
+            )
+        await uploads[0]
+        async with sessions() as session:
+            rows = (await session.exec(select(MediaBlob.key, MediaBlob.refcount))).all()
+        await engine.dispose()
+        return stats, sorted(rows)
+
+    stats, rows = asyncio.run(scenario())
+
+    assert (stats.deleted, stats.skipped_pending) == (2, 1)
+    assert rows == [("posters/orphan.jpg", 1), ("posters/used.jpg", 1)]
+    assert sorted(p.name for p in root.rglob("*.*")) == ["orphan.jpg", "used.jpg"]
@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.movie.repositories import movie_repo
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("view", ["full", "card"])
+async def test_get_movies_by_ids_keeps_request_order(view):
+    rows = [SimpleNamespace(id=movie_id) for movie_id in (2, 5, 9)]
+    session = AsyncMock()
+    session.exec.return_value = MagicMock(all=MagicMock(return_value=rows))
+
+    found, missing = await movie_repo.get_movies_by_ids(
+        session, [9, 404, 2, 9, 5], view
+    )
+
+    assert [movie.id for movie in found] == [9, 2, 5]
+    assert missing == [404]
+    session.exec.assert_awaited_once()
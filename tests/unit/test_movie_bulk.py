@@ -0,0 +1,58 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.ndjson import iter_ndjson_lines
+from app.movie.repositories.movie_bulk import bulk_key, movie_values
+from app.movie.schemas.movie import MovieBulkKey, MovieBulkPatch, MovieBulkUpsert
+
+
+async def collect(chunks, max_line_bytes=32):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return [item async for item in iter_ndjson_lines(stream(), max_line_bytes)]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_lines_split_across_chunks():
+    lines = await collect([b'{"a":', b'1}\n\n{"b"', b":2}\r\n", b'{"c":3}'])
+    assert lines == [(1, b'{"a":1}'), (3, b'{"b":2}'), (4, b'{"c":3}')]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_too_long_line_is_reported():
+    lines = await collect([b"x" * 20, b"x" * 20 + b"\n", b'{"ok":1}\n'])
+    assert lines == [(1, None), (2, b'{"ok":1}')]
+
+
+def test_bulk_key_priority():
+    assert bulk_key(MovieBulkKey(id=5, id_tmdb=7, slug="dune")) == ("id", 5)
+    assert bulk_key(MovieBulkUpsert(title="Dune", id_tmdb=7, slug="dune")) == (
+        "id_tmdb",
+        7,
+    )
+    assert bulk_key(MovieBulkPatch(slug="dune", vote_count=3)) == ("slug", "dune")
+
+
+@pytest.mark.parametrize(
+    "schema, payload",
+    [
+        (MovieBulkKey, {}),
+        (MovieBulkUpsert, {"title": "Dune"}),
+        (MovieBulkPatch, {"vote_count": 3}),
+        (MovieBulkPatch, {"id": 1, "title": None}),
+    ],
+)
+def test_bulk_rows_require_key(schema, payload):
+    with pytest.raises(ValidationError):
+        schema.model_validate(payload)
+
+
+def test_movie_values_sets_denormalized_columns():
+    row = MovieBulkPatch(id=1, release_date="2021-09-15", vote_count=3)
+    values = movie_values(row, row.model_fields_set - {"id"})
+    assert values["released_on"].isoformat() == "2021-09-15"
+    assert values["vote_count"] == 3
+    assert values["updated_at"] is not None
+    assert "title" not in values
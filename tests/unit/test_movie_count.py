@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from app.core.cache import TTLCache
+from app.movie.models.movie import Movie
+from app.movie.repositories import movie_filters, movie_repo, movie_statements
+from app.movie.schemas.movie import MovieFilters
+
+
+def test_filter_key_ignores_order_and_empty_filters():
+    first = movie_repo.make_filter_key(
+        genres=[3, 1, 3], title=" Dune ", categories=[], release_year=None
+    )
+    second = movie_repo.make_filter_key(title="dune", genres=[1, 3])
+    assert first == second
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(ttl=10, maxsize=2)
+    with patch("app.core.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+    with patch("app.core.cache.time.monotonic", return_value=111.0):
+        assert cache.get("b") is None
+
+
+@pytest.mark.asyncio
+class TestCountMovies:
+    async def test_exact_count_is_cached(self):
+        movie_repo.invalidate_movie_counts()
+        session = AsyncMock()
+        session.exec.return_value = MagicMock(one=MagicMock(return_value=42))
+        with patch.object(movie_repo, "estimate_row_count", return_value=None):
+            first = await movie_repo.count_movies(session, select(Movie), ("k",))
+            second = await movie_repo.count_movies(session, select(Movie), ("k",))
+
+        assert first == second == (42, False)
+        session.exec.assert_awaited_once()
+
+    async def test_large_estimate_skips_count(self):
+        movie_repo.invalidate_movie_counts()
+        session = AsyncMock()
+        with patch.object(movie_repo, "estimate_row_count", return_value=2_000_000):
+            result = await movie_repo.count_movies(session, select(Movie), ("k",))
+
+        assert result == (2_000_000, True)
+        session.exec.assert_not_awaited()
+
+    async def test_estimate_binds_fulltext_filter(self):
+        filters = MovieFilters(title="dark knight", search_mode="fulltext")
+        shape = movie_filters.filter_shape(filters, "postgresql")
+        connection = MagicMock(dialect=postgresql.asyncpg.dialect())
+        connection.exec_driver_sql = AsyncMock(
+            return_value=MagicMock(
+                scalar=MagicMock(return_value='[{"Plan": {"Plan Rows": 7}}]')
+            )
+        )
+        session = AsyncMock()
+        session.connection.return_value = connection
+
+        estimated = await movie_repo.estimate_row_count(
+            session,
+            movie_statements.filtered_movies(shape),
+            movie_filters.filter_params(filters, "postgresql"),
+        )
+
+        assert estimated == 7
+        sql, values = connection.exec_driver_sql.await_args.args
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert "websearch_to_tsquery($" in sql and "dark knight" not in sql
+        assert "dark knight" in values
@@ -0,0 +1,33 @@
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from app.movie.models.movie import Movie
+from app.movie.repositories.movie_filters import apply_movie_filters
+from app.movie.schemas.movie import MovieFilters
+
+
+def compile_sql(filters: MovieFilters) -> str:
+    stmt = apply_movie_filters(select(Movie), filters, "postgresql")
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_any_genres_is_single_semi_join():
+    sql = compile_sql(MovieFilters(genres=[28, 12, 35]))
+    assert sql.count("EXISTS") == 1
+    assert "moviegenrelink.genre_id = ANY (" in sql
+
+
+def test_all_genres_groups_by_movie():
+    sql = compile_sql(MovieFilters(genres=[28, 12], genre_mode="all"))
+    assert "GROUP BY moviegenrelink.movie_id" in sql
+    assert "HAVING count(*) =" in sql
+
+
+def test_exclusions_and_ranges():
+    sql = compile_sql(
+        MovieFilters(exclude_genres=[27], vote_average_min=7.5, duration_max=120)
+    )
+    assert "NOT (EXISTS" in sql
+    assert "movie.vote_average >=" in sql
+    assert "movie.duration <=" in sql
+    assert "movie.adult = false" in sql
@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from app.core.exceptions import InvalidInputError
+from app.core.pagination import decode_cursor, encode_cursor
+from app.movie.models.movie import Movie
+from app.movie.repositories import movie_repo
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_cursor_roundtrip():
+    payload = {"sort_by": "popular", "value": 12.5, "id": 42}
+    assert decode_cursor(encode_cursor(payload)) == payload
+
+
+def test_tampered_cursor_rejected():
+    body, signature = encode_cursor({"sort_by": "latest", "id": 1}).split(".")
+    forged = encode_cursor({"sort_by": "latest", "id": 999}).split(".")[0]
+    with pytest.raises(InvalidInputError):
+        decode_cursor(f"{forged}.{signature}")
+    with pytest.raises(InvalidInputError):
+        decode_cursor(body)
+
+
+def test_popular_keyset_seeks_on_composite_key():
+    movie = Movie(id=7, title="Dune", popularity=99.1)
+    cursor = movie_repo.make_movie_cursor(movie, "popular")
+
+    stmt = movie_repo.apply_movie_sorting(select(Movie), "popular")
+    sql = compile_sql(movie_repo.apply_movie_keyset(stmt, "popular", cursor))
+
+    assert "(coalesce(movie.popularity, -1.0), movie.id) < (" in sql
+    assert "ORDER BY coalesce(movie.popularity, -1.0) DESC, movie.id DESC" in sql
+
+
+def test_movies_without_sort_key_stay_in_the_feed():
+    stmt = movie_repo.apply_movie_sorting(select(Movie), "newest")
+    assert "IS NOT NULL" not in compile_sql(stmt)
+
+    # Последний фильм страницы без даты: дальше — хвост без даты по id
+    cursor = movie_repo.make_movie_cursor(Movie(id=9, title="Up"), "newest")
+    assert decode_cursor(cursor)["value"] is None
+    assert movie_repo.keyset_params("newest", cursor) == {
+        "cursor_value": date.min,
+        "cursor_id": 9,
+    }
+
+
+def test_cursor_from_other_sort_rejected():
+    cursor = movie_repo.make_movie_cursor(Movie(id=3, title="Up"), "latest")
+    with pytest.raises(InvalidInputError):
+        movie_repo.apply_movie_keyset(select(Movie), "newest", cursor)
+
+
+def test_main_page_select_projects_card_columns_only():
+    filtered = select(Movie).where(Movie.category_id == 1)
+    sql = compile_sql(movie_repo.main_page_select(filtered))
+
+    assert "movie.description" not in sql
+    assert "LEFT OUTER JOIN category" in sql
+    assert "AS genre" in sql and "moviegenrelink.movie_id = movie.id" in sql
+    assert "movie.category_id = " in sql
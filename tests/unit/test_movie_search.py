@@ -0,0 +1,35 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+
+from app.movie.models.movie import Movie
+from app.movie.repositories import movie_search
+
+
+def test_fulltext_filter_uses_search_vector_on_postgres():
+    stmt = movie_search.apply_title_search(
+        select(Movie), "dark knight", "fulltext", "postgresql"
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    # То же выражение, что в индексе ix_movie_search_vector
+    assert movie_search.SEARCH_VECTOR.name + " @@ websearch_to_tsquery(" in sql
+    assert "to_tsvector('simple'::regconfig, coalesce(movie.title, ''))" in sql
+
+
+def test_fulltext_filter_falls_back_to_like_per_term():
+    stmt = movie_search.apply_title_search(
+        select(Movie), "dark knight", "fulltext", "sqlite"
+    )
+    compiled = stmt.compile(
+        dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    sql = str(compiled)
+    assert "'%dark%'" in sql and "'%knight%'" in sql
+    assert "search_vector" not in sql
+
+
+def test_contains_mode_keeps_substring_match():
+    stmt = movie_search.apply_title_search(
+        select(Movie), "dark", "contains", "postgresql"
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "movie.title ILIKE" in sql
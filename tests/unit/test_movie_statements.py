@@ -0,0 +1,81 @@
+from sqlalchemy.dialects import postgresql
+
+from app.movie.repositories import movie_filters, movie_statements
+from app.movie.repositories.movie_statements import StatementCache
+from app.movie.schemas.movie import MovieFilters
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+
+
+def test_same_shape_reuses_statement():
+    small = MovieFilters(categories=[1], genres=[28, 12], title="dune")
+    large = MovieFilters(categories=[3, 1, 2], genres=[35, 18, 10], title="alien")
+    other = MovieFilters(categories=[1])
+    shapes = [movie_filters.filter_shape(f, "postgresql") for f in (small, large)]
+
+    assert shapes[0] == shapes[1]
+    assert shapes[0] != movie_filters.filter_shape(other, "postgresql")
+    first = movie_statements.offset_listing(shapes[0], "popular")
+    assert movie_statements.offset_listing(shapes[1], "popular") is first
+    assert movie_statements.offset_listing(shapes[1], "latest") is not first
+
+
+def test_id_lists_are_array_params_on_postgres():
+    filters = MovieFilters(categories=[3, 1, 3], genres=[18, 28], genre_mode="all")
+    shape = movie_filters.filter_shape(filters, "postgresql")
+    sql = compile_sql(movie_statements.offset_listing(shape, "latest"))
+
+    assert "movie.category_id = ANY ($" in sql
+    assert "moviegenrelink.genre_id = ANY ($" in sql
+    assert "LIMIT $" in sql and "OFFSET $" in sql
+    assert movie_filters.filter_params(filters, "postgresql") == {
+        "categories": [1, 3],
+        "genres": [18, 28],
+        "genre_count": 2,
+    }
+
+
+def test_title_and_date_values_are_bound():
+    filters = MovieFilters(
+        title="dark knight", search_mode="fulltext", release_year=2008
+    )
+
+    params = movie_filters.filter_params(filters, "sqlite")
+    shape = movie_filters.filter_shape(filters, "sqlite")
+
+    assert shape.title_terms == 2
+    assert params["title_term_0"] == "%dark%" and params["title_term_1"] == "%knight%"
+    assert str(params["release_year_end"]) == "2009-01-01"
+    sql = compile_sql(movie_statements.filtered_movies(shape))
+    assert "knight" not in sql and "2008" not in sql
+
+
+def test_statement_cache_counts_hits_and_evicts():
+    cache = StatementCache(maxsize=2)
+    cache.get("a", lambda: "A")
+    cache.get("b", lambda: "B")
+    cache.get("a", lambda: "A2")
+    cache.get("c", lambda: "C")
+
+    assert cache.get("a", lambda: "A3") == "A"
+    assert cache.get("b", lambda: "B2") == "B2"
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 2,
+        "misses": 4,
+        "hit_rate": 0.3333,
+    }
+
+
+def test_offset_and_cursor_listings_share_order():
+    shape = movie_filters.filter_shape(MovieFilters(), "postgresql")
+    offset_sql = compile_sql(movie_statements.offset_listing(shape, "newest"))
+    cursor_sql = compile_sql(
+        movie_statements.cursor_listing(shape, "newest", False, False)
+    )
+
+    order_by = "ORDER BY coalesce(movie.released_on, '0001-01-01') DESC, movie.id DESC"
+    assert order_by in offset_sql and order_by in cursor_sql
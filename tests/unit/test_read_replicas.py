@@ -0,0 +1,107 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from starlette.datastructures import Headers
+
+from app import db
+from app.core.read_after_write import (
+    PIN_COOKIE,
+    PrimaryPins,
+    client_key,
+    pinned_by_cookie,
+)
+from app.db import ReplicaRouter
+
+REPLICA_URLS = [
+    "postgresql+asyncpg://u:p@replica-1/movies",
+    "postgresql+asyncpg://u:p@replica-2/movies",
+]
+
+
+def make_request(method: str, headers: dict | None = None):
+    return SimpleNamespace(
+        method=method, headers=Headers(headers or {}), state=SimpleNamespace()
+    )
+
+
+async def resolve_bind(request) -> str:
+    dependency = db.get_request_db(request)
+    session = await anext(dependency)
+    try:
+        return session.bind.url.host
+    finally:
+        await dependency.aclose()
+
+
+def test_pins_expire_after_window():
+    pins = PrimaryPins(window_seconds=0.05)
+    key = client_key(Headers({"authorization": "Bearer token"}))
+
+    pins.pin(key)
+    assert pins.is_pinned(key)
+    assert not pins.is_pinned(client_key(Headers({"authorization": "Bearer other"})))
+    time.sleep(0.06)
+    assert not pins.is_pinned(key)
+    # Анонимного клиента в памяти не запомнить — только кукой
+    pins.pin(None)
+    assert not pins.is_pinned(None)
+
+
+def test_cookie_pin():
+    future = Headers({"cookie": f"{PIN_COOKIE}={time.time() + 5}"})
+    past = Headers({"cookie": f"{PIN_COOKIE}={time.time() - 5}"})
+
+    assert pinned_by_cookie(future)
+    assert not pinned_by_cookie(past)
+    assert not pinned_by_cookie(Headers({"cookie": f"{PIN_COOKIE}=junk"}))
+
+
+def test_round_robin_skips_unhealthy_replicas():
+    router = ReplicaRouter(REPLICA_URLS)
+
+    assert [router.pick() for _ in range(4)] == [0, 1, 0, 1]
+    router.mark_down(0)
+    assert [router.pick() for _ in range(2)] == [1, 1]
+    router.mark_down(1)
+    assert router.pick() is None
+    assert router.fallbacks == 1
+
+
+def test_health_check_marks_unreachable_replica_down():
+    router = ReplicaRouter(["postgresql+asyncpg://u:p@127.0.0.1:1/movies"])
+
+    with patch.object(db.settings, "DB_REPLICA_HEALTH_TIMEOUT_SECONDS", 1):
+        assert asyncio.run(router.check_all()) == [False]
+    assert router.pick() is None
+
+
+def test_reads_go_to_replica_until_client_writes():
+    router = ReplicaRouter(REPLICA_URLS)
+    pins = PrimaryPins(window_seconds=5)
+    auth = {"authorization": "Bearer user-1"}
+
+    async def scenario():
+        hosts = [
+            await resolve_bind(make_request("GET", auth)),
+            await resolve_bind(make_request("POST", auth)),
+        ]
+        # Commit в сессии primary закрепляет чтения этого клиента
+        write = make_request("PATCH", auth)
+        dependency = db.get_request_db(write)
+        session = await anext(dependency)
+        db._remember_write(session.sync_session)
+        await dependency.aclose()
+        hosts += [
+            await resolve_bind(make_request("GET", auth)),
+            await resolve_bind(make_request("GET", {"authorization": "Bearer b"})),
+        ]
+        return hosts, write.state.db_wrote
+
+    with patch.object(db, "replicas", router), patch.object(db, "primary_pins", pins):
+        hosts, wrote = asyncio.run(scenario())
+
+    primary = db.engine.url.host
+    assert hosts == ["replica-1", primary, primary, "replica-2"]
+    assert wrote is True
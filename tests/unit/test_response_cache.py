@@ -0,0 +1,67 @@
+from unittest.mock import MagicMock, patch
+
+from starlette.datastructures import QueryParams
+
+from app.core.response_cache import ResponseCache, make_cache_key
+
+
+def make_request(path: str, query: str) -> MagicMock:
+    request = MagicMock()
+    request.url.path = path
+    request.query_params = QueryParams(query)
+    return request
+
+
+def test_cache_key_ignores_param_order_and_empty_values():
+    first = make_request("/api/v1/movies/", "genres=2&page=1&genres=1&title=")
+    second = make_request("/api/v1/movies/", "page=1&genres=1&genres=2")
+    assert make_cache_key(first) == make_cache_key(second)
+
+
+def test_invalidate_by_tag_drops_only_tagged_entries():
+    cache = ResponseCache(max_bytes=1024, max_entry_bytes=1024)
+    cache.set("list", b"[]", ["catalog"], ttl=60)
+    cache.set("movie:1", b"{}", ["movie:1"], ttl=60)
+    cache.set("movie:2", b"{}", ["movie:2"], ttl=60)
+
+    assert cache.invalidate("catalog", "movie:1") == 2
+    assert cache.get("route", "list") is None
+    assert cache.get("route", "movie:1") is None
+    assert cache.get("route", "movie:2").body == b"{}"
+    assert cache.stats()["routes"]["route"] == {
+        "hits": 1,
+        "misses": 2,
+        "not_modified": 0,
+    }
+
+
+def test_evicts_least_recently_used_by_size():
+    cache = ResponseCache(max_bytes=10, max_entry_bytes=8)
+    cache.set("a", b"aaaa", [], ttl=60)
+    cache.set("b", b"bbbb", [], ttl=60)
+    cache.get("route", "a")
+    cache.set("c", b"cccc", [], ttl=60)
+    cache.set("big", b"x" * 9, [], ttl=60)
+
+    assert cache.get("route", "b") is None
+    assert cache.get("route", "big") is None
+    assert cache.size_bytes == 8
+    assert cache.evictions == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache(max_bytes=1024, max_entry_bytes=1024)
+    with patch("app.core.response_cache.time.monotonic", return_value=100.0):
+        cache.set("a", b"{}", ["catalog"], ttl=5)
+    with patch("app.core.response_cache.time.monotonic", return_value=106.0):
+        assert cache.get("route", "a") is None
+    assert cache.size_bytes == 0
+
+
+def test_entry_with_stale_etag_is_a_miss():
+    cache = ResponseCache(max_bytes=1024, max_entry_bytes=1024)
+    cache.set("list", b"[]", ["catalog"], ttl=60, etag='"v1"')
+
+    assert cache.get("route", "list", etag='"v1"').body == b"[]"
+    assert cache.get("route", "list", etag='"v2"') is None
+    assert cache.size_bytes == 0
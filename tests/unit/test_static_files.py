@@ -0,0 +1,71 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.static import MediaStaticFiles
+
+HASHED = "a" * 64 + ".jpg"
+
+
+def make_client(tmp_path, **kwargs) -> TestClient:
+    (tmp_path / "posters").mkdir()
+    (tmp_path / "posters" / HASHED).write_bytes(b"0123456789")
+    (tmp_path / "posters" / "legacy.jpg").write_bytes(b"legacy")
+    (tmp_path / "data.json").write_bytes(b'{"a": 1}')
+    (tmp_path / "data.json.gz").write_bytes(gzip.compress(b'{"a": 1}'))
+    app = FastAPI()
+    app.mount("/static", MediaStaticFiles(directory=str(tmp_path), **kwargs))
+    return TestClient(app)
+
+
+def test_hashed_files_are_immutable(tmp_path):
+    client = make_client(tmp_path)
+
+    hashed = client.get(f"/static/posters/{HASHED}")
+    legacy = client.get("/static/posters/legacy.jpg")
+
+    assert hashed.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert legacy.headers["cache-control"] == "no-cache"
+    revalidated = client.get(
+        "/static/posters/legacy.jpg", headers={"if-none-match": legacy.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_range_request(tmp_path):
+    client = make_client(tmp_path)
+
+    response = client.get(f"/static/posters/{HASHED}", headers={"range": "bytes=2-5"})
+
+    assert response.status_code == 206
+    assert response.content == b"2345"
+    assert response.headers["content-range"] == "bytes 2-5/10"
+
+
+def test_serves_precompressed_variant(tmp_path):
+    client = make_client(tmp_path)
+
+    compressed = client.get("/static/data.json", headers={"accept-encoding": "gzip"})
+    plain = client.get("/static/data.json", headers={"accept-encoding": "identity"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["content-type"] == "application/json"
+    assert compressed.json() == {"a": 1}
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+
+def test_x_accel_redirect_offloads_body(tmp_path):
+    client = make_client(
+        tmp_path,
+        sendfile_mode="x-accel-redirect",
+        accel_redirect_prefix="/_protected_media",
+    )
+
+    response = client.get(f"/static/posters/{HASHED}")
+
+    assert response.content == b""
+    assert response.headers["x-accel-redirect"] == f"/_protected_media/posters/{HASHED}"
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["cache-control"].endswith("immutable")
@@ -0,0 +1,99 @@
+import asyncio
+import gzip
+import json
+from unittest.mock import patch
+
+import httpx
+
+from app.core.rate_limit import TokenBucket
+from app.movie.services import tmdb_fetch
+from app.movie.services.tmdb_fetch import fetch_discover_movies
+
+PARAMS = {"sort_by": "popularity.desc"}
+
+
+def make_handler(pages: int, fail: dict[int, list[int]]):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        calls.append(page)
+        statuses = fail.get(page, [])
+        if statuses:
+            return httpx.Response(statuses.pop(0), headers={"retry-after": "0"})
+        results = [{"id": page * 10 + i} for i in range(2)]
+        return httpx.Response(200, json={"total_pages": pages, "results": results})
+
+    return handler, calls
+
+
+def run(handler, tmp_path):
+    async def scenario():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), base_url="http://tmdb.test"
+        ) as client:
+            return await fetch_discover_movies(
+                client, tmp_path / "dump.ndjson.gz", PARAMS, concurrency=3, rate=1000
+            )
+
+    with (
+        patch.object(tmdb_fetch.settings, "TMDB_FETCH_BACKOFF_SECONDS", 0),
+        patch.object(tmdb_fetch.settings, "TMDB_FETCH_RETRIES", 2),
+    ):
+        return asyncio.run(scenario())
+
+
+def read_ids(tmp_path) -> list[int]:
+    with gzip.open(tmp_path / "dump.ndjson.gz", "rt") as file:
+        return [json.loads(line)["id"] for line in file]
+
+
+def test_writes_pages_in_order_despite_retries(tmp_path):
+    handler, _ = make_handler(6, {2: [429], 3: [503, 502]})
+
+    stats = run(handler, tmp_path)
+
+    assert stats.errors == [] and stats.pages == 6
+    assert stats.throttled == 1 and stats.retries == 3
+    assert read_ids(tmp_path) == [
+        page * 10 + i for page in range(1, 7) for i in range(2)
+    ]
+
+
+def test_resumes_from_checkpoint_after_failure(tmp_path):
+    handler, _ = make_handler(5, {3: [500, 500, 500]})
+    first = run(handler, tmp_path)
+    checkpoint = json.loads((tmp_path / "dump.ndjson.gz.checkpoint").read_text())
+
+    handler, calls = make_handler(5, {})
+    second = run(handler, tmp_path)
+
+    assert first.errors and checkpoint["next_page"] == 3
+    assert second.resumed_from == 3 and sorted(calls) == [3, 4, 5]
+    assert read_ids(tmp_path) == [
+        page * 10 + i for page in range(1, 6) for i in range(2)
+    ]
+
+
+def test_checkpoint_without_dump_starts_over(tmp_path):
+    handler, _ = make_handler(5, {3: [500, 500, 500]})
+    run(handler, tmp_path)
+    (tmp_path / "dump.ndjson.gz").unlink()
+
+    handler, calls = make_handler(5, {})
+    stats = run(handler, tmp_path)
+
+    assert stats.resumed_from == 1 and sorted(calls) == [1, 2, 3, 4, 5]
+    assert read_ids(tmp_path) == [
+        page * 10 + i for page in range(1, 6) for i in range(2)
+    ]
+
+
+def test_token_bucket_backs_off_and_recovers():
+    bucket = TokenBucket(rate=10)
+
+    bucket.throttle(retry_after=0)
+    assert bucket.rate == 5
+    for _ in range(20):
+        bucket.recover()
+    assert bucket.rate == 10
@@ -0,0 +1,58 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.movie.services import tmdb_images
+from app.movie.services.tmdb_images import download_image
+
+JPEG = b"\xff\xd8\xff\xe0" + b"0" * 100
+
+
+def run(handler, tmp_path, path="/poster.jpg"):
+    async def scenario():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), base_url="http://tmdb.test"
+        ) as client:
+            return await download_image(client, path, tmp_path)
+
+    with (
+        patch.object(tmdb_images.settings, "TMDB_MIRROR_BACKOFF_SECONDS", 0),
+        patch.object(tmdb_images.settings, "TMDB_MIRROR_RETRIES", 2),
+    ):
+        return asyncio.run(scenario())
+
+
+def test_retries_throttled_and_failed_responses(tmp_path):
+    responses = iter(
+        [
+            httpx.Response(429, headers={"retry-after": "0"}),
+            httpx.Response(503),
+            httpx.Response(200, content=JPEG),
+        ]
+    )
+
+    path, extension, size = run(lambda request: next(responses), tmp_path)
+
+    assert extension == "jpg" and size == len(JPEG)
+    assert path.read_bytes() == JPEG
+
+
+def test_missing_and_non_image_are_skipped(tmp_path):
+    assert run(lambda request: httpx.Response(404), tmp_path) is None
+    assert run(lambda request: httpx.Response(200, content=b"<html>"), tmp_path) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_gives_up_after_retries(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        raise httpx.ConnectError("refused")
+
+    with pytest.raises(httpx.HTTPError):
+        run(handler, tmp_path)
+    assert len(calls) == 3
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,42 @@
+import gzip
+import json
+from unittest.mock import patch
+
+from app.movie.services import tmdb_import
+from app.movie.services.tmdb_import import (
+    iter_batches,
+    iter_json_records,
+    tmdb_movie_values,
+)
+
+MOVIES = [{"id": i, "title": f"Movie {i}", "overview": "x" * 3000} for i in range(5)]
+
+
+def test_reads_json_array_in_small_chunks(tmp_path):
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(MOVIES, indent=4))
+
+    with patch.object(tmdb_import, "READ_CHUNK_CHARS", 7):
+        assert list(iter_json_records(path)) == MOVIES
+
+
+def test_reads_gzipped_ndjson(tmp_path):
+    path = tmp_path / "dump.ndjson.gz"
+    with gzip.open(path, "wt") as file:
+        file.writelines(json.dumps(movie) + "\n" for movie in MOVIES)
+
+    batches = list(iter_batches(iter_json_records(path), 2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+def test_movie_values_are_clipped_and_slugged():
+    values = tmdb_movie_values(
+        {"id": 7, "title": "Hello World", "overview": "x" * 3000, "release_date": ""},
+        category_id=1,
+    )
+
+    assert values["slug"] == "hello-world"
+    assert len(values["description"]) == 2000
+    assert values["released_on"] is None
+    assert tmdb_movie_values({"id": 8, "title": "!!!"}, None) is None
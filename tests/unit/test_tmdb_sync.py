@@ -0,0 +1,50 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.core.rate_limit import TokenBucket
+from app.movie.services.tmdb_fetch import FetchStats
+from app.movie.services.tmdb_sync import fetch_changed_ids, fetch_details, sync_windows
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_windows_are_at_most_two_weeks():
+    windows = sync_windows(START, START + timedelta(days=30))
+
+    assert [end - start for start, end in windows] == [
+        timedelta(days=14),
+        timedelta(days=14),
+        timedelta(days=2),
+    ]
+    assert sync_windows(START, START) == []
+
+
+def test_fetches_changed_ids_and_details():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/movie/changes":
+            page = int(request.url.params["page"])
+            ids = [{"id": page}, {"id": page + 10}]
+            return httpx.Response(200, json={"total_pages": 3, "results": ids})
+        tmdb_id = int(request.url.path.rsplit("/", 1)[1])
+        if tmdb_id == 2:
+            return httpx.Response(404)
+        genres = [{"id": 28, "name": "Action"}]
+        return httpx.Response(200, json={"id": tmdb_id, "genres": genres})
+
+    async def scenario():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), base_url="http://tmdb.test"
+        ) as client:
+            bucket, stats = TokenBucket(1000), FetchStats()
+            changed = await fetch_changed_ids(
+                client, bucket, START, START + timedelta(days=1), stats
+            )
+            details = await fetch_details(client, bucket, [1, 2, 3], 2, stats)
+            return changed, details
+
+    changed, details = asyncio.run(scenario())
+
+    assert changed == {1, 2, 3, 11, 12, 13}
+    assert details == [{"id": 1, "genre_ids": [28]}, {"id": 3, "genre_ids": [28]}]
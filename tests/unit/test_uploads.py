@@ -0,0 +1,98 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import APIRouter, FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.exceptions import (
+    AppBaseException,
+    UploadsBusyError,
+    app_exception_handler,
+)
+from app.core.uploads import UploadLimiter, limited_upload_route
+from app.utils.file_utils import sniff_image_extension
+
+PNG_HEAD = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+
+
+def make_client(limit_mb: int) -> TestClient:
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    router = APIRouter()
+    router.add_api_route(
+        "/upload",
+        upload,
+        methods=["POST"],
+        route_class_override=limited_upload_route(limit_mb),
+    )
+    app = FastAPI()
+    app.add_exception_handler(AppBaseException, app_exception_handler)
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_rejects_large_content_length_before_reading_body():
+    client = make_client(limit_mb=1)
+    response = client.post(
+        "/upload",
+        content=b"",
+        headers={"content-length": str(10 * 1024 * 1024)},
+    )
+    assert response.status_code == 413
+
+
+def test_stops_reading_chunked_body_over_limit():
+    client = make_client(limit_mb=1)
+
+    def body():
+        yield (
+            b"--x\r\n"
+            b'Content-Disposition: form-data; name="file"; filename="a.png"\r\n'
+            b"Content-Type: image/png\r\n\r\n"
+        )
+        for _ in range(40):
+            yield b"\x00" * 64 * 1024
+
+    response = client.post(
+        "/upload",
+        content=body(),
+        headers={"content-type": "multipart/form-data; boundary=x"},
+    )
+    assert response.status_code == 413
+    assert response.json()["error"]["code"] == "FILE_TO_LARGE"
+
+
+def test_small_upload_passes():
+    client = make_client(limit_mb=1)
+    response = client.post("/upload", files={"file": ("a.png", PNG_HEAD)})
+    assert response.status_code == 200
+    assert response.json() == {"size": len(PNG_HEAD)}
+
+
+def test_limiter_sheds_when_queue_is_full():
+    async def scenario():
+        limiter = UploadLimiter(max_active=1, max_waiting=1, wait_timeout=0.05)
+        async with limiter.slot():
+            waiter = asyncio.create_task(limiter.slot().__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(UploadsBusyError):
+                async with limiter.slot():
+                    pass
+            with pytest.raises(UploadsBusyError):
+                await waiter
+        assert limiter.shed == 2
+        assert limiter.active == 0 and limiter.waiting == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize(
+    ("head", "ext"),
+    [(PNG_HEAD, "png"), (b"\xff\xd8\xff\xe0" + b"\x00" * 12, "jpg"), (b"GIF89a", None)],
+)
+def test_sniff_image_extension(head, ext):
+    file = UploadFile(io.BytesIO(head), filename="avatar.png")
+    assert asyncio.run(sniff_image_extension(file)) == ext
+    assert file.file.tell() == 0
@@ -0,0 +1,49 @@
+import asyncio
+from unittest.mock import patch
+
+from app import warmup as warmup_module
+from app.movie.repositories import movie_statements
+from app.warmup import Warmup
+
+
+def test_disabled_warmup_is_ready_at_once():
+    warmup = Warmup()
+    with patch.object(warmup_module.settings, "WARMUP_ENABLED", False):
+        asyncio.run(warmup.run_until_ready(app=None))
+
+    assert warmup.state.ready and warmup.state.attempts == 0
+
+
+def test_failed_warmup_is_retried_until_ready():
+    warmup = Warmup()
+    calls = []
+
+    async def run(app):
+        # Что видел /readyz перед попыткой
+        calls.append((warmup.state.status, warmup.state.error))
+        warmup.state.status = "running"
+        if len(calls) == 1:
+            raise ConnectionRefusedError("db is not up yet")
+        warmup.state.status = "ready"
+
+    with (
+        patch.object(warmup_module.settings, "WARMUP_ENABLED", True),
+        patch.object(warmup_module.settings, "WARMUP_RETRY_SECONDS", 0),
+        patch.object(warmup, "run", run),
+    ):
+        asyncio.run(warmup.run_until_ready(app=None))
+
+    assert calls == [
+        ("pending", None),
+        ("failed", "ConnectionRefusedError: db is not up yet"),
+    ]
+    assert warmup.state.ready
+
+
+def test_hot_statements_cover_default_listings():
+    statements = movie_statements.hot_statements("postgresql")
+
+    assert len(statements) == 6
+    first, params = statements[0]
+    assert movie_statements.hot_statements("postgresql")[0][0] is first
+    assert params == {"offset": 0, "limit": 11}